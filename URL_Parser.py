@@ -3,26 +3,29 @@ import streamlit as st
 import pandas as pd
 import os
 from pathlib import Path
-import time
 import logging
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, Optional, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
-import hashlib
+import csv
 import html
+import io
 from datetime import datetime
 import subprocess
 import sys
+import uuid
 
 # Import refactored processing logic
 from batch_website_scraper import process_urls
-from utils.llm_utils import ArticleInfo
+from config import JOB_POLL_SECONDS
+from utils.job_queue import JOB_FAILED, JOB_QUEUED, Job, JobQueue
 from utils.scraping_utils import fix_mojibake
+from utils.url_ingest import IngestStats, UrlIngester, iter_upload_urls, spool_urls
 
 
 # --- Configuration ---
 class Config:
-    MAX_URLS = 100
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    MAX_URLS = 50_000
+    MAX_FILE_SIZE = 200 * 1024 * 1024  # 200MB, Streamlit's default upload limit
     SUPPORTED_FILE_TYPES = ["csv", "txt"]
     OUTPUT_DIR = Path("user_facing_csvs")
     CACHE_DIR = Path(".streamlit_cache")
@@ -93,6 +96,8 @@ def initialize_session_state():
         "processed_file_hash": None,
         "processing_history": [],
         "last_processed": None,
+        "selected_job": None,
+        "finished_jobs": None,
     }
 
     for key, value in defaults.items():
@@ -307,90 +312,178 @@ def setup_environment_minimal():
     return True
 
 
-def validate_url(url: str) -> bool:
-    """Validate URL format"""
-    url = url.strip()
-    return url.startswith(("http://", "https://")) and len(url) >= 10
+# --- Background Jobs ---
 
 
-def parse_urls_from_text(text: str) -> List[str]:
-    """Parse URLs from text input with validation"""
-    urls = []
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """The process-wide job queue, shared by every session and kept across reruns."""
+    return JobQueue(process_urls)
 
-    # Split by newlines and commas
-    for line in text.split("\n"):
-        for url in line.split(","):
-            url = url.strip()
-            if url and validate_url(url):
-                urls.append(url)
 
-    return list(set(urls))  # Remove duplicates
+def get_client_id() -> str:
+    """Identifies this browser tab across reloads with a `?client=` query parameter."""
+    client_id = st.query_params.get("client")
+    if not client_id:
+        client_id = uuid.uuid4().hex[:12]
+        st.query_params["client"] = client_id
+    return client_id
 
 
-def parse_urls_from_file(uploaded_file) -> tuple[List[str], Optional[str]]:
-    """Parse URLs from uploaded file with enhanced error handling"""
-    try:
-        # Check file size
-        if uploaded_file.size > Config.MAX_FILE_SIZE:
-            return (
-                [],
-                f"File too large. Maximum size: {Config.MAX_FILE_SIZE // (1024*1024)}MB",
+def submit_job(urls_path: Path, total: int, timeout_seconds: int) -> Job:
+    """Queues the spooled URLs as a background job; returns without waiting for it."""
+    client_id = get_client_id()
+    output_filename = (
+        Config.OUTPUT_DIR
+        / f"processed_urls_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{client_id}.csv"
+    )
+    job = get_job_queue().submit(
+        client_id, str(urls_path), total, str(output_filename), timeout_seconds
+    )
+    st.session_state.last_processed = job.id
+    st.session_state.selected_job = job.id
+    return job
+
+
+def describe_job(job: Job) -> str:
+    submitted = datetime.fromtimestamp(job.submitted_at).strftime("%Y-%m-%d %H:%M")
+    return f"{submitted} · {job.total} URLs · {job.state}"
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def display_active_jobs():
+    """Progress of this user's queued and running jobs, refreshed in place."""
+    queue = get_job_queue()
+    jobs = queue.jobs_for(get_client_id())
+    st.session_state.processing_history = [job.to_dict() for job in jobs]
+
+    active = [job for job in jobs if job.active]
+    if active:
+        st.header("⏳ Jobs in Progress")
+        stats = queue.stats()
+        st.caption(
+            f"{stats['running']} running and {stats['queued']} queued "
+            f"for {stats['users']} user(s)"
+        )
+    for job in active:
+        if job.state == JOB_QUEUED:
+            col1, col2 = st.columns([4, 1])
+            col1.info(f"🕒 Queued: {describe_job(job)}")
+            if col2.button("Cancel", key=f"cancel_{job.id}"):
+                queue.cancel(job.id)
+                st.rerun(scope="fragment")
+        else:
+            st.progress(
+                job.progress,
+                text=f"🔄 {job.done}/{job.total} URLs · {job.elapsed():.0f}s",
             )
+            if job.message:
+                st.caption(job.message)
+
+    # A job finished since the last refresh: rerun the page to show it.
+    finished = {job.id for job in jobs if not job.active}
+    seen = st.session_state.finished_jobs
+    st.session_state.finished_jobs = finished
+    if seen is not None and finished - seen:
+        st.session_state.selected_job = next(
+            job.id for job in jobs if job.id in finished - seen
+        )
+        st.rerun()
 
-        # Generate file hash for caching
-        file_content = uploaded_file.read()
-        file_hash = hashlib.md5(file_content).hexdigest()
-        uploaded_file.seek(0)  # Reset file pointer
 
-        # Check if we've already processed this file
-        if st.session_state.processed_file_hash == file_hash:
-            return (
-                [],
-                "File already processed. Upload a different file or modify the content.",
-            )
+def display_job_history():
+    """Lets the user pick one of their jobs, running or finished, and shows its results."""
+    queue = get_job_queue()
+    jobs = queue.jobs_for(get_client_id())
+    if not jobs:
+        return
 
-        urls = []
+    st.header("🕘 History")
+    job_ids = [job.id for job in jobs]
+    selected = st.session_state.selected_job
+    job_id = st.selectbox(
+        "Show results of",
+        job_ids,
+        index=job_ids.index(selected) if selected in job_ids else 0,
+        format_func=lambda job_id: describe_job(queue.get(job_id)),
+    )
+    st.session_state.selected_job = job_id
+    job = queue.get(job_id)
+    st.session_state.scraping_result = job.result
+
+    if job.state == JOB_FAILED:
+        st.error(f"❌ Processing failed: {job.error}")
+    elif job.stats:
+        st.success(
+            f"🎉 Processed {job.stats['total']} URLs in {job.elapsed():.1f} seconds "
+            f"({job.stats['successful']} successful)"
+        )
 
-        if uploaded_file.type == "text/csv":
-            try:
-                df = pd.read_csv(uploaded_file, header=None)
-                # Try multiple columns in case URLs are not in the first column
-                for col in df.columns:
-                    potential_urls = df[col].dropna().astype(str).tolist()
-                    for url in potential_urls:
-                        if validate_url(url):
-                            urls.append(url)
-                    if urls:  # If we found URLs in this column, stop looking
-                        break
-            except pd.errors.EmptyDataError:
-                return [], "CSV file is empty"
-            except Exception as e:
-                return [], f"Error reading CSV: {str(e)}"
+    # Rows stream in from the output CSV while the job runs.
+    st.fragment(
+        display_results, run_every=JOB_POLL_SECONDS if job.active else None
+    )(job)
 
-        elif uploaded_file.type == "text/plain":
-            try:
-                content = file_content.decode("utf-8")
-                urls = parse_urls_from_text(content)
-            except UnicodeDecodeError:
-                try:
-                    content = file_content.decode("latin-1")
-                    urls = parse_urls_from_text(content)
-                except Exception as e:
-                    return [], f"Cannot decode file: {str(e)}"
 
-        # Remove duplicates and validate
-        unique_urls = list(set(url for url in urls if validate_url(url)))
+def spool_input_urls(
+    stream: BinaryIO, max_urls: int
+) -> tuple[Optional[Path], int, IngestStats, Optional[str]]:
+    """
+    Reads URLs from `stream` in chunks and spools them to disk for a job.
 
-        if not unique_urls:
-            return [], "No valid URLs found in file"
+    Only digests of the URLs seen so far are held in memory, so an upload
+    of any size costs the same few megabytes here.
 
-        # Store file hash
-        st.session_state.processed_file_hash = file_hash
+    Returns:
+        The spool path, the number of URLs in it, the ingestion counts and
+        an error message (with no spool) if the input was rejected.
+    """
+    ingester = UrlIngester()
+    spool_path = get_job_queue().store.directory / f"{uuid.uuid4().hex}.urls.txt"
+    try:
+        count = spool_urls(iter_upload_urls(stream, ingester), spool_path, max_urls)
+    except ValueError:
+        return None, 0, ingester.stats, f"Too many URLs. Maximum allowed: {max_urls:,}"
+    except (OSError, csv.Error) as e:
+        spool_path.unlink(missing_ok=True)
+        return None, 0, ingester.stats, f"Unexpected error reading URLs: {str(e)}"
+    if not count:
+        spool_path.unlink(missing_ok=True)
+        return None, 0, ingester.stats, "No valid URLs found"
+    return spool_path, count, ingester.stats, None
+
+
+def spool_uploaded_file(
+    uploaded_file, max_urls: int
+) -> tuple[Optional[Path], int, Optional[str]]:
+    """Spools an uploaded file's URLs, refusing one already submitted in this session."""
+    if uploaded_file.size > Config.MAX_FILE_SIZE:
+        return (
+            None,
+            0,
+            f"File too large. Maximum size: {Config.MAX_FILE_SIZE // (1024*1024)}MB",
+        )
 
-        return unique_urls, None
+    uploaded_file.seek(0)
+    spool_path, count, stats, error = spool_input_urls(uploaded_file, max_urls)
+    if error:
+        return None, 0, error
+
+    # The hash is only known once the whole file has been read.
+    if st.session_state.processed_file_hash == stats.sha256:
+        spool_path.unlink(missing_ok=True)
+        return (
+            None,
+            0,
+            "File already processed. Upload a different file or modify the content.",
+        )
+    st.session_state.processed_file_hash = stats.sha256
 
-    except Exception as e:
-        return [], f"Unexpected error processing file: {str(e)}"
+    st.caption(
+        f"📄 {stats.fields:,} entries · {stats.urls:,} URLs ({stats.pages:,} distinct pages) · "
+        f"{stats.duplicates:,} repeats and {stats.invalid:,} invalid skipped"
+    )
+    return spool_path, count, None
 
 
 def display_processing_metrics(stats: Dict[str, int]):
@@ -442,145 +535,183 @@ def display_processing_metrics(stats: Dict[str, int]):
         )
 
 
-def display_enhanced_results():
-    """Enhanced results display with better formatting and error handling"""
-    if not st.session_state.scraping_result:
-        return
+# Columns shown in the results table; the full row is loaded on selection.
+RESULT_TABLE_COLUMNS = ["title", "url", "source", "published_date", "status", "llm_used"]
+PAGE_SIZES = [25, 50, 100, 250]
 
-    results = st.session_state.scraping_result
-    articles = results.get("articles", [])
-    file_path = results.get("file_path")
 
-    if not articles:
-        st.warning(
-            "⚠️ No articles were processed. Please check your URLs and try again."
-        )
+@st.cache_resource(max_entries=8)
+def load_results_frame(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """
+    Reads an output CSV into a DataFrame, cached until the file changes.
+
+    The file's mtime and size are part of the cache key, so a CSV that is
+    still being written is re-read only after new rows land. The frame is
+    shared, not copied, across reruns; treat it as read-only.
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df["successful"] = df["status"].str.startswith("success")
+    return df
+
+
+def read_results(path: str) -> Optional[pd.DataFrame]:
+    """The current rows of an output CSV, or None before the first row is written."""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    try:
+        df = load_results_frame(path, stat.st_mtime_ns, stat.st_size)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError):
+        # Caught mid-write; keep showing what was read last time.
+        last_path, last_df = st.session_state.get("results_frame", (None, None))
+        return last_df if last_path == path else None
+    st.session_state.results_frame = (path, df)
+    return df
+
+
+def display_results(job: Job):
+    """Paginated results table for one job, with details for the selected row."""
+    df = read_results(job.output_path)
+    if df is None or df.empty:
+        if job.active:
+            st.info("⏳ Waiting for the first results...")
+        else:
+            st.warning(
+                "⚠️ No articles were processed. Please check your URLs and try again."
+            )
         return
 
-    # Download button
-    if file_path and Path(file_path).exists():
-        with open(file_path, "rb") as fp:
+    display_processing_metrics(
+        {
+            "total": len(df),
+            "successful": int(df["successful"].sum()),
+            "failed": int((~df["successful"]).sum()),
+            "with_text": int((df["article_text"] != "").sum()),
+        }
+    )
+
+    if not job.active:
+        with open(job.output_path, "rb") as fp:
             st.download_button(
                 label="📥 Download Results (CSV)",
                 data=fp,
-                file_name=f"processed_urls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                file_name=Path(job.output_path).name,
                 mime="text/csv",
                 use_container_width=True,
             )
 
-    # Tabs for different views
-    tab1, tab2, tab3 = st.tabs(["📄 All Results", "✅ Successful", "❌ Failed"])
-
-    with tab1:
-        display_article_results(articles, show_all=True)
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        view = st.radio(
+            "Show",
+            ["📄 All Results", "✅ Successful", "❌ Failed"],
+            horizontal=True,
+            key=f"view_{job.id}",
+        )
+    if view == "✅ Successful":
+        df = df[df["successful"]]
+    elif view == "❌ Failed":
+        df = df[~df["successful"]]
+    if df.empty:
+        st.info("No articles in this category.")
+        return
 
-    with tab2:
-        successful_articles = [
-            a for a in articles if isinstance(a.get("article_info"), ArticleInfo)
-        ]
-        display_article_results(successful_articles, show_all=False)
+    with col2:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"page_size_{job.id}")
+    pages = (len(df) - 1) // page_size + 1
+    with col3:
+        page = st.number_input(
+            "Page", 1, pages, 1, key=f"page_{job.id}_{view}_{page_size}"
+        )
+    page_df = df.iloc[(page - 1) * page_size : page * page_size]
+
+    event = st.dataframe(
+        page_df[RESULT_TABLE_COLUMNS],
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        column_config={"url": st.column_config.LinkColumn("url")},
+        key=f"results_{job.id}_{view}_{page}_{page_size}",
+    )
+    st.caption(f"Page {page} of {pages} · {len(df)} rows · select a row for details")
+    if event.selection.rows:
+        display_article_detail(page_df.iloc[event.selection.rows[0]])
 
-    with tab3:
-        failed_articles = [
-            a for a in articles if not isinstance(a.get("article_info"), ArticleInfo)
-        ]
-        display_article_results(failed_articles, show_all=False)
 
+def display_article_detail(row: pd.Series):
+    """Full details of one result row (only rendered for the selected row)."""
+    url = row["url"]
+    status = row["status"]
 
-def display_article_results(articles: List[Dict], show_all: bool = True):
-    """Display article results with improved formatting"""
-    if not articles:
-        st.info("No articles in this category.")
+    if not row["successful"]:
+        st.error(f"**Failed to process:** {url}")
+        st.write(f"**Status:** {status}")
+        if row.get("error_message"):
+            st.write(f"**Error Details:** {row['error_message']}")
         return
 
-    for idx, entry in enumerate(articles, 1):
-        article_info = entry.get("article_info")
-        url = entry.get("url", "Unknown URL")
-        llm_used = entry.get("llm_used", "N/A")
-        status = entry.get("status", "Unknown")
-
-        if isinstance(article_info, ArticleInfo):
-            title = fix_mojibake(article_info.title or "Untitled Article")
-            authors = fix_mojibake(article_info.authors or "N/A")
-            text_preview = fix_mojibake(article_info.article_text or "")
-            source = fix_mojibake(article_info.source or "N/A")
-            published_date = fix_mojibake(article_info.published_date or "N/A")
-            modified_date = fix_mojibake(article_info.modified_date or "N/A")
-
-            # Truncate title for display
-            display_title = title[:80] + "..." if len(title) > 80 else title
-            expander_title = f"✅ {display_title}"
-            is_expanded = False
-        else:
-            # Truncate URL for display
-            display_url = url[:60] + "..." if len(url) > 60 else url
-            expander_title = f"❌ {display_url} ({status})"
-            is_expanded = False
-
-        with st.expander(expander_title, expanded=is_expanded):
-            if isinstance(article_info, ArticleInfo):
-                # Create two columns for better layout
-                col1, col2 = st.columns([2, 1])
-
-                with col1:
-                    st.markdown(f"**📰 Title:** {title}")
-                    st.markdown(f"**🔗 URL:** [{url}]({url})")
-                    st.markdown(f"**✍️ Author(s):** {authors}")
-
-                with col2:
-                    st.markdown(f"**📅 Published:** {published_date}")
-                    if (
-                        modified_date
-                        and modified_date != "N/A"
-                        and modified_date != published_date
-                    ):
-                        st.markdown(f"**🔄 Updated:** {modified_date}")
-                    st.markdown(f"**🤖 LLM:** `{llm_used}`")
-                    st.markdown(f"**📊 Source:** {source}")
-
-                # Article text preview
-                if text_preview:
-                    st.markdown("**📝 Article Preview:**")
-                    preview_length = min(1000, len(text_preview))
-
-                    # 1. Prepare the text content (same logic as before)
-                    text_to_display = text_preview[:preview_length]
-                    if len(text_preview) > preview_length:
-                        text_to_display += "..."
-
-                    # 2. Escape the text to prevent it from being interpreted as HTML
-                    safe_text = html.escape(text_to_display)
-
-                    # 3. Define the CSS for the styled box
-                    # You can customize colors, padding, etc. here
-                    css_style = """
-                        background-color: #f0f2f6;
-                        border: 1px solid #e6e6e6;
-                        border-radius: 0.5rem;
-                        padding: 1rem;
-                        height: 200px;
-                        overflow-y: auto;
-                        font-family: 'Source Sans Pro', sans-serif;
-                        color: #262730;
-                    """
-                    # We replace newlines with spaces for the HTML style attribute
-                    css_style_str = css_style.replace("\n", " ")
-
-                    # 4. Create the HTML for the box using an f-string
-                    markdown_content = f'<div style="{css_style_str}">{safe_text}</div>'
-
-                    # 5. Add a header (optional, but good practice since the original label was collapsed)
-                    st.markdown("##### Content Preview")
-
-                    # 6. Render the styled box using st.markdown
-                    st.markdown(markdown_content, unsafe_allow_html=True)
-                else:
-                    st.warning("No article text extracted")
-            else:
-                st.error(f"**Failed to process:** {url}")
-                st.write(f"**Status:** {status}")
-                if "error" in entry:
-                    st.write(f"**Error Details:** {entry['error']}")
+    title = fix_mojibake(row["title"] or "Untitled Article")
+    authors = fix_mojibake(row["authors"] or "N/A")
+    text_preview = fix_mojibake(row["article_text"] or "")
+    source = fix_mojibake(row["source"] or "N/A")
+    published_date = fix_mojibake(row["published_date"] or "N/A")
+    modified_date = fix_mojibake(row["modified_date"] or "N/A")
+
+    # Create two columns for better layout
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.markdown(f"**📰 Title:** {title}")
+        st.markdown(f"**🔗 URL:** [{url}]({url})")
+        st.markdown(f"**✍️ Author(s):** {authors}")
+
+    with col2:
+        st.markdown(f"**📅 Published:** {published_date}")
+        if modified_date and modified_date != "N/A" and modified_date != published_date:
+            st.markdown(f"**🔄 Updated:** {modified_date}")
+        st.markdown(f"**🤖 LLM:** `{row['llm_used']}`")
+        st.markdown(f"**📊 Source:** {source}")
+
+    # Article text preview
+    if text_preview:
+        st.markdown("**📝 Article Preview:**")
+        preview_length = min(1000, len(text_preview))
+
+        # 1. Prepare the text content (same logic as before)
+        text_to_display = text_preview[:preview_length]
+        if len(text_preview) > preview_length:
+            text_to_display += "..."
+
+        # 2. Escape the text to prevent it from being interpreted as HTML
+        safe_text = html.escape(text_to_display)
+
+        # 3. Define the CSS for the styled box
+        # You can customize colors, padding, etc. here
+        css_style = """
+            background-color: #f0f2f6;
+            border: 1px solid #e6e6e6;
+            border-radius: 0.5rem;
+            padding: 1rem;
+            height: 200px;
+            overflow-y: auto;
+            font-family: 'Source Sans Pro', sans-serif;
+            color: #262730;
+        """
+        # We replace newlines with spaces for the HTML style attribute
+        css_style_str = css_style.replace("\n", " ")
+
+        # 4. Create the HTML for the box using an f-string
+        markdown_content = f'<div style="{css_style_str}">{safe_text}</div>'
+
+        # 5. Add a header (optional, but good practice since the original label was collapsed)
+        st.markdown("##### Content Preview")
+
+        # 6. Render the styled box using st.markdown
+        st.markdown(markdown_content, unsafe_allow_html=True)
+    else:
+        st.warning("No article text extracted")
 
 
 # --- Main Application ---
@@ -609,8 +740,16 @@ def main():
     # Sidebar with settings
     with st.sidebar:
         st.header("⚙️ Settings")
-        max_urls = st.slider("Max URLs to process", 1, Config.MAX_URLS, 20)
-        timeout_seconds = st.slider("Timeout per URL (seconds)", 10, 120, 30)
+        max_urls = st.number_input(
+            "Max URLs to process", 1, Config.MAX_URLS, 1000, step=100
+        )
+        timeout_seconds = st.slider(
+            "Timeout per URL (seconds)",
+            10,
+            120,
+            30,
+            help="One budget for scraping, parsing and the LLM together.",
+        )
 
     # Main content
     st.header("📥 Input URLs")
@@ -646,92 +785,36 @@ def main():
 
     # Process form submission
     if submitted:
-        urls_to_process = []
-        error_message = None
+        spool_path, url_count, error_message = None, 0, None
 
-        # Process text input first
-        if input_urls_text:
-            urls_to_process = parse_urls_from_text(input_urls_text)
+        # Process text input first; either way the URLs are spooled to disk
+        if input_urls_text.strip():
+            spool_path, url_count, _, error_message = spool_input_urls(
+                io.BytesIO(input_urls_text.encode("utf-8")), max_urls
+            )
 
         # Process file input if no text input
         elif uploaded_file:
-            urls_to_process, error_message = parse_urls_from_file(uploaded_file)
+            spool_path, url_count, error_message = spool_uploaded_file(
+                uploaded_file, max_urls
+            )
 
         # Validation
         if error_message:
             st.error(f"❌ {error_message}")
-        elif not urls_to_process:
+        elif spool_path is None:
             st.warning(
                 "⚠️ Please provide URLs either in the text area or by uploading a file."
             )
-        elif len(urls_to_process) > max_urls:
-            st.error(
-                f"❌ Too many URLs ({len(urls_to_process)}). Maximum allowed: {max_urls}"
-            )
         else:
+            # Runs on the job queue in shards; progress is polled below, and
+            # the job keeps going if the page is reloaded.
+            submit_job(spool_path, url_count, timeout_seconds)
+            st.toast(f"🚀 Queued {url_count:,} URLs")
 
-            # --- MODIFIED PART ---
-            # Start processing immediately after the first button press
-            process_urls_enhanced(urls_to_process, timeout_seconds)
-            # --- END OF MODIFICATION ---
-
+    display_active_jobs()
     # Display results
-    display_enhanced_results()
-
-
-def process_urls_enhanced(urls: List[str], timeout_seconds: int):
-    """Enhanced URL processing with better status updates"""
-
-    output_filename = (
-        Config.OUTPUT_DIR
-        / f"processed_urls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    )
-
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_container = st.empty()
-
-    def enhanced_status_callback(message: str, progress: float = None):
-        """Enhanced status callback with progress tracking"""
-        status_container.info(f"🔄 {message}")
-        if progress is not None:
-            progress_bar.progress(min(progress, 1.0))
-        logging.info(f"Processing: {message}")
-
-    try:
-        with st.spinner("🚀 Processing URLs..."):
-            start_time = time.time()
-
-            # Process URLs
-            results = process_urls(
-                urls,
-                str(output_filename),
-                status_callback=enhanced_status_callback,
-                # timeout=timeout_seconds,
-            )
-
-            processing_time = time.time() - start_time
-
-            # Store results and history
-            st.session_state.scraping_result = results
-
-            # Clear progress indicators
-            progress_bar.progress(1.0)
-            status_container.success(
-                f"✅ Processing completed in {processing_time:.1f} seconds!"
-            )
-
-            # Show success message
-            st.success(f"🎉 Successfully processed {len(urls)} URLs!")
-
-    except Exception as e:
-        st.error(f"❌ Processing failed: {str(e)}")
-        logging.error(f"Processing error: {str(e)}")
-    finally:
-        # Clean up progress indicators after a delay
-        time.sleep(2)
-        progress_bar.empty()
-        status_container.empty()
+    display_job_history()
 
 
 if __name__ == "__main__":
@@ -1,25 +1,82 @@
 # batch_website_scraper.py
+import argparse
 import csv
 import logging
-import re
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable, Optional
 from functools import lru_cache
 import time
 
-from bs4 import BeautifulSoup
-
-from config import CHAR_LIMIT, GEMINI_MODEL, BEGIN_ROW, END_ROW
+from config import (
+    CHAR_LIMIT,
+    GEMINI_MODEL,
+    BEGIN_ROW,
+    END_ROW,
+    ASYNC_MAX_CONCURRENCY,
+    ASYNC_PER_DOMAIN_LIMIT,
+    CSV_FLUSH_EVERY,
+    CSV_FLUSH_SECONDS,
+    PIPELINE_FETCH_WORKERS,
+    PARSE_PROCESSES,
+    PIPELINE_LLM_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    STRUCTURED_METADATA_ENABLED,
+    NEAR_DUPLICATE_ENABLED,
+    PROMPT_COMPACTION_ENABLED,
+    URL_TIMEOUT_SECONDS,
+)
 from utils.llm_utils import (
     ArticleInfo,
+    build_batch_request,
+    cache_article_info,
     gemini_extract_article_info,
+    get_cached_article_info,
+    parse_article_info,
     ollama_parse_url_metadata,
-    process_urls_sync,  # Import the new batch processing function
+    PROMPT_VERSION,
+)
+from utils.scraping_utils import fetch_html, fetch_html_async, fix_mojibake
+from utils.async_browser_pool import AsyncBrowserPool
+from utils.http_fetcher import new_async_http_client
+from utils.pipeline import PipelineStage, Finished, run_pipeline
+from utils.domain_scheduler import DomainScheduler
+from utils.deadlines import (
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    run_with_deadline,
+)
+from utils.url_utils import url_domain
+from utils.url_dedupe import CanonicalUrlGroups
+from utils.routing_rules import (
+    ACTION_SKIP,
+    ACTION_URL_ONLY,
+    RoutingRules,
+    get_routing_rules,
+)
+from utils.html_parsing import get_parse_executor, parse_html_page
+from utils.llm_cache import get_llm_cache
+from utils.results_store import ARTICLE_FIELDS, get_results_store
+from utils.parquet_results import ParquetResultWriter
+from utils.rate_limiter import get_llm_limiter
+from utils.prompt_compaction import compact_pass_dict, compaction_stats
+from utils.llm_batch import (
+    BatchProvider,
+    BatchRequestWriter,
+    get_batch_provider,
+    iter_batch_results,
+    wait_for_batch,
+)
+from utils.structured_metadata import StructuredMetadata, extract_structured_metadata
+from utils.near_duplicates import (
+    get_near_duplicate_index,
+    remember_extraction,
+    reuse_near_duplicate,
 )
-from utils.scraping_utils import scrape_site, fix_mojibake
-from utils.json_ld_finder import extract_ld_json_and_article
 
 # --- Setup Logging ---
 logging.basicConfig(
@@ -39,14 +96,6 @@ def load_urls_from_file(file_path: Path) -> list[str]:
         return [line.strip() for line in f if line.strip()]
 
 
-@lru_cache(maxsize=1)
-def get_naughty_link_bases() -> set[str]:
-    """Cached naughty links to avoid repeated file reads."""
-    naughty_links_path = Path("txt_files/new_naughty_links.txt")
-    urls = load_urls_from_file(naughty_links_path)
-    return {"/".join(link.split("/")[:3]) for link in urls}
-
-
 def has_good_json_ld_dates(json_ld_data: dict) -> bool:
     """Check if JSON-LD has good date information."""
     if not json_ld_data:
@@ -63,31 +112,6 @@ def has_good_json_ld_dates(json_ld_data: dict) -> bool:
     return any(json_ld_data.get(field) for field in date_fields)
 
 
-def clean_content_fast(soup: BeautifulSoup) -> str:
-    """Faster content cleaning with targeted removal."""
-    # Remove unwanted elements in one pass
-    unwanted_tags = ["script", "style", "nav", "footer", "aside", "form", "header"]
-
-    for tag_name in unwanted_tags:
-        for element in soup.find_all(tag_name):
-            element.decompose()
-
-    # Get main content with priority order
-    content_candidates = [
-        soup.find("article"),
-        soup.find("main"),
-        soup.body,
-    ]
-
-    main_content = next((c for c in content_candidates if c), soup)
-    if not main_content:
-        return ""
-
-    # Extract text more efficiently
-    content_text = main_content.get_text(separator=" ", strip=True)
-    return re.sub(r"\s+", " ", content_text).strip()
-
-
 def write_csv_header(writer):
     """CSV header writing."""
     writer.writerow(
@@ -141,19 +165,38 @@ def write_csv_row(writer, result: dict):
         )
 
 
+def result_record(result: dict) -> dict:
+    """A result as a Parquet row (RESULT_SCHEMA): full article text, no CHAR_LIMIT."""
+    record = {
+        "url": result.get("url"),
+        "llm_used": result.get("llm_used"),
+        "status": result.get("status"),
+        "processing_seconds": result.get("processing_time"),
+    }
+    info = result.get("article_info")
+    if isinstance(info, ArticleInfo):
+        record.update(info.model_dump())
+        record["article_text"] = fix_mojibake(info.article_text)
+    else:
+        record["error_message"] = result.get("error_message", "Unknown error")
+    return record
+
+
 # --- Core Processing Logic (HEAVILY OPTIMIZED) ---
 
 
-def process_single_url_fast(
+def route_url(
     url: str,
-    naughty_link_bases: set,
+    rules: RoutingRules | None = None,
     status_callback: Callable[[str], None] = lambda msg: None,
-) -> dict:
+) -> dict | None:
     """
-    Optimized single URL processing with better error handling and speed.
-    """
-    start_time = time.time()
+    Handles URLs that never need a page fetch.
 
+    Returns a finished result for invalid URLs and for URLs whose routing
+    rule is `url_only` or `skip`, or None when the URL should be scraped
+    (rules pinning a fetch tier are applied by `fetch_html`).
+    """
     # Quick validation
     if not url or not url.startswith(("http://", "https://")):
         return {
@@ -164,218 +207,996 @@ def process_single_url_fast(
             "llm_used": "N/A",
         }
 
-    base_url = "/".join(url.split("/")[:3])
-
-    # Handle naughty list
-    if base_url in naughty_link_bases:
-        status_callback(f"Using local parser for naughty site: {url}")
-        logging.info(f"URL on naughty list, parsing with Ollama: {url}")
-        try:
-            article_info = ollama_parse_url_metadata(url)
-            if article_info:
-                return {
-                    "url": url,
-                    "article_info": article_info,
-                    "status": "success_url_parser",
-                    "llm_used": "ollama-url-parser",
-                }
-            else:
-                raise ValueError("Ollama parser returned None")
-        except Exception as e:
-            logging.error(f"Ollama URL parser failed for {url}: {e}")
+    rule = (rules or get_routing_rules()).match(url)
+    if rule is None or rule.action not in (ACTION_URL_ONLY, ACTION_SKIP):
+        return None
+
+    if rule.action == ACTION_SKIP:
+        status_callback(f"⏭️ Skipped by routing rule: {url}")
+        logging.info(f"Skipping {url} ({rule.source})")
+        return {
+            "url": url,
+            "article_info": None,
+            "status": "skipped_by_rule",
+            "error_message": f"Skipped by routing rule {rule.pattern} ({rule.source})",
+            "llm_used": "N/A",
+        }
+
+    status_callback(f"Using local parser for URL-only site: {url}")
+    logging.info(f"URL routed to url_only ({rule.source}), parsing with Ollama: {url}")
+    try:
+        article_info = ollama_parse_url_metadata(url)
+        if article_info:
             return {
                 "url": url,
-                "article_info": None,
-                "status": "error_url_parser",
-                "error_message": str(e),
+                "article_info": article_info,
+                "status": "success_url_parser",
                 "llm_used": "ollama-url-parser",
             }
+        else:
+            raise ValueError("Ollama parser returned None")
+    except Exception as e:
+        logging.error(f"Ollama URL parser failed for {url}: {e}")
+        return {
+            "url": url,
+            "article_info": None,
+            "status": "error_url_parser",
+            "error_message": str(e),
+            "llm_used": "ollama-url-parser",
+        }
 
-    try:
-        # Step 1: Scraping (with timeout handling)
-        status_callback(f"🌐 Scraping: {url}")
-        logging.info(f"Scraping: {url}")
 
-        html_bytes = scrape_site(url)
-        soup = BeautifulSoup(html_bytes, "html.parser")
+def scraping_error_result(
+    url: str, error: Exception, start_time: float, deadline: Deadline | None = None
+) -> dict:
+    """
+    Builds the result row for a URL whose scrape, parse or LLM step failed.
 
-        # Step 2: Extract JSON-LD data
-        status_callback("📊 Extracting JSON-LD metadata...")
-        json_ld_data = extract_ld_json_and_article(soup)
+    A URL whose `deadline` ran out gets status `error_timeout`, whichever
+    step noticed first.
+    """
+    processing_time = time.time() - start_time
+    timed_out = isinstance(error, DeadlineExceeded) or (
+        deadline is not None and deadline.expired
+    )
+    if timed_out:
+        logging.error(f"Timed out processing {url}: {error}")
+    else:
+        logging.error(f"Full scraping/parsing failed for {url}: {error}")
+    return {
+        "url": url,
+        "article_info": None,
+        "status": "error_timeout" if timed_out else "error_scraping",
+        "error_message": f"Failed after {processing_time:.2f}s: {str(error)}",
+        "llm_used": "N/A",
+        "processing_time": processing_time,
+    }
 
-        # Step 3: Fast content cleaning
-        status_callback("🧹 Cleaning content...")
-        content_text = clean_content_fast(soup)
 
-        # Truncate very long content for speed
-        if len(content_text) > 50000:
-            content_text = content_text[:50000] + "... [truncated for processing speed]"
-            logging.info(f"Content truncated for {url}")
+def build_pass_dict(
+    url: str,
+    parsed: dict,
+    status_callback: Callable[[str], None] = lambda msg: None,
+    structured: StructuredMetadata | None = None,
+) -> dict:
+    """
+    Turns the output of `parse_html_page` into the `pass_dict` sent to the LLM.
 
-        # Step 4: Prepare data for LLM
-        pass_dict = {
-            "url": url,
-            "website_content": fix_mojibake(content_text) if content_text else "",
-        }
+    With a `structured` extraction, the confidently known fields are passed
+    as hints, the LLM is told which fields it still has to fill, and the
+    page text is cut to a short excerpt when the body is already known.
+    With PROMPT_COMPACTION_ENABLED the result is passed through
+    `compact_pass_dict`.
+    """
+    json_ld_data = parsed["json_ld"]
+    content_text = parsed["content_text"]
+
+    # Truncate very long content for speed
+    if len(content_text) > 50000:
+        content_text = content_text[:50000] + "... [truncated for processing speed]"
+        logging.info(f"Content truncated for {url}")
+    if structured is not None and structured.is_confident("article_text"):
+        content_text = content_text[:2000]
+
+    # Step 4: Prepare data for LLM
+    pass_dict = {
+        "url": url,
+        "website_content": fix_mojibake(content_text) if content_text else "",
+    }
 
-        # Add JSON-LD if available
-        if json_ld_data:
-            pass_dict["json_ld"] = json_ld_data
+    # Add JSON-LD if available
+    if json_ld_data:
+        pass_dict["json_ld"] = json_ld_data
 
-        # If JSON-LD doesn't have good date info, pass raw HTML for date extraction
-        if not has_good_json_ld_dates(json_ld_data):
-            status_callback("📅 No good dates in JSON-LD, including raw HTML...")
-            # Get raw HTML (truncated for LLM efficiency)
-            raw_html = str(soup)[:20000]  # Limit to first 20k chars
-            pass_dict["raw_html_for_dates"] = raw_html
-            logging.info(f"Including raw HTML for date extraction: {url}")
+    if structured is not None:
+        pass_dict["known_fields"] = structured.known_metadata()
+        pass_dict["fields_to_extract"] = structured.unknown_fields()
 
-        # Step 5: LLM extraction
-        status_callback("🤖 Analyzing URL content...")
-        logging.info(f"Extracting metadata with Gemini for: {url}")
+    # If JSON-LD doesn't have good date info, pass raw HTML for date extraction
+    dates_known = structured is not None and structured.is_confident("published_date")
+    if not has_good_json_ld_dates(json_ld_data) and not dates_known:
+        status_callback("📅 No good dates in JSON-LD, including raw HTML...")
+        # Raw HTML is already truncated for LLM efficiency
+        pass_dict["raw_html_for_dates"] = parsed["raw_html"]
+        logging.info(f"Including raw HTML for date extraction: {url}")
 
-        article_info = gemini_extract_article_info(pass_dict)
+    if PROMPT_COMPACTION_ENABLED:
+        pass_dict = compact_pass_dict(pass_dict, parsed)
+    return pass_dict
 
-        processing_time = time.time() - start_time
-        logging.info(f"✅ Processed {url} in {processing_time:.2f}s")
 
-        return {
-            "url": url,
-            "article_info": article_info,
-            "status": "success",
-            "llm_used": GEMINI_MODEL,
-        }
+def analyze_page(
+    url: str,
+    parsed: dict,
+    status_callback: Callable[[str], None] = lambda msg: None,
+) -> tuple[dict, StructuredMetadata | None]:
+    """
+    Scores the page's structured metadata and builds the LLM `pass_dict`.
 
-    except Exception as e:
-        processing_time = time.time() - start_time
-        error_msg = f"Failed after {processing_time:.2f}s: {str(e)}"
-        status_callback(f"❌ Error: {str(e)}")
-        logging.error(f"Full scraping/parsing failed for {url}: {e}")
-        return {
-            "url": url,
-            "article_info": None,
-            "status": "error_scraping",
-            "error_message": error_msg,
-            "llm_used": "N/A",
-        }
+    With NEAR_DUPLICATE_ENABLED, a page whose text matches an article
+    extracted earlier in the process (a syndicated copy) reuses that
+    article's body, so the LLM is asked only for the remaining fields.
+    """
+    structured = None
+    if STRUCTURED_METADATA_ENABLED:
+        structured = extract_structured_metadata(url, parsed)
+        if NEAR_DUPLICATE_ENABLED and reuse_near_duplicate(
+            url, parsed["content_text"], structured
+        ):
+            status_callback("♻️ Near-duplicate of an extracted article, reusing its text")
+    return build_pass_dict(url, parsed, status_callback, structured), structured
+
+
+def parse_fetched_html(
+    html_bytes: bytes,
+    status_callback: Callable[[str], None] = lambda msg: None,
+) -> dict:
+    """
+    Runs `parse_html_page` on the parse executor (CPU-bound stage).
 
+    Waits at most until the current `Deadline`; a parse still queued then
+    is cancelled.
+    """
+    # Steps 2-3: JSON-LD extraction and content cleaning, off the GIL
+    status_callback("📊 Extracting JSON-LD metadata and cleaning content...")
+    future = get_parse_executor().submit(parse_html_page, html_bytes)
+    deadline = current_deadline()
+    return deadline.wait(future, "parse") if deadline else future.result()
 
-# --- Batch Processing Functions (NEW) ---
 
+def prepare_llm_input(
+    url: str,
+    html_bytes: bytes,
+    status_callback: Callable[[str], None] = lambda msg: None,
+) -> tuple[dict, StructuredMetadata | None]:
+    """Parses fetched HTML into the `pass_dict` sent to the LLM."""
+    parsed = parse_fetched_html(html_bytes, status_callback)
+    return analyze_page(url, parsed, status_callback)
 
-def process_urls_batch_concurrent(
-    url_list: list[str],
-    output_filename: str,
-    status_callback: Optional[Callable[[str], None]] = None,
-    max_workers: int = 3,
-    use_batch_llm: bool = True,
+
+def needs_llm(structured: StructuredMetadata | None) -> bool:
+    """False when structured data already filled every required field."""
+    return structured is None or bool(structured.missing)
+
+
+def extract_with_llm(
+    url: str,
+    pass_dict: dict,
+    status_callback: Callable[[str], None] = lambda msg: None,
+    start_time: float | None = None,
+    structured: StructuredMetadata | None = None,
 ) -> dict:
     """
-    Process URLs with concurrent scraping and batch LLM processing.
+    Runs the Gemini extraction on a prepared `pass_dict` (I/O- and quota-bound stage).
+
+    When `structured` already has every required field the call is skipped;
+    otherwise its confident fields override the LLM's answer.
     """
-    _status_callback = status_callback or (lambda msg: None)
+    start_time = start_time or time.time()
 
-    output_path = Path(output_filename)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    naughty_link_bases = get_naughty_link_bases()
+    if not needs_llm(structured):
+        status_callback("🧩 Metadata complete from structured data, skipping LLM")
+        logging.info(f"Built metadata from structured data for: {url}")
+        return llm_result(url, None, structured, start_time)
+
+    # Step 5: LLM extraction
+    status_callback("🤖 Analyzing URL content...")
+    logging.info(f"Extracting metadata with Gemini for: {url}")
+
+    article_info = gemini_extract_article_info(pass_dict)
+    return llm_result(url, article_info, structured, start_time)
 
+
+def llm_result(
+    url: str,
+    article_info: ArticleInfo | None,
+    structured: StructuredMetadata | None,
+    start_time: float,
+    llm_used: str = GEMINI_MODEL,
+) -> dict:
+    """
+    Builds the result row from an LLM answer and/or structured metadata.
+
+    Confident structured fields override the LLM's answer; with no answer
+    and complete structured data the row is marked `success_structured`.
+    """
+    if article_info is None and not needs_llm(structured):
+        article_info = structured.to_article_info()
+        status, llm_used = "success_structured", "structured-data"
+    else:
+        if structured is not None and article_info is not None:
+            article_info = structured.to_article_info(article_info.model_dump())
+        status = "success"
+
+    if NEAR_DUPLICATE_ENABLED:
+        remember_extraction(url, structured, article_info)
+
+    processing_time = time.time() - start_time
+    logging.info(f"✅ Processed {url} in {processing_time:.2f}s")
+
+    result = {
+        "url": url,
+        "article_info": article_info,
+        "status": status,
+        "llm_used": llm_used,
+        "processing_time": processing_time,
+    }
+    if structured is not None:
+        result["field_confidence"] = dict(structured.confidence)
+    return result
+
+
+def process_html(
+    url: str,
+    html_bytes: bytes,
+    status_callback: Callable[[str], None] = lambda msg: None,
+    start_time: float | None = None,
+) -> dict:
+    """
+    Parses fetched HTML and runs the LLM extraction for one URL.
+
+    Raises whatever the parse or LLM step raises; callers turn that into an
+    error row with `scraping_error_result`.
+    """
+    start_time = start_time or time.time()
+    pass_dict, structured = prepare_llm_input(url, html_bytes, status_callback)
+    return extract_with_llm(url, pass_dict, status_callback, start_time, structured)
+
+
+def process_single_url_fast(
+    url: str,
+    rules: RoutingRules | None = None,
+    status_callback: Callable[[str], None] = lambda msg: None,
+    timeout_seconds: float | None = URL_TIMEOUT_SECONDS,
+) -> dict:
+    """
+    Optimized single URL processing with better error handling and speed.
+
+    Scrape, parse and LLM share one `Deadline` of `timeout_seconds`.
+    """
     start_time = time.time()
-    total_urls = len(url_list)
-    all_results = []
 
-    _status_callback(f"🚀 Starting batch processing of {total_urls} URLs...")
+    routed = route_url(url, rules, status_callback)
+    if routed is not None:
+        return routed
 
-    # Phase 1: Concurrent scraping and data preparation
-    scraping_results = []
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all scraping tasks
-        future_to_url = {
-            executor.submit(
-                process_single_url_fast,
-                url,
-                naughty_link_bases,
-                lambda msg, u=url: _status_callback(
-                    f"[{url_list.index(u)+1}/{total_urls}] {msg}"
-                ),
-            ): url
-            for url in url_list
-        }
+    deadline = Deadline(timeout_seconds, url)
+    try:
+        with deadline_scope(deadline):
+            # Step 1: Scraping (with timeout handling)
+            status_callback(f"🌐 Scraping: {url}")
+            logging.info(f"Scraping: {url}")
 
-        # Collect results as they complete
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                result = future.result()
-                scraping_results.append(result)
+            html_bytes = fetch_html(url)
+            return process_html(url, html_bytes, status_callback, start_time)
 
-                success_count = len(
-                    [r for r in scraping_results if r.get("status") == "success"]
-                )
-                _status_callback(
-                    f"✅ Completed {len(scraping_results)}/{total_urls} URLs ({success_count} successful)"
-                )
+    except Exception as e:
+        status_callback(f"❌ Error: {str(e)}")
+        return scraping_error_result(url, e, start_time, deadline)
 
-            except Exception as e:
-                logging.error(f"Future failed for {url}: {e}")
-                scraping_results.append(
-                    {
-                        "url": url,
-                        "article_info": None,
-                        "status": "error_future",
-                        "error_message": str(e),
-                        "llm_used": "N/A",
-                    }
-                )
 
-    # Phase 2: Batch LLM processing for failed items (if enabled)
-    if use_batch_llm:
-        failed_items = [
-            r
-            for r in scraping_results
-            if r.get("status") != "success" and "pass_dict" in r
-        ]
-        if failed_items:
-            _status_callback(
-                f"🔄 Retrying {len(failed_items)} failed items with batch processing..."
-            )
-            # This would use the batch processing from llm_utils
-            # Implementation depends on your specific needs
+# --- Streaming Output ---
 
-    all_results = scraping_results
 
-    # Write results to CSV
-    _status_callback("💾 Saving results to CSV...")
-    with output_path.open("w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        write_csv_header(writer)
+class StreamingResultWriter:
+    """
+    Streams result rows to the output CSV as each URL finishes.
+
+    Rows are flushed every CSV_FLUSH_EVERY rows or CSV_FLUSH_SECONDS, so a
+    crash loses at most that much work. An output named `*.parquet` is
+    written with `ParquetResultWriter` instead, a row group at a time; it
+    appears when the batch closes, and not at all if the batch raises. Every row is also saved to the
+    results store (`utils/results_store.py`) when it is enabled.
+    With `resume=True`, `skip_completed()` writes the stored rows of URLs
+    that already succeeded and reports them as done. Without a store,
+    rows already marked successful in an existing output are kept instead;
+    failed rows are dropped so those URLs are retried. Either way the
+    resumed URLs end up in `completed_urls`.
+    With `append=True`, rows are added after whatever the file already
+    holds (one shard of a larger job after another).
+    Full results are kept in memory only when `keep_results` is set.
+    """
 
-        for result in all_results:
-            write_csv_row(writer, result)
+    def __init__(
+        self,
+        output_path: Path,
+        resume: bool = False,
+        keep_results: bool = True,
+        append: bool = False,
+    ):
+        self.output_path = output_path
+        self.keep_results = keep_results
+        self.results: list[dict] = []
+        self.completed_urls: set[str] = set()
+        self.written = 0
+        self.successful = 0
+        self.resume = resume
+        self.store = get_results_store()
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._previous_output: Path | None = None
+        self._file = self._writer = self._parquet = None
+        if self.output_path.suffix == ".parquet":
+            self._parquet = ParquetResultWriter(self.output_path)
+            if append or (resume and self.store is None):
+                # Same rules as the CSV branches below.
+                done = self._parquet.carry_over(successful_only=not append)
+                if resume:
+                    self.completed_urls = done
+        elif resume and self.store is not None and self.output_path.exists():
+            # Rewritten from the store by skip_completed().
+            self._previous_output = self.output_path.with_suffix(".previous.tmp")
+            self.output_path.replace(self._previous_output)
+            self._open_new_csv()
+        elif resume and self.output_path.exists():
+            self._file = self._reopen_for_resume()
+            self._writer = csv.writer(self._file)
+        elif append and self.output_path.exists():
+            # The BOM was written with the header; append as plain UTF-8.
+            self._file = self.output_path.open("a", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+        else:
+            self._open_new_csv()
+        self._last_flush = time.time()
+
+    def _open_new_csv(self):
+        self._file = self.output_path.open("w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+        write_csv_header(self._writer)
+
+    def _reopen_for_resume(self):
+        """Keeps successful rows from the previous run and reopens for append."""
+        tmp_path = self.output_path.with_suffix(".resume.tmp")
+        with self.output_path.open(
+            "r", newline="", encoding="utf-8-sig", errors="replace"
+        ) as infile, tmp_path.open("w", newline="", encoding="utf-8-sig") as outfile:
+            reader = csv.reader(infile)
+            writer = csv.writer(outfile)
+            next(reader, None)  # Skip header
+            write_csv_header(writer)
+            for row in reader:
+                if len(row) > 7 and row[7].startswith("success"):
+                    writer.writerow(row)
+                    self.completed_urls.add(row[0])
+
+        tmp_path.replace(self.output_path)
+        logging.info(
+            f"Resuming {self.output_path}: {len(self.completed_urls)} URLs already done"
+        )
+        # The BOM was written with the header; append as plain UTF-8.
+        return self.output_path.open("a", newline="", encoding="utf-8")
+
+    def __enter__(self) -> "StreamingResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(aborted=exc_type is not None)
+
+    def skip_completed(self, url_list: list[str]) -> set[str]:
+        """
+        The URLs of `url_list` not to process again: with `resume` and a
+        store, each URL whose page already succeeded gets its stored row
+        written here, with one indexed lookup per URL.
+        """
+        if not (self.resume and self.store is not None):
+            return self.completed_urls
+        if self._previous_output is not None:
+            # Rows of an output written before the store existed.
+            self.store.import_csv(self._previous_output)
+            self._previous_output.unlink()
+        for url, row in self.store.successful(url_list):
+            if url in self.completed_urls:
+                continue
+            result = {
+                "url": url,
+                "article_info": ArticleInfo(
+                    **{field: row[field] or "N/A" for field in ARTICLE_FIELDS}
+                ),
+                "status": row["status"],
+                "llm_used": row["llm_used"],
+            }
+            self._write_row(result)
+            self.completed_urls.add(url)
+            if self.keep_results:
+                self.results.append(result)
+        if self.completed_urls:
+            logging.info(
+                f"Resuming {self.output_path}: {len(self.completed_urls)} URLs "
+                "already done in the results store"
+            )
+        return self.completed_urls
+
+    def _write_row(self, result: dict):
+        if self._parquet is not None:
+            self._parquet.write(result_record(result))
+        else:
+            write_csv_row(self._writer, result)
+
+    def write(self, result: dict):
+        self._write_row(result)
+        self.written += 1
+        if str(result.get("status", "")).startswith("success"):
+            self.successful += 1
+        if self.keep_results:
+            self.results.append(result)
+        if self.store is not None:
+            self._store_result(result)
+
+        if self._file is None:
+            return  # Parquet rows go out a row group at a time.
+        now = time.time()
+        if self.written % CSV_FLUSH_EVERY == 0 or now - self._last_flush > CSV_FLUSH_SECONDS:
+            self._file.flush()
+            self._last_flush = now
+
+    def _store_result(self, result: dict):
+        info = result.get("article_info")
+        llm_used = result.get("llm_used")
+        self.store.add(
+            result["url"],
+            result.get("status", ""),
+            article=info.model_dump() if isinstance(info, ArticleInfo) else None,
+            llm_used=llm_used,
+            error_message=result.get("error_message"),
+            prompt_version=(
+                PROMPT_VERSION
+                if str(llm_used).startswith(GEMINI_MODEL)
+                else None
+            ),
+            processing_seconds=result.get("processing_time"),
+        )
 
+    def close(self, aborted: bool = False):
+        if self._parquet is not None:
+            if aborted:
+                self._parquet.abort()
+            else:
+                self._parquet.close()
+        elif not self._file.closed:
+            self._file.flush()
+            self._file.close()
+        if self.store is not None:
+            self.store.flush()
+
+
+def summarize_batch(
+    sink: StreamingResultWriter,
+    total_urls: int,
+    start_time: float,
+    status_callback: Callable[[str], None],
+) -> dict:
+    """Logs the batch totals and builds the dict returned to callers."""
     total_time = time.time() - start_time
-    success_count = len([r for r in all_results if r.get("status") == "success"])
+    resumed = len(sink.completed_urls)
+    success_count = sink.successful + resumed
 
-    _status_callback(
+    status_callback(
         f"🎉 Complete! Processed {success_count}/{total_urls} URLs in {total_time:.1f}s"
     )
     logging.info(
-        f"Batch processing complete. {success_count}/{total_urls} successful in {total_time:.1f}s"
+        f"Batch processing complete. {success_count}/{total_urls} successful "
+        f"({resumed} resumed) in {total_time:.1f}s"
     )
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        logging.info(f"LLM cache: {llm_cache.stats()}")
+    logging.info(f"Gemini limiter: {get_llm_limiter().stats()}")
+    if PROMPT_COMPACTION_ENABLED:
+        logging.info(f"Prompt compaction: {compaction_stats.stats()}")
+    if NEAR_DUPLICATE_ENABLED:
+        logging.info(f"Near-duplicate index: {get_near_duplicate_index().stats()}")
 
     return {
-        "articles": all_results,
-        "file_path": str(output_path),
+        "articles": sink.results,
+        "file_path": str(sink.output_path),
         "stats": {
             "total": total_urls,
             "successful": success_count,
             "failed": total_urls - success_count,
+            "resumed": resumed,
             "processing_time": total_time,
         },
     }
 
 
-# --- Legacy Function (MODIFIED for backwards compatibility) ---
+# --- Batch Processing Functions (NEW) ---
+
+
+def schedule_jobs(groups: CanonicalUrlGroups, max_in_flight: int) -> DomainScheduler:
+    """Pipeline jobs for every canonical page still to process, interleaved by host."""
+    return DomainScheduler(
+        ({"index": i, "url": url} for i, url in enumerate(groups.fetch_urls, 1)),
+        key=lambda job: url_domain(job["url"]),
+        max_in_flight=max_in_flight,
+    )
+
+
+def within_deadline(
+    stage: str, fn: Callable[[dict], object], timeout_seconds: float | None
+) -> Callable[[dict], object]:
+    """
+    Wraps a pipeline stage so it runs under its job's `Deadline`.
+
+    The deadline is created when the job reaches its first stage; a job
+    already out of time fails without starting the next one.
+    """
+
+    def run(job: dict):
+        deadline = job.get("deadline")
+        if deadline is None:
+            deadline = job["deadline"] = Deadline(timeout_seconds, job["url"])
+        else:
+            deadline.check(stage)
+        with deadline_scope(deadline):
+            return fn(job)
+
+    return run
+
+
+def scheduled_fetch(scheduler: DomainScheduler, job: dict) -> bytes:
+    """`fetch_html` for a dispatched job, reporting the outcome to its host."""
+    try:
+        html_bytes = fetch_html(job["url"])
+    except Exception:
+        scheduler.release(job, False)
+        raise
+    scheduler.release(job, True)
+    return html_bytes
+
+
+def process_urls_batch_concurrent(
+    url_list: list[str],
+    output_filename: str,
+    status_callback: Optional[Callable[[str], None]] = None,
+    max_workers: int = PIPELINE_FETCH_WORKERS,
+    resume: bool = False,
+    keep_results: bool = True,
+    parse_workers: int = PARSE_PROCESSES,
+    llm_workers: int = PIPELINE_LLM_WORKERS,
+    timeout_seconds: float | None = URL_TIMEOUT_SECONDS,
+) -> dict:
+    """
+    Process URLs through a staged fetch -> parse -> LLM pipeline.
+
+    Each stage has its own thread pool (`max_workers` fetchers,
+    `parse_workers` threads feeding the parse process pool, `llm_workers`
+    rate-limited Gemini callers) and
+    bounded queues between them, so the Gemini quota stays busy while pages
+    are still downloading and a slow stage throttles the ones upstream.
+    URLs enter the fetch stage through a `DomainScheduler`, interleaved by
+    host and paced per host.
+    Each URL has `timeout_seconds` for all three stages together; see
+    `within_deadline`.
+    Each result is written to the output CSV as soon as it completes.
+    """
+    _status_callback = status_callback or (lambda msg: None)
+
+    output_path = Path(output_filename)
+    rules = get_routing_rules()
+
+    start_time = time.time()
+    total_urls = len(url_list)
+
+    _status_callback(f"🚀 Starting batch processing of {total_urls} URLs...")
+
+    def url_status(job: dict, msg: str):
+        _status_callback(f"[{job['index']}/{total_urls}] {msg}")
+
+    def fetch_stage(job: dict):
+        url = job["url"]
+        job["start_time"] = time.time()
+        merged_into = groups.claim(url)
+        if merged_into is not None:
+            scheduler.release(job, None)
+            return Finished(groups.duplicate_result(url, merged_into))
+        routed = route_url(url, rules, lambda msg: url_status(job, msg))
+        if routed is not None:
+            scheduler.release(job, None)
+            return Finished(routed)
+        url_status(job, f"🌐 Scraping: {url}")
+        logging.info(f"Scraping: {url}")
+        job["html_bytes"] = scheduled_fetch(scheduler, job)
+        return job
+
+    def parse_stage(job: dict):
+        on_status = lambda msg: url_status(job, msg)
+        parsed = parse_fetched_html(job.pop("html_bytes"), on_status)
+        groups.note_rel_canonical(job["url"], parsed.get("canonical_url"))
+        job["pass_dict"], job["structured"] = analyze_page(job["url"], parsed, on_status)
+        if not needs_llm(job["structured"]):
+            # Fully described by structured data: don't spend an LLM slot.
+            return Finished(llm_stage(job))
+        return job
+
+    def llm_stage(job: dict):
+        return extract_with_llm(
+            job["url"],
+            job["pass_dict"],
+            lambda msg: url_status(job, msg),
+            job["start_time"],
+            job["structured"],
+        )
+
+    def on_error(job: dict, error: Exception) -> dict:
+        url_status(job, f"❌ Error: {str(error)}")
+        return scraping_error_result(
+            job["url"], error, job["start_time"], job.get("deadline")
+        )
+
+    stages = [
+        PipelineStage(
+            "fetch", within_deadline("fetch", fetch_stage, timeout_seconds), max_workers
+        ),
+        PipelineStage(
+            "parse", within_deadline("parse", parse_stage, timeout_seconds), parse_workers
+        ),
+        # Pacing happens in the shared Gemini limiter, so cache hits and
+        # structured rows cost nothing and the async engine shares the quota.
+        PipelineStage(
+            "llm", within_deadline("LLM", llm_stage, timeout_seconds), llm_workers
+        ),
+    ]
+
+    with StreamingResultWriter(output_path, resume, keep_results) as sink:
+        groups = CanonicalUrlGroups(url_list, sink.skip_completed(url_list))
+        scheduler = schedule_jobs(groups, max_workers)
+
+        with scheduler:
+            for result in run_pipeline(scheduler, stages, on_error, PIPELINE_QUEUE_SIZE):
+                for row in groups.expand(result):
+                    sink.write(row)
+
+                _status_callback(
+                    f"✅ Completed {sink.written + len(sink.completed_urls)}/{total_urls} URLs "
+                    f"({sink.successful + len(sink.completed_urls)} successful)"
+                )
+        scheduler.log_stats()
+
+    return summarize_batch(sink, total_urls, start_time, _status_callback)
+
+
+# --- Async Engine ---
+
+
+async def process_urls_async(
+    url_list: list[str],
+    output_filename: str,
+    status_callback: Optional[Callable[[str], None]] = None,
+    max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+    per_domain_limit: int = ASYNC_PER_DOMAIN_LIMIT,
+    resume: bool = False,
+    keep_results: bool = True,
+    timeout_seconds: float | None = URL_TIMEOUT_SECONDS,
+    append: bool = False,
+) -> dict:
+    """
+    Process URLs from a single event loop on shared async Playwright browsers.
+
+    Page loads are bounded by a global semaphore and a `DomainScheduler`
+    (per-host concurrency, delay and error backoff) instead of by thread count. Parsing and the Gemini call are blocking, so
+    they run on their own parse and LLM thread pools and never stall the
+    loop. Each URL runs under `asyncio.timeout` for `timeout_seconds`, so
+    its outstanding awaits are cancelled when the budget runs out; the
+    worker threads see the same `Deadline`. Results are streamed to the
+    output CSV as each URL completes.
+    """
+    _status_callback = status_callback or (lambda msg: None)
+
+    output_path = Path(output_filename)
+    rules = get_routing_rules()
+
+    start_time = time.time()
+    total_urls = len(url_list)
+    loop = asyncio.get_running_loop()
+    global_limit = asyncio.Semaphore(max_concurrency)
+
+    _status_callback(f"🚀 Starting async processing of {total_urls} URLs...")
+
+    parse_executor = get_parse_executor()
+
+    with StreamingResultWriter(
+        output_path, resume, keep_results, append
+    ) as sink, ThreadPoolExecutor(
+        max_workers=PIPELINE_LLM_WORKERS, thread_name_prefix="llm"
+    ) as llm_executor:
+        async with AsyncBrowserPool() as pool, new_async_http_client() as http_client:
+
+            async def process_one(job: dict) -> dict:
+                url = job["url"]
+                # None until the fetch starts, then whether it succeeded; the
+                # host's slot is released exactly once, with this outcome.
+                fetch_ok: bool | None = None
+                released = False
+
+                def release_slot():
+                    nonlocal released
+                    if not released:
+                        released = True
+                        scheduler.release(job, fetch_ok)
+
+                def url_status(msg: str):
+                    _status_callback(f"[{job['index']}/{total_urls}] {msg}")
+
+                url_start = time.time()
+                deadline = Deadline(timeout_seconds, url)
+
+                async def scrape_and_extract() -> dict:
+                    nonlocal fetch_ok
+                    # The global limit spans the whole URL so fetched pages
+                    # waiting on the LLM stage hold back new fetches.
+                    async with global_limit:
+                        url_status(f"🌐 Scraping: {url}")
+                        logging.info(f"Scraping: {url}")
+                        fetch_ok = False
+                        html_bytes = await fetch_html_async(pool, http_client, url)
+                        fetch_ok = True
+                        # Free the host for its next URL while this one parses.
+                        release_slot()
+
+                        url_status("📊 Extracting JSON-LD metadata and cleaning content...")
+                        parsed = await loop.run_in_executor(
+                            parse_executor, parse_html_page, html_bytes
+                        )
+                        del html_bytes
+                        groups.note_rel_canonical(url, parsed.get("canonical_url"))
+                        pass_dict, structured = analyze_page(url, parsed, url_status)
+                        if not needs_llm(structured):
+                            return extract_with_llm(
+                                url, pass_dict, url_status, url_start, structured
+                            )
+                        # Executor threads don't inherit the task's context.
+                        return await loop.run_in_executor(
+                            llm_executor,
+                            run_with_deadline,
+                            deadline,
+                            extract_with_llm,
+                            url,
+                            pass_dict,
+                            url_status,
+                            url_start,
+                            structured,
+                        )
+
+                try:
+                    merged_into = groups.claim(url)
+                    if merged_into is not None:
+                        return groups.duplicate_result(url, merged_into)
+                    routed = await loop.run_in_executor(
+                        llm_executor, route_url, url, rules, url_status
+                    )
+                    if routed is not None:
+                        return routed
+
+                    with deadline_scope(deadline):
+                        return await asyncio.wait_for(
+                            scrape_and_extract(), deadline.remaining()
+                        )
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError) and deadline.expired:
+                        e = deadline.exceeded()
+                    url_status(f"❌ Error: {str(e)}")
+                    return scraping_error_result(url, e, url_start, deadline)
+                finally:
+                    # Cancelled or failed anywhere above: never leak the slot.
+                    release_slot()
+
+            # Hosts are interleaved and paced by the scheduler; a task is
+            # only created once its host has a free, polite slot.
+            groups = CanonicalUrlGroups(url_list, sink.skip_completed(url_list))
+            scheduler = DomainScheduler(
+                (
+                    {"index": i, "url": url}
+                    for i, url in enumerate(groups.fetch_urls, 1)
+                ),
+                key=lambda job: url_domain(job["url"]),
+                max_in_flight=max_concurrency,
+                per_domain=per_domain_limit,
+            )
+            tasks: set[asyncio.Task] = set()
+            with scheduler:
+                dispatching = True
+                jobs = scheduler.iter_async()
+                next_job = asyncio.ensure_future(anext(jobs, None))
+                while dispatching or tasks:
+                    waiting = tasks | ({next_job} if dispatching else set())
+                    done, _ = await asyncio.wait(
+                        waiting, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for finished in done:
+                        if finished is next_job:
+                            job = finished.result()
+                            if job is None:
+                                dispatching = False
+                            else:
+                                tasks.add(asyncio.create_task(process_one(job)))
+                                next_job = asyncio.ensure_future(anext(jobs, None))
+                            continue
+                        tasks.discard(finished)
+                        for row in groups.expand(finished.result()):
+                            sink.write(row)
+                        _status_callback(
+                            f"✅ Completed {sink.written + len(sink.completed_urls)}/{total_urls} URLs "
+                            f"({sink.successful + len(sink.completed_urls)} successful)"
+                        )
+            scheduler.log_stats()
+
+    return summarize_batch(sink, total_urls, start_time, _status_callback)
+
+
+# --- Offline Batch Jobs ---
+
+
+def process_urls_batch_job(
+    url_list: list[str],
+    output_filename: str,
+    status_callback: Optional[Callable[[str], None]] = None,
+    provider: BatchProvider | None = None,
+    resume: bool = False,
+    keep_results: bool = True,
+    max_workers: int = PIPELINE_FETCH_WORKERS,
+    parse_workers: int = PARSE_PROCESSES,
+    timeout_seconds: float | None = URL_TIMEOUT_SECONDS,
+) -> dict:
+    """
+    Fetches and parses every URL, then runs all LLM extractions as one batch job.
+
+    Rows that need no LLM call (routed URLs, errors, cache hits, complete
+    structured data) are written as they finish. Every other `pass_dict` is
+    written to `<output>.batch_requests.jsonl`, submitted to `provider`
+    (default: `get_batch_provider()`), polled until done, and merged back
+    by URL. Per-URL latency is hours instead of seconds, in exchange for
+    batch pricing and no pressure on the per-minute quota. An interrupted
+    run resubmits only the URLs that are not yet in the output file.
+    `timeout_seconds` bounds each URL's fetch and parse; the batch job
+    itself is not subject to it.
+    """
+    _status_callback = status_callback or (lambda msg: None)
+    provider = provider or get_batch_provider()
+
+    output_path = Path(output_filename)
+    requests_path = output_path.with_suffix(".batch_requests.jsonl")
+    results_path = output_path.with_suffix(".batch_results.jsonl")
+    rules = get_routing_rules()
+
+    start_time = time.time()
+    total_urls = len(url_list)
+    _status_callback(f"🚀 Preparing {total_urls} URLs for a batch job...")
+
+    def url_status(job: dict, msg: str):
+        _status_callback(f"[{job['index']}/{total_urls}] {msg}")
+
+    def fetch_stage(job: dict):
+        job["start_time"] = time.time()
+        merged_into = groups.claim(job["url"])
+        if merged_into is not None:
+            scheduler.release(job, None)
+            return Finished(groups.duplicate_result(job["url"], merged_into))
+        routed = route_url(job["url"], rules, lambda msg: url_status(job, msg))
+        if routed is not None:
+            scheduler.release(job, None)
+            return Finished(routed)
+        job["html_bytes"] = scheduled_fetch(scheduler, job)
+        return job
+
+    def parse_stage(job: dict):
+        on_status = lambda msg: url_status(job, msg)
+        parsed = parse_fetched_html(job.pop("html_bytes"), on_status)
+        groups.note_rel_canonical(job["url"], parsed.get("canonical_url"))
+        job["pass_dict"], job["structured"] = analyze_page(job["url"], parsed, on_status)
+        if not needs_llm(job["structured"]):
+            return Finished(
+                llm_result(job["url"], None, job["structured"], job["start_time"])
+            )
+        cached = get_cached_article_info(job["pass_dict"])
+        if cached is not None:
+            return Finished(
+                llm_result(job["url"], cached, job["structured"], job["start_time"])
+            )
+        return job
+
+    def on_error(job: dict, error: Exception) -> dict:
+        url_status(job, f"❌ Error: {str(error)}")
+        return scraping_error_result(
+            job["url"], error, job["start_time"], job.get("deadline")
+        )
+
+    stages = [
+        PipelineStage(
+            "fetch", within_deadline("fetch", fetch_stage, timeout_seconds), max_workers
+        ),
+        PipelineStage(
+            "parse", within_deadline("parse", parse_stage, timeout_seconds), parse_workers
+        ),
+    ]
+
+    with StreamingResultWriter(output_path, resume, keep_results) as sink:
+        groups = CanonicalUrlGroups(url_list, sink.skip_completed(url_list))
+        scheduler = schedule_jobs(groups, max_workers)
+        # fetch url -> [(structured, start_time)] awaiting the job.
+        pending: dict[str, list] = defaultdict(list)
+        pass_dicts: dict[str, dict] = {}
+
+        def write(result: dict):
+            for row in groups.expand(result):
+                sink.write(row)
+
+        with scheduler, BatchRequestWriter(requests_path, build_batch_request) as requests:
+            for item in run_pipeline(scheduler, stages, on_error, PIPELINE_QUEUE_SIZE):
+                if "status" in item:
+                    write(item)
+                    continue
+                url = item["url"]
+                if requests.add(url, item["pass_dict"]):
+                    pass_dicts[url] = item["pass_dict"]
+                pending[url].append((item["structured"], item["start_time"]))
+        scheduler.log_stats()
+
+        if pending:
+            _status_callback(
+                f"📦 Submitting {requests.count} LLM requests as a {provider.name} job..."
+            )
+            try:
+                job_name = provider.submit(requests_path, output_path.stem)
+                wait_for_batch(provider, job_name, _status_callback)
+                provider.download_results(job_name, results_path)
+            except Exception as e:
+                logging.error(f"Batch job failed: {e}")
+                results = []
+            else:
+                results = iter_batch_results(results_path)
+
+            llm_used = f"{GEMINI_MODEL}-batch"
+            for url, text, error in results:
+                waiting = pending.pop(url, [])
+                article_info = None
+                if text is not None:
+                    try:
+                        article_info = parse_article_info(text)
+                        cache_article_info(pass_dicts[url], article_info)
+                    except Exception as e:
+                        error = f"Invalid batch response: {e}"
+                for structured, url_start in waiting:
+                    if article_info is not None:
+                        write(llm_result(url, article_info, structured, url_start, llm_used))
+                    else:
+                        write(batch_error_result(url, error))
+
+            for url, waiting in pending.items():
+                for _ in waiting:
+                    write(batch_error_result(url, "No result returned by the batch job"))
+
+    return summarize_batch(sink, total_urls, start_time, _status_callback)
+
+
+def batch_error_result(url: str, error: str | None) -> dict:
+    """Result row for a URL whose batch-job request failed."""
+    return {
+        "url": url,
+        "article_info": None,
+        "status": "error_llm_batch",
+        "error_message": error or "Unknown batch error",
+        "llm_used": f"{GEMINI_MODEL}-batch",
+    }
 
 
 def process_urls(
@@ -383,23 +1204,59 @@ def process_urls(
     output_filename: str,
     status_callback: Optional[Callable[[str], None]] = None,
     use_concurrent: bool = True,
+    resume: bool = False,
+    keep_results: bool = True,
+    timeout_seconds: float | None = URL_TIMEOUT_SECONDS,
+    append: bool = False,
 ) -> dict:
     """
     Main processing function with option for concurrent or sequential processing.
+
+    Concurrent runs are a thin synchronous wrapper around `process_urls_async`.
+    Every engine collapses URLs with the same canonical form (and pages
+    merged by `<link rel=canonical>`) into one fetch, then writes one output
+    row per original URL.
+    With `resume=True`, URLs already marked successful in an existing output
+    file are skipped. Pass `keep_results=False` for large batches so memory
+    stays flat; the CSV is then the only copy of the results.
+    Each URL gets `timeout_seconds` end to end (scrape, parse and LLM);
+    a URL that runs out is written with status `error_timeout`.
+    With `append=True`, rows are added to an existing output file instead
+    of replacing it, so a large job can be fed through in shards.
     """
     if use_concurrent and len(url_list) > 1:
-        return process_urls_batch_concurrent(
-            url_list, output_filename, status_callback, max_workers=3
+        return asyncio.run(
+            process_urls_async(
+                url_list,
+                output_filename,
+                status_callback,
+                resume=resume,
+                keep_results=keep_results,
+                timeout_seconds=timeout_seconds,
+                append=append,
+            )
         )
     else:
         # Fallback to sequential processing for single URLs or when requested
-        return process_urls_sequential(url_list, output_filename, status_callback)
+        return process_urls_sequential(
+            url_list,
+            output_filename,
+            status_callback,
+            resume,
+            keep_results,
+            timeout_seconds,
+            append,
+        )
 
 
 def process_urls_sequential(
     url_list: list[str],
     output_filename: str,
     status_callback: Optional[Callable[[str], None]] = None,
+    resume: bool = False,
+    keep_results: bool = True,
+    timeout_seconds: float | None = URL_TIMEOUT_SECONDS,
+    append: bool = False,
 ) -> dict:
     """
     Original sequential processing (kept for compatibility).
@@ -407,30 +1264,49 @@ def process_urls_sequential(
     _status_callback = status_callback or (lambda msg: None)
 
     output_path = Path(output_filename)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    naughty_link_bases = get_naughty_link_bases()
-    all_results = []
-
-    with output_path.open("w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        write_csv_header(writer)
+    rules = get_routing_rules()
+    start_time = time.time()
 
+    with StreamingResultWriter(output_path, resume, keep_results, append) as sink:
         total_urls = len(url_list)
-        for i, url in enumerate(url_list, 1):
+        groups = CanonicalUrlGroups(url_list, sink.skip_completed(url_list))
+        for i, url in enumerate(groups.fetch_urls, 1):
             _status_callback(f"Starting URL {i}/{total_urls}: {url}")
             logging.info(f"--- Processing URL {i}/{total_urls}: {url} ---")
 
-            result = process_single_url_fast(url, naughty_link_bases, _status_callback)
-            all_results.append(result)
-            write_csv_row(writer, result)
+            result = process_single_url_fast(
+                url, rules, _status_callback, timeout_seconds
+            )
+            for row in groups.expand(result):
+                sink.write(row)
 
     logging.info(f"Processing complete. Results saved to {output_path}")
-    return {"articles": all_results, "file_path": str(output_path)}
+    return summarize_batch(sink, total_urls, start_time, _status_callback)
 
 
 # --- Main Execution ---
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scrape and parse the BEGIN_ROW:END_ROW slice of Links.txt."
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Overwrite the slice's output instead of resuming from it.",
+    )
+    parser.add_argument(
+        "--batch-job",
+        action="store_true",
+        help="Send all LLM requests as one offline batch job (cheaper, slower).",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Write the slice as Parquet with full article text instead of CSV.",
+    )
+    args = parser.parse_args()
+
     logging.info("Starting batch scraping process...")
     links_path = Path("txt_files/Links.txt")
     urls_to_process = load_urls_from_file(links_path)
@@ -442,10 +1318,24 @@ if __name__ == "__main__":
         logging.info(
             f"Loaded {len(urls_to_process)} URLs, processing slice [{BEGIN_ROW}:{END_ROW}] ({len(urls_subset)} URLs)."
         )
-        output_file = f"personal_batched_csvs/Parsed_links_{BEGIN_ROW+1}-{END_ROW}.csv"
+        output_file = f"personal_batched_csvs/Parsed_links_{BEGIN_ROW+1}-{END_ROW}" + (
+            ".parquet" if args.parquet else ".csv"
+        )
 
-        # Use concurrent processing by default
-        result = process_urls(urls_subset, output_file, use_concurrent=True)
+        # Use concurrent processing by default; rows stream to disk, so a
+        # crashed run picks up where it left off unless --fresh is given.
+        if args.batch_job:
+            result = process_urls_batch_job(
+                urls_subset, output_file, resume=not args.fresh, keep_results=False
+            )
+        else:
+            result = process_urls(
+                urls_subset,
+                output_file,
+                use_concurrent=True,
+                resume=not args.fresh,
+                keep_results=False,
+            )
 
         if result.get("stats"):
             stats = result["stats"]
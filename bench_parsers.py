@@ -0,0 +1,55 @@
+# bench_parsers.py
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from utils.html_parsing import PARSER_BACKENDS, get_parser_backend
+
+DEFAULT_FILES = [Path("sample.html"), Path("html_dumps/npr.html")]
+
+
+def time_backend(backend, html_bytes: bytes, repeat: int) -> tuple[float, dict]:
+    """Returns the median parse time in milliseconds and the last result."""
+    timings = []
+    result = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = backend.parse_page(html_bytes)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare HTML parser backends on saved pages."
+    )
+    parser.add_argument("files", nargs="*", type=Path, default=DEFAULT_FILES)
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    parser.add_argument(
+        "-b", "--backend", action="append", choices=sorted(PARSER_BACKENDS),
+        help="Backend to time (repeatable). Defaults to every installed one.",
+    )
+    args = parser.parse_args()
+
+    backends = []
+    for name in args.backend or PARSER_BACKENDS:
+        try:
+            backends.append(get_parser_backend(name))
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+
+    for path in args.files:
+        html_bytes = path.read_bytes()
+        print(f"\n{path} ({len(html_bytes) / 1024:.0f} KB, median of {args.repeat})")
+        print(f"  {'backend':<12} {'ms':>8} {'text chars':>11} {'json_ld':>8}")
+        for backend in backends:
+            ms, result = time_backend(backend, html_bytes, args.repeat)
+            print(
+                f"  {backend.name:<12} {ms:8.1f} {len(result['content_text']):11d} "
+                f"{'yes' if result['json_ld'] else 'no':>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ import os
 
 # --- Scraping Parameters ---
 CHAR_LIMIT = 32750  # Character limit for article text in CSV output.
+CSV_FLUSH_EVERY = 10  # Rows streamed to the output CSV between flushes...
+CSV_FLUSH_SECONDS = 5  # ...or seconds, whichever comes first.
 
 # For batch processing from a large list of URLs.
 # Defines the slice of URLs to process from the input file.
@@ -13,6 +15,92 @@ BEGIN_ROW = 3154
 END_ROW = 3865
 
 
+# --- Browser Pool ---
+# Long-lived Chromium processes shared by every scrape_site() call.
+# Each browser is driven by its own thread, so the pool size is also the
+# number of pages that can be loading at once.
+BROWSER_POOL_SIZE = 3
+CONTEXTS_PER_BROWSER = 2  # Contexts rotated per browser (varied UA/viewport).
+PAGES_PER_CONTEXT = 50  # Recycle a context after this many page loads...
+CONTEXT_MAX_HEAP_MB = 256  # ...or as soon as a page's JS heap exceeds this.
+PAGE_TIMEOUT_MS = 20000  # Default Playwright timeout for navigation/selectors.
+
+# --- Tiered Fetching ---
+# Pages are first requested over plain HTTP; only blocked, empty or
+# marker-less responses escalate to a browser. Each domain's verdict is
+# remembered so later URLs go straight to the right tier.
+CACHE_DIR = os.environ.get("WEB_GIST_CACHE_DIR", ".cache")
+HTTP_TIMEOUT_SECONDS = 15
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE = 20
+HTTP_MIN_BODY_BYTES = 2048  # Smaller bodies are treated as empty shells.
+DOMAIN_TIER_TTL_DAYS = 7  # Re-probe a domain's tier after this long.
+
+# --- URL Routing Rules ---
+# Lines of `<host>[/<path glob>] <action>` with action url_only, http, browser
+# or skip; hosts match their subdomains too. Every URL in the legacy naughty
+# list routes its host to url_only. Both files are re-read when they change.
+ROUTING_RULES_FILE = "txt_files/routing_rules.txt"
+NAUGHTY_LINKS_FILE = "txt_files/new_naughty_links.txt"
+ROUTING_RELOAD_SECONDS = 2  # How often the files' mtimes are checked.
+
+# Raw responses are cached on disk by fetched URL so reruns of a slice, or
+# Raw responses are cached on disk by canonical URL so reruns of a slice, or
+# post_processor.py, don't re-download pages. Set WEB_GIST_REPLAY_ONLY=1 to
+# serve every page from the cache (even stale ones) and never hit the network.
+HTML_CACHE_ENABLED = os.environ.get("WEB_GIST_HTML_CACHE", "1") != "0"
+HTML_CACHE_REPLAY_ONLY = os.environ.get("WEB_GIST_REPLAY_ONLY", "0") == "1"
+HTML_CACHE_MAX_BYTES = 2 * 1024**3  # Compressed bodies; LRU-evicted beyond this.
+HTML_CACHE_DEFAULT_TTL_HOURS = 7 * 24
+# Per-domain overrides (host without "www."), e.g. live blogs that keep changing.
+HTML_CACHE_DOMAIN_TTL_HOURS = {
+    "apnews.com": 24,
+    "timesofisrael.com": 24,
+}
+
+# --- HTML Parsing ---
+# Backend used by parse_html_page(): "lxml" or "html.parser" drive a
+# single-pass scanner (utils/page_scanner.py), "selectolax" uses lexbor
+# (optional install), "bs4" is the old BeautifulSoup flow on html.parser
+# (baseline only; "bs4-lxml" runs it on lxml).
+# Compare them with `python bench_parsers.py`.
+HTML_PARSER_BACKEND = "lxml"
+
+# --- Staged Pipeline ---
+# process_urls_batch_concurrent() and the async engine split each URL into
+# fetch (I/O), parse (CPU) and LLM (quota) stages, each with its own pool.
+PIPELINE_FETCH_WORKERS = 8  # Threads fetching pages (browser loads still share the pool).
+# Parsing runs in a process pool so it scales with cores instead of
+# serializing on the GIL; set PARSE_EXECUTOR = "thread" to keep it in-process.
+PARSE_EXECUTOR = "process"
+PARSE_PROCESSES = os.cpu_count() or 4
+PIPELINE_LLM_WORKERS = 32  # Upper bound; the Gemini limiter adapts calls in flight below it.
+PIPELINE_QUEUE_SIZE = 16  # Items buffered between stages before upstream blocks.
+
+# --- Domain Scheduling ---
+# URLs are handed to fetchers round-robin across hosts rather than in file
+# order, so a long run of one site never occupies every worker at once.
+DOMAIN_MAX_CONCURRENCY = 2  # Fetches in flight against any one host (thread pipeline).
+DOMAIN_MIN_DELAY_SECONDS = 1.0  # Minimum gap between fetch starts on one host.
+DOMAIN_ERROR_WINDOW = 10  # Recent fetch outcomes kept per host...
+DOMAIN_ERROR_RATE = 0.5  # ...and the failed share that deprioritizes it.
+DOMAIN_ERROR_DELAY_SECONDS = 15.0  # Gap between fetch starts on a deprioritized host.
+
+# --- Per-URL Deadlines ---
+# Every URL gets one time budget for fetch, parse and LLM together, starting
+# when its fetch is dispatched. Work still outstanding when it runs out is
+# cancelled and the row is written with status "error_timeout".
+# WEB_GIST_URL_TIMEOUT=0 disables the budget.
+URL_TIMEOUT_SECONDS = float(os.environ.get("WEB_GIST_URL_TIMEOUT", "180")) or None
+
+# --- Async Engine ---
+# Used by process_urls()/process_urls_async(): one event loop drives every
+# page load, so in-flight pages are bounded by semaphores rather than threads.
+ASYNC_BROWSERS = 2  # Shared Chromium processes.
+ASYNC_MAX_CONCURRENCY = 100  # URLs in flight (fetching, parsing or at the LLM).
+ASYNC_PER_DOMAIN_LIMIT = 4  # Page loads in flight against any one host.
+
+
 # --- LLM Models ---
 
 # Model for extracting metadata from full HTML content.
@@ -20,6 +108,93 @@ END_ROW = 3865
 GEMINI_MODEL = "gemini-2.5-flash"
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 
+# --- Prompt Compaction ---
+# Pass dicts are sent as compact JSON with pruned JSON-LD, duplicate body text
+# removed and a <head>/<time> snippet instead of raw HTML.
+PROMPT_COMPACTION_ENABLED = os.environ.get("WEB_GIST_COMPACT_PROMPTS", "1") != "0"
+PROMPT_DEDUPE_OVERLAP = 0.8  # Share of sentences already in the body to count as a duplicate.
+PROMPT_RAW_HTML_FALLBACK_CHARS = 5000  # Raw HTML sent when a page has no meta/<time> dates.
+
+# --- LLM Rate Limiting ---
+# One limiter is shared by every Gemini call in the process. Prompt tokens are
+# estimated from the request size before the call and corrected afterwards.
+# Concurrency grows by 1/window per success and halves on 429/5xx (AIMD).
+GEMINI_REQUESTS_PER_MINUTE = 300  # Client-side cap on Gemini calls.
+GEMINI_TOKENS_PER_MINUTE = 1_000_000  # Input tokens per minute for the project.
+GEMINI_MAX_CONCURRENCY = 32
+GEMINI_MIN_CONCURRENCY = 1
+LLM_LIMITER_LOG_SECONDS = 30  # How often the limiter state is logged.
+
+# --- Gemini Context Cache ---
+# The long few-shot extraction prompt (utils/gemini_cache.py) is stored once as
+# cached content and referenced by every call, so its tokens are billed at the
+# cached rate. Calls without a live cache, and batch jobs, send the short
+# schema prompt instead. WEB_GIST_CONTEXT_CACHE=0 turns the cache off.
+GEMINI_CONTEXT_CACHE_ENABLED = os.environ.get("WEB_GIST_CONTEXT_CACHE", "1") != "0"
+GEMINI_CONTEXT_CACHE_TTL_SECONDS = 3600
+GEMINI_CONTEXT_CACHE_REFRESH_SECONDS = 300  # Extend the TTL once less than this remains.
+
+# --- LLM Batch Jobs ---
+# `python batch_website_scraper.py --batch-job` sends every LLM request as one
+# offline Gemini batch job (cheaper, outside the per-minute quota). Point
+# WEB_GIST_BATCH_URL at `python -m utils.llm_batch_stub` to run it locally.
+LLM_BATCH_BASE_URL = os.environ.get(
+    "WEB_GIST_BATCH_URL", "https://generativelanguage.googleapis.com"
+)
+LLM_BATCH_POLL_SECONDS = 60
+LLM_BATCH_MAX_WAIT_HOURS = 24
+
+# Validated Gemini extractions are cached in CACHE_DIR, keyed on model,
+# prompt version and normalized input. Set WEB_GIST_LLM_CACHE=0 to bypass.
+LLM_CACHE_ENABLED = os.environ.get("WEB_GIST_LLM_CACHE", "1") != "0"
+
+# --- Structured Metadata ---
+# Fields are first read from JSON-LD, OpenGraph and meta tags; Gemini is only
+# called for the ones scored below STRUCTURED_MIN_CONFIDENCE (or skipped
+# entirely when none are). Optional fields never trigger a call on their own.
+STRUCTURED_METADATA_ENABLED = os.environ.get("WEB_GIST_STRUCTURED", "1") != "0"
+STRUCTURED_MIN_CONFIDENCE = 0.7
+STRUCTURED_OPTIONAL_FIELDS = ("modified_date",)
+
+# --- Near-Duplicate Articles ---
+# Syndicated wire stories are recognized by a SimHash of the page text. A page
+# close to an already-extracted article reuses its article_text, and Gemini is
+# asked only for the outlet-specific fields (title, authors, source, dates).
+NEAR_DUPLICATE_ENABLED = os.environ.get("WEB_GIST_NEAR_DUPLICATES", "1") != "0"
+NEAR_DUPLICATE_MAX_DISTANCE = 3  # Differing bits (of 64) still treated as the same story.
+NEAR_DUPLICATE_MIN_CHARS = 1000  # Shorter pages are never matched.
+NEAR_DUPLICATE_MAX_ENTRIES = 10000  # Extracted articles remembered per process (LRU).
+
+# --- Parquet Output ---
+# Outputs named *.parquet (`batch_website_scraper.py --parquet`, results store
+# exports) use a fixed Arrow schema with full article text, timestamp dates
+# and dictionary-encoded source/llm_used/status (utils/parquet_results.py).
+PARQUET_ROW_GROUP_ROWS = 1000  # Rows buffered, then written as one row group.
+PARQUET_COMPRESSION = "zstd"
+
+# --- Results Store ---
+# Every result row is also upserted into one SQLite table keyed by canonical
+# URL (CACHE_DIR/results.sqlite). Resumed runs skip URLs it already holds a
+# success for, and `python -m utils.results_store` looks up, imports and
+# exports rows. Set WEB_GIST_RESULTS_STORE=0 to disable.
+RESULTS_STORE_ENABLED = os.environ.get("WEB_GIST_RESULTS_STORE", "1") != "0"
+RESULTS_STORE_BATCH_SIZE = 200  # Rows per insert transaction...
+RESULTS_STORE_FLUSH_SECONDS = 5  # ...or seconds, whichever comes first.
+
+# --- Background Jobs ---
+# The Streamlit app queues each submission as a job run by a worker pool
+# outside the script thread. Jobs are shared round-robin across users, and
+# their state is saved under CACHE_DIR so an interrupted job resumes on restart.
+JOB_WORKERS = 2  # Jobs running at once, across all users.
+JOB_MAX_PER_USER = 1  # Jobs one user can have running at once.
+JOB_HISTORY_LIMIT = 50  # Finished jobs kept (and reloaded) per process.
+JOB_POLL_SECONDS = 2  # How often the app refreshes job progress.
+# Uploads are read in chunks and their URLs spooled to disk next to the job
+# state; the job then feeds the engine one shard at a time, so memory is
+# bounded by the shard size rather than the upload.
+INGEST_CHUNK_BYTES = 1024 * 1024
+JOB_SHARD_SIZE = 500  # URLs handed to process_urls() per call.
+
 # Local Ollama model for inferring metadata from a URL string only.
 # This model name MUST match the one defined in your `Modelfile`.
 OLLAMA_URL_PARSER_MODEL = "link-parser"
@@ -5,11 +5,11 @@ from pathlib import Path
 
 # Reuse the core processing logic
 from batch_website_scraper import (
-    process_single_url,
-    get_naughty_link_bases,
+    process_single_url_fast,
     write_csv_header,
     write_csv_row,
 )
+from utils.routing_rules import get_routing_rules
 
 # --- Setup Logging ---
 logging.basicConfig(
@@ -36,7 +36,7 @@ def process_and_enrich_csv(input_path: str, output_path: str):
         logging.error(f"Input file not found: {in_path}")
         return
 
-    naughty_link_bases = get_naughty_link_bases()
+    rules = get_routing_rules()
     logging.info("Starting CSV enrichment process...")
 
     try:
@@ -57,7 +57,7 @@ def process_and_enrich_csv(input_path: str, output_path: str):
                 if is_row_lonely(row):
                     url = row[0].strip()
                     logging.info(f"[Row {i}] Lonely row found. Reprocessing URL: {url}")
-                    result = process_single_url(url, naughty_link_bases)
+                    result = process_single_url_fast(url, rules)
                     write_csv_row(writer, result)
                 else:
                     # Healthy rows are written as-is, assuming they match the new format.
@@ -0,0 +1,22 @@
+# tests/conftest.py
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Config paths (txt_files/, html_dumps/) are relative to the repo root, and
+# config.py reads the environment at import, so both are set up before any
+# test module imports it. Caches and the results store stay out of the tree.
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ["WEB_GIST_CACHE_DIR"] = tempfile.mkdtemp(prefix="web_gist_tests_")
+atexit.register(shutil.rmtree, os.environ["WEB_GIST_CACHE_DIR"], True)
+os.environ["WEB_GIST_HTML_CACHE"] = "0"
+os.environ["WEB_GIST_LLM_CACHE"] = "0"
+os.environ["WEB_GIST_RESULTS_STORE"] = "0"
+os.environ["WEB_GIST_CONTEXT_CACHE"] = "0"
@@ -0,0 +1,146 @@
+# tests/test_llm_batch.py
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+import batch_website_scraper
+from utils.llm_batch import (
+    BATCH_FAILED,
+    BatchProvider,
+    GeminiBatchProvider,
+    iter_batch_results,
+)
+from utils.llm_batch_stub import make_stub_server
+
+PAGE = Path("html_dumps/npr.html").read_bytes()
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = make_stub_server(0, delay_seconds=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Serves every page from html_dumps/npr.html; URLs ending in /fail raise."""
+    urls = []
+
+    def fake_fetch_html(url: str) -> bytes:
+        urls.append(url)
+        if url.endswith("/fail"):
+            raise IOError("connection reset")
+        return PAGE
+
+    monkeypatch.setattr(batch_website_scraper, "fetch_html", fake_fetch_html)
+    return urls
+
+
+class FailingProvider(BatchProvider):
+    name = "failing"
+
+    def submit(self, requests_path: Path, display_name: str) -> str:
+        return "batches/doomed"
+
+    def state(self, job_name: str) -> str:
+        return BATCH_FAILED
+
+
+def rows_by_url(result: dict) -> dict[str, dict]:
+    return {row["url"]: row for row in result["articles"]}
+
+
+def test_iter_batch_results_reads_responses_errors_and_bad_lines(tmp_path):
+    candidate = {"content": {"parts": [{"text": '{"ti'}, {"text": 'tle": 1}'}]}}
+    error = {"code": 400, "message": "bad request"}
+    path = tmp_path / "results.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"key": "a", "response": {"candidates": [candidate]}}),
+                json.dumps({"key": "b", "error": error}),
+                "{not json",
+                "",
+                json.dumps({"key": "c", "response": {"candidates": []}}),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    assert list(iter_batch_results(path)) == [
+        ("a", '{"title": 1}', None),
+        ("b", None, "bad request"),
+        ("c", None, "Batch response had no candidate text"),
+    ]
+
+
+def test_batch_job_round_trip_through_the_stub(tmp_path, stub_url, fetched):
+    output = tmp_path / "out.csv"
+    urls = [f"https://site{i}.com/story" for i in range(4)] + [
+        "https://site0.com/story?utm_source=tw",
+        "https://site9.com/fail",
+        "not a url",
+    ]
+    result = batch_website_scraper.process_urls_batch_job(
+        urls, str(output), provider=GeminiBatchProvider("test-key", base_url=stub_url)
+    )
+
+    rows = rows_by_url(result)
+    for i in range(4):
+        row = rows[f"https://site{i}.com/story"]
+        assert row["status"] == "success"
+        assert row["llm_used"].endswith("-batch")
+        assert row["article_info"].title == f"Stub title for https://site{i}.com/story"
+    # The tracking-parameter duplicate is fetched once and shares the result.
+    assert rows["https://site0.com/story?utm_source=tw"]["status"] == "success"
+    assert sorted(fetched) == sorted(
+        [f"https://site{i}.com/story" for i in range(4)] + ["https://site9.com/fail"]
+    )
+    assert rows["https://site9.com/fail"]["status"].startswith("error")
+    assert rows["not a url"]["status"] == "error_invalid_url"
+    assert result["stats"]["successful"] == 5
+
+    requests = output.with_suffix(".batch_requests.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["key"] for line in requests) == [
+        f"https://site{i}.com/story" for i in range(4)
+    ]
+    assert len(output.read_text(encoding="utf-8-sig").splitlines()) == len(urls) + 1
+
+
+def test_resumed_batch_job_resubmits_only_unfinished_urls(tmp_path, stub_url, fetched):
+    output = tmp_path / "out.csv"
+    provider = GeminiBatchProvider("test-key", base_url=stub_url)
+    batch_website_scraper.process_urls_batch_job(
+        ["https://site1.com/a", "https://site2.com/fail"],
+        str(output),
+        provider=provider,
+    )
+    fetched.clear()
+
+    result = batch_website_scraper.process_urls_batch_job(
+        ["https://site1.com/a", "https://site2.com/fail", "https://site3.com/b"],
+        str(output),
+        provider=provider,
+        resume=True,
+    )
+    assert result["stats"]["resumed"] == 1
+    assert sorted(fetched) == ["https://site2.com/fail", "https://site3.com/b"]
+    requests = output.with_suffix(".batch_requests.jsonl").read_text().splitlines()
+    assert [json.loads(line)["key"] for line in requests] == ["https://site3.com/b"]
+    assert rows_by_url(result)["https://site3.com/b"]["status"] == "success"
+
+
+def test_failed_batch_job_marks_its_urls(tmp_path, fetched):
+    result = batch_website_scraper.process_urls_batch_job(
+        ["https://site1.com/a", "https://site2.com/b"],
+        str(tmp_path / "out.csv"),
+        provider=FailingProvider(),
+    )
+    for row in result["articles"]:
+        assert row["status"] == "error_llm_batch"
+        assert row["llm_used"].endswith("-batch")
+    assert result["stats"]["failed"] == 2
@@ -0,0 +1,84 @@
+# tests/test_near_duplicates.py
+import random
+
+import pytest
+
+import utils.near_duplicates as near_duplicates
+from utils.llm_utils import PARSE_FAILED_TEXT, PARTIAL_SUFFIX, ArticleInfo
+from utils.near_duplicates import (
+    REUSED_BODY_CONFIDENCE,
+    NearDuplicateIndex,
+    remember_extraction,
+    reuse_near_duplicate,
+    simhash,
+)
+from utils.structured_metadata import StructuredMetadata
+
+# A long, non-repetitive text, so a small edit changes few shingles.
+_rng = random.Random(7)
+STORY = " ".join(f"w{_rng.randrange(5000)}" for _ in range(600))
+
+
+def article(text: str) -> ArticleInfo:
+    return ArticleInfo(
+        title="Flood",
+        authors="N/A",
+        source="Wire",
+        published_date="2025-01-01",
+        modified_date="N/A",
+        article_text=text,
+    )
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = NearDuplicateIndex(max_distance=3, max_entries=10)
+    monkeypatch.setattr(near_duplicates, "_index", index)
+    return index
+
+
+def test_simhash_is_stable_and_close_for_small_edits():
+    edited = "Updated. " + STORY + " Reporting by the wire desk."
+    assert simhash(STORY) == simhash(STORY)
+    assert (simhash(STORY) ^ simhash(edited)).bit_count() <= 3
+    assert (simhash(STORY) ^ simhash(STORY[::-1])).bit_count() > 3
+
+
+def test_find_returns_entries_within_max_distance(index):
+    index.add(0b1011, "https://a.com/x", "body")
+    assert index.find(0b1011) == ("https://a.com/x", "body")
+    assert index.find(0b1011 ^ 0b111) == ("https://a.com/x", "body")
+    assert index.find(0b1011 ^ 0b1111 << 20) is None
+    assert index.stats() == {"articles": 1, "lookups": 3, "hits": 2}
+
+
+def test_least_recently_used_entries_are_evicted():
+    index = NearDuplicateIndex(max_distance=0, max_entries=2)
+    index.add(1, "one", "1")
+    index.add(2, "two", "2")
+    index.find(1)
+    index.add(3, "three", "3")
+    assert index.find(2) is None
+    assert index.find(1) == ("one", "1")
+    assert index.find(3) == ("three", "3")
+
+
+def test_reuses_body_of_an_extracted_near_duplicate(index):
+    first = StructuredMetadata()
+    assert not reuse_near_duplicate("https://a.com/x", STORY, first)
+    remember_extraction("https://a.com/x", first, article("Clean body"))
+
+    copy = StructuredMetadata()
+    assert reuse_near_duplicate("https://b.com/y", STORY + " More at b.com.", copy)
+    assert copy.values["article_text"] == "Clean body"
+    assert copy.confidence["article_text"] == REUSED_BODY_CONFIDENCE
+
+
+@pytest.mark.parametrize(
+    "text", ["N/A", "", PARSE_FAILED_TEXT, '{"title": "Flo' + PARTIAL_SUFFIX]
+)
+def test_missing_bodies_and_parse_failure_placeholders_are_not_indexed(index, text):
+    structured = StructuredMetadata()
+    structured.fingerprint = simhash(STORY)
+    remember_extraction("https://a.com/x", structured, article(text))
+    assert index.stats()["articles"] == 0
@@ -0,0 +1,74 @@
+# tests/test_routing_rules.py
+from utils.routing_rules import RoutingRules, parse_rules_file
+
+
+def make_rules(tmp_path, rules_text: str, naughty_text: str | None = None):
+    rules_path = tmp_path / "routing_rules.txt"
+    rules_path.write_text(rules_text, encoding="utf-8")
+    naughty_path = None
+    if naughty_text is not None:
+        naughty_path = tmp_path / "naughty.txt"
+        naughty_path.write_text(naughty_text, encoding="utf-8")
+    return RoutingRules(rules_path, naughty_path, reload_seconds=0)
+
+
+def test_host_rule_covers_subdomains_scheme_and_www(tmp_path):
+    rules = make_rules(tmp_path, "reuters.com   http\n")
+    for url in (
+        "https://www.reuters.com/world/story",
+        "http://graphics.reuters.com/chart",
+        "https://reuters.com/",
+    ):
+        assert rules.action(url) == "http", url
+    assert rules.match("https://notreuters.com/") is None
+
+
+def test_most_specific_host_wins_then_first_matching_path(tmp_path):
+    rules = make_rules(
+        tmp_path,
+        "example.com/live/*      browser\n"
+        "example.com/video       skip\n"
+        "example.com             http\n"
+        "news.example.com        url_only\n",
+    )
+    assert rules.action("https://example.com/live/2025/x") == "browser"
+    assert rules.action("https://example.com/video/clip") == "skip"
+    assert rules.action("https://example.com/politics/x") == "http"
+    assert rules.action("https://news.example.com/video/clip") == "url_only"
+
+
+def test_naughty_list_routes_whole_host_to_url_only(tmp_path):
+    rules = make_rules(
+        tmp_path,
+        "bloomberg.com   http\n",
+        "https://www.wsj.com/articles/some-story-123\nhttps://bloomberg.com/x\n",
+    )
+    assert rules.action("https://www.wsj.com/other") == "url_only"
+    # The rules file comes first.
+    assert rules.action("https://bloomberg.com/news") == "http"
+
+
+def test_rules_file_accepts_tabs_comments_and_skips_bad_lines(tmp_path):
+    path = tmp_path / "rules.txt"
+    path.write_text(
+        "# header\n"
+        "bloomberg.com\turl_only\n"
+        "apnews.com   HTTP   # trailing comment\n"
+        "example.com  teleport\n"
+        "news.afp.com/#/c/*  browser\n",
+        encoding="utf-8",
+    )
+    rules = parse_rules_file(path)
+    assert [(rule.host, rule.action) for rule in rules] == [
+        ("bloomberg.com", "url_only"),
+        ("apnews.com", "http"),
+        ("news.afp.com", "browser"),
+    ]
+
+
+def test_edits_are_picked_up_without_a_restart(tmp_path):
+    rules = make_rules(tmp_path, "example.com  http\n")
+    assert rules.action("https://example.com/a") == "http"
+    (tmp_path / "routing_rules.txt").write_text("example.com  skip\n", encoding="utf-8")
+    rules.reload()
+    assert rules.action("https://example.com/a") == "skip"
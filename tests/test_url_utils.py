@@ -0,0 +1,48 @@
+# tests/test_url_utils.py
+from utils.url_utils import canonicalize_url, normalize_url
+
+
+def test_canonicalize_lowercases_host_and_drops_default_port():
+    assert canonicalize_url("HTTPS://WWW.Example.COM:443/Path") == (
+        "https://www.example.com/Path"
+    )
+    assert canonicalize_url("http://example.com:8080/a") == "http://example.com:8080/a"
+
+
+def test_canonicalize_strips_tracking_params_and_sorts_the_rest():
+    url = "https://example.com/a?utm_source=tw&b=2&fbclid=x&a=1&gclid=y"
+    assert canonicalize_url(url) == "https://example.com/a?a=1&b=2"
+
+
+def test_canonicalize_keeps_generic_params_sites_use_for_real():
+    url = "https://example.com/a?ref=home&amp=1&outputType=amp"
+    assert canonicalize_url(url) == (
+        "https://example.com/a?amp=1&outputType=amp&ref=home"
+    )
+
+
+def test_canonicalize_folds_trailing_slash_fragment_and_amp_variants():
+    expected = "https://example.com/news/story"
+    for url in (
+        "https://example.com/news/story/",
+        "https://example.com/news/story#comments",
+        "https://example.com/amp/news/story",
+        "https://example.com/news/story/amp",
+        "https://example-com.cdn.ampproject.org/c/s/example.com/news/story",
+    ):
+        assert canonicalize_url(url) == expected, url
+
+
+def test_canonicalize_keeps_hash_routes():
+    url = "https://news.afp.com/#/c/doc.123"
+    assert canonicalize_url(url) == url
+
+
+def test_normalize_only_changes_what_the_server_never_sees():
+    assert normalize_url("HTTPS://Example.com:443/amp/a/?ref=x&utm_source=y#top") == (
+        "https://example.com/amp/a/?ref=x&utm_source=y"
+    )
+    assert normalize_url("https://news.afp.com/#/c/doc.123") == (
+        "https://news.afp.com/#/c/doc.123"
+    )
+    assert normalize_url("https://example.com") == "https://example.com/"
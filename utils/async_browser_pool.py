@@ -0,0 +1,156 @@
+# utils/async_browser_pool.py
+import asyncio
+import itertools
+import logging
+
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Playwright,
+)
+
+from config import (
+    ASYNC_BROWSERS,
+    CONTEXTS_PER_BROWSER,
+    PAGES_PER_CONTEXT,
+    PAGE_TIMEOUT_MS,
+)
+from utils.browser_pool import LAUNCH_ARGS, new_context_options
+
+
+class _AsyncContextSlot:
+    """A shared browser context plus the number of pages opened on it."""
+
+    def __init__(self, context: BrowserContext):
+        self.context = context
+        self.pages_opened = 0
+        self.open_pages = 0
+
+
+class AsyncBrowserPool:
+    """
+    Shared Chromium browsers driven from a single event loop.
+
+    Unlike the sync `BrowserPool`, any number of pages can be in flight on the
+    same browser; callers bound that number with their own semaphores.
+
+    Usage:
+        async with AsyncBrowserPool() as pool:
+            html_bytes = await pool.fetch(url)
+    """
+
+    def __init__(
+        self,
+        browsers: int = ASYNC_BROWSERS,
+        contexts_per_browser: int = CONTEXTS_PER_BROWSER,
+        pages_per_context: int = PAGES_PER_CONTEXT,
+        page_timeout_ms: int = PAGE_TIMEOUT_MS,
+    ):
+        self.browser_count = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.pages_per_context = max(1, pages_per_context)
+        self.page_timeout_ms = page_timeout_ms
+
+        self._playwright: Playwright | None = None
+        self._browsers: list[Browser | None] = [None] * self.browser_count
+        self._slots: list[list[_AsyncContextSlot | None]] = []
+        self._launch_locks = [asyncio.Lock() for _ in range(self.browser_count)]
+        self._rotation = itertools.cycle(
+            [
+                (b, c)
+                for c in range(self.contexts_per_browser)
+                for b in range(self.browser_count)
+            ]
+        )
+
+    async def __aenter__(self) -> "AsyncBrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self._slots = [
+            [None] * self.contexts_per_browser for _ in range(self.browser_count)
+        ]
+        logging.info(
+            f"Async browser pool started: {self.browser_count} browsers x "
+            f"{self.contexts_per_browser} contexts"
+        )
+
+    async def close(self):
+        for browser in self._browsers:
+            if browser is not None:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+        self._browsers = [None] * self.browser_count
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _ensure_browser(self, index: int) -> Browser:
+        """Launches browser `index` on first use, or again after a crash."""
+        async with self._launch_locks[index]:
+            browser = self._browsers[index]
+            if browser is not None and browser.is_connected():
+                return browser
+            if browser is not None:
+                logging.warning(f"Async browser {index} disconnected, restarting")
+            self._slots[index] = [None] * self.contexts_per_browser
+            browser = await self._playwright.chromium.launch(
+                headless=True, args=LAUNCH_ARGS
+            )
+            self._browsers[index] = browser
+            return browser
+
+    async def _checkout(self) -> _AsyncContextSlot:
+        b, c = next(self._rotation)
+        browser = await self._ensure_browser(b)
+        slot = self._slots[b][c]
+        if slot is None or slot.pages_opened >= self.pages_per_context:
+            # Retire the worn-out context; it closes once its last page does.
+            if slot is not None and slot.open_pages == 0:
+                await slot.context.close()
+            slot = _AsyncContextSlot(await browser.new_context(**new_context_options()))
+            self._slots[b][c] = slot
+        slot.pages_opened += 1
+        slot.open_pages += 1
+        return slot
+
+    async def _release(self, slot: _AsyncContextSlot):
+        slot.open_pages -= 1
+        retired = all(slot is not s for row in self._slots for s in row)
+        if retired and slot.open_pages == 0:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+
+    async def fetch(self, url: str) -> bytes:
+        """Loads `url` in a fresh page and returns the raw response bytes."""
+        slot = await self._checkout()
+        page = None
+        try:
+            page = await slot.context.new_page()
+            page.set_default_timeout(self.page_timeout_ms)
+
+            response = await page.goto(url, wait_until="domcontentloaded")
+            if not response or not response.ok:
+                raise IOError(
+                    f"Bad status code {response.status if response else 'N/A'}"
+                )
+
+            await page.wait_for_selector("body")
+            return await response.body()
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            await self._release(slot)
@@ -0,0 +1,308 @@
+# utils/browser_pool.py
+import atexit
+import logging
+import queue
+import random
+import threading
+from concurrent.futures import Future
+
+from playwright.sync_api import (
+    sync_playwright,
+    Browser,
+    BrowserContext,
+    Playwright,
+)
+
+from config import (
+    BROWSER_POOL_SIZE,
+    CONTEXTS_PER_BROWSER,
+    PAGES_PER_CONTEXT,
+    CONTEXT_MAX_HEAP_MB,
+    PAGE_TIMEOUT_MS,
+)
+
+# --- Constants ---
+USER_AGENTS = [
+    # "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 12_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15",
+    # "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.5672.127 Safari/537.36",
+]
+
+VIEWPORTS = [
+    {"width": 1920, "height": 1080},
+    {"width": 1366, "height": 768},
+    {"width": 1440, "height": 900},
+]
+
+EXTRA_HEADERS = {
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.google.com/",
+    "DNT": "1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+# Chromium-only; returns 0 on engines without `performance.memory`.
+_JS_HEAP_SCRIPT = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+
+
+def new_context_options() -> dict:
+    """Randomized context settings shared by the sync and async engines."""
+    return {
+        "user_agent": random.choice(USER_AGENTS),
+        "viewport": random.choice(VIEWPORTS),
+        "extra_http_headers": EXTRA_HEADERS,
+        "locale": "en-US",
+    }
+
+
+class _ContextSlot:
+    """A browser context plus the number of pages it has served."""
+
+    def __init__(self, context: BrowserContext):
+        self.context = context
+        self.pages_served = 0
+
+
+class _BrowserWorker(threading.Thread):
+    """
+    Owns one Chromium process and its contexts.
+
+    Sync Playwright objects can only be used from the thread that created
+    them, so each browser lives on a dedicated thread that pulls fetch jobs
+    from the pool's queue and hands the page bytes back through a Future.
+    """
+
+    def __init__(self, pool: "BrowserPool", index: int):
+        super().__init__(name=f"browser-pool-{index}", daemon=True)
+        self._pool = pool
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._slots: list[_ContextSlot | None] = [None] * pool.contexts_per_browser
+        self._next_slot = 0
+
+    # --- Lifecycle ---
+    def run(self):
+        try:
+            with sync_playwright() as p:
+                self._playwright = p
+                while True:
+                    job = self._pool._jobs.get()
+                    if job is None:
+                        break
+                    url, future = job
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        future.set_result(self._fetch(url))
+                    except BaseException as e:
+                        future.set_exception(e)
+                self._close_browser()
+        except Exception as e:
+            logging.error(f"{self.name} stopped unexpectedly: {e}")
+
+    def _ensure_browser(self) -> Browser:
+        """Launches Chromium on first use, or again after it crashed."""
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        if self._browser is not None:
+            logging.warning(f"{self.name}: browser disconnected, restarting")
+            self._pool._record("restarts")
+        self._slots = [None] * len(self._slots)
+        self._browser = self._playwright.chromium.launch(
+            headless=True, args=LAUNCH_ARGS
+        )
+        self._pool._record("launches")
+        return self._browser
+
+    def _close_browser(self):
+        for slot in self._slots:
+            if slot is not None:
+                self._close_context(slot)
+        self._slots = [None] * len(self._slots)
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+    # --- Context checkout/return ---
+    def _checkout(self) -> tuple[int, _ContextSlot]:
+        """Round-robins over this browser's contexts, creating them lazily."""
+        browser = self._ensure_browser()
+        index = self._next_slot
+        self._next_slot = (self._next_slot + 1) % len(self._slots)
+        slot = self._slots[index]
+        if slot is None:
+            slot = _ContextSlot(browser.new_context(**new_context_options()))
+            self._slots[index] = slot
+        return index, slot
+
+    def _return(self, index: int, slot: _ContextSlot, heap_bytes: int):
+        """Recycles the context once it is worn out or too heavy."""
+        slot.pages_served += 1
+        heap_mb = heap_bytes / (1024 * 1024)
+        if (
+            slot.pages_served >= self._pool.pages_per_context
+            or heap_mb > self._pool.context_max_heap_mb
+        ):
+            logging.info(
+                f"{self.name}: recycling context after {slot.pages_served} pages "
+                f"(last JS heap {heap_mb:.0f}MB)"
+            )
+            self._close_context(slot)
+            self._slots[index] = None
+            self._pool._record("recycles")
+
+    @staticmethod
+    def _close_context(slot: _ContextSlot):
+        try:
+            slot.context.close()
+        except Exception:
+            pass
+
+    # --- Fetching ---
+    def _fetch(self, url: str) -> bytes:
+        index, slot = self._checkout()
+        page = None
+        heap_bytes = 0
+        try:
+            page = slot.context.new_page()
+            page.set_default_timeout(self._pool.page_timeout_ms)
+
+            # Block assets for speed, but scripts may be needed for some sites
+            # page.route("**/*", block_unnecessary_assets)
+
+            response = page.goto(url, wait_until="domcontentloaded")
+            if not response or not response.ok:
+                raise IOError(
+                    f"Bad status code {response.status if response else 'N/A'}"
+                )
+
+            # Wait for the body to ensure content is loaded
+            page.wait_for_selector("body")
+
+            # CRITICAL: Return raw bytes to let BeautifulSoup handle encoding
+            html_bytes = response.body()
+            try:
+                heap_bytes = page.evaluate(_JS_HEAP_SCRIPT) or 0
+            except Exception:
+                pass
+            return html_bytes
+        except Exception:
+            # A dead browser surfaces as an error on whatever call was in flight;
+            # drop the slot so the next job gets a fresh context (and browser).
+            if self._browser is None or not self._browser.is_connected():
+                self._slots[index] = None
+            raise
+        finally:
+            if page is not None:
+                try:
+                    page.close()
+                except Exception:
+                    pass
+            if self._slots[index] is slot:
+                self._return(index, slot, heap_bytes)
+
+
+class BrowserPool:
+    """
+    A fixed set of long-lived headless browsers that serve page fetches.
+
+    Callers check a page load out with `fetch(url)`; whichever browser thread
+    is free runs it on one of its pooled contexts and returns the raw bytes.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        contexts_per_browser: int = CONTEXTS_PER_BROWSER,
+        pages_per_context: int = PAGES_PER_CONTEXT,
+        context_max_heap_mb: int = CONTEXT_MAX_HEAP_MB,
+        page_timeout_ms: int = PAGE_TIMEOUT_MS,
+    ):
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.pages_per_context = max(1, pages_per_context)
+        self.context_max_heap_mb = context_max_heap_mb
+        self.page_timeout_ms = page_timeout_ms
+
+        self._jobs: queue.Queue = queue.Queue()
+        self._stats = {"fetches": 0, "launches": 0, "restarts": 0, "recycles": 0}
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._workers = [_BrowserWorker(self, i) for i in range(self.size)]
+        for worker in self._workers:
+            worker.start()
+        logging.info(
+            f"Browser pool started: {self.size} browsers x "
+            f"{self.contexts_per_browser} contexts"
+        )
+
+    def _record(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    @property
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def fetch(self, url: str, timeout: float | None = None) -> bytes:
+        """
+        Loads `url` on a pooled browser and returns the raw response bytes.
+
+        Raises:
+            RuntimeError: If the pool has been shut down.
+            TimeoutError: If no browser finished the page within `timeout`.
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is shut down")
+        if timeout is None:
+            # goto + wait_for_selector, plus time spent queued behind other pages
+            timeout = 2 * self.page_timeout_ms / 1000 * (1 + self._jobs.qsize())
+        future: Future = Future()
+        self._jobs.put((url, future))
+        self._record("fetches")
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stops every browser thread after in-flight pages finish."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        logging.info(f"Browser pool shut down. Stats: {self.stats}")
+
+
+# --- Process-wide pool ---
+_pool: BrowserPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Returns the shared pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = BrowserPool()
+        return _pool
+
+
+@atexit.register
+def shutdown_browser_pool():
+    """Closes the shared pool's browsers; registered to run at exit."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,126 @@
+# utils/deadlines.py
+import contextvars
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from config import URL_TIMEOUT_SECONDS
+
+
+class DeadlineExceeded(TimeoutError):
+    """A URL ran out of its time budget."""
+
+
+class Deadline:
+    """
+    A point in time by which one URL's work must be finished.
+
+    Unlike SIGALRM this is plain data: it works from any thread and any
+    event loop. Blocking calls read the budget left with `timeout()` and
+    pass it on (HTTP timeouts, `Future.result`, limiter waits); stages call
+    `check()` before starting work so nothing new begins once it has run out.
+
+    Args:
+        seconds: The budget; None means no limit.
+        url: Named in the error message.
+    """
+
+    def __init__(self, seconds: float | None = URL_TIMEOUT_SECONDS, url: str = ""):
+        self.seconds = seconds
+        self.url = url
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> float | None:
+        """Seconds left (never negative), or None without a limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, stage: str = ""):
+        """
+        Raises:
+            DeadlineExceeded: If the budget has run out.
+        """
+        if self.expired:
+            raise self.exceeded(stage)
+
+    def exceeded(self, stage: str = "") -> DeadlineExceeded:
+        where = f" during {stage}" if stage else ""
+        return DeadlineExceeded(
+            f"{self.url or 'URL'} exceeded its {self.seconds:.0f}s budget{where}"
+        )
+
+    def timeout(self, cap: float | None = None, stage: str = "") -> float | None:
+        """
+        The timeout to give a blocking call: the budget left, at most `cap`.
+
+        Raises:
+            DeadlineExceeded: If the budget has already run out.
+        """
+        self.check(stage)
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(cap, remaining)
+
+    def wait(self, future: Future, stage: str = "") -> Any:
+        """`future.result()` bounded by the budget; the future is cancelled on expiry."""
+        try:
+            return future.result(timeout=self.timeout(stage=stage))
+        except TimeoutError:
+            future.cancel()
+            if self.expired:
+                raise self.exceeded(stage) from None
+            raise
+
+
+# --- Current Deadline ---
+# Set per thread (and per asyncio task) so the fetch, parse and LLM helpers
+# pick up the budget of the URL they are working on without new parameters.
+_current: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+def current_deadline() -> Deadline | None:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | None) -> Iterator[Deadline | None]:
+    """Makes `deadline` the current one for the `with` block."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def earliest(*deadlines: Deadline | None) -> Deadline | None:
+    """The deadline that runs out first; unlimited ones count as last."""
+    limited = [d for d in deadlines if d is not None and d.expires_at is not None]
+    if limited:
+        return min(limited, key=lambda d: d.expires_at)
+    return next((d for d in deadlines if d is not None), None)
+
+
+def run_with_deadline(deadline: Deadline | None, fn: Callable, *args) -> Any:
+    """
+    Calls `fn(*args)` with `deadline` current.
+
+    `loop.run_in_executor` does not carry context variables into the worker
+    thread, so executor jobs are wrapped in this.
+    """
+    with deadline_scope(deadline):
+        return fn(*args)
+
+
+def timeout_for(cap: float | None = None, stage: str = "") -> float | None:
+    """`Deadline.timeout` of the current deadline, or `cap` when there is none."""
+    deadline = current_deadline()
+    return cap if deadline is None else deadline.timeout(cap, stage)
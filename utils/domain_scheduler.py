@@ -0,0 +1,247 @@
+# utils/domain_scheduler.py
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator
+
+from config import (
+    DOMAIN_MAX_CONCURRENCY,
+    DOMAIN_MIN_DELAY_SECONDS,
+    DOMAIN_ERROR_WINDOW,
+    DOMAIN_ERROR_RATE,
+    DOMAIN_ERROR_DELAY_SECONDS,
+    HTML_CACHE_REPLAY_ONLY,
+)
+from utils.url_utils import url_domain
+
+_POLL_SECONDS = 0.5
+# Outcomes needed before a host's error rate is trusted.
+_MIN_OUTCOMES = 3
+
+
+class DomainState:
+    """Queued items, fetches in flight and recent outcomes for one host."""
+
+    def __init__(self, error_window: int):
+        self.pending: deque = deque()
+        self.in_flight = 0
+        self.next_start = 0.0
+        self.outcomes: deque[bool] = deque(maxlen=error_window)
+        self.dispatched = 0
+        self.errors = 0
+
+    def error_rate(self) -> float:
+        if len(self.outcomes) < _MIN_OUTCOMES:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class DomainScheduler:
+    """
+    Hands out queued items round-robin across hosts, within politeness limits.
+
+    Items are grouped by `key(item)` (the URL's host by default). A host is
+    eligible when it has fewer than `per_domain` fetches in flight and
+    `min_delay` seconds have passed since its last dispatch. Hosts whose
+    recent error rate reaches `error_rate` are deprioritized: they are
+    served only when no healthy host is ready, and with `error_delay`
+    between dispatches. Each dispatched item must be handed back with
+    `release()` once its fetch is over.
+
+    Args:
+        items: The work queue, in input order.
+        key: Maps an item to its host.
+        max_in_flight: Items dispatched but not yet released, across hosts.
+            Set it to the number of fetchers so dispatched items never queue.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Any],
+        key: Callable[[Any], str] = url_domain,
+        max_in_flight: int = 8,
+        per_domain: int = DOMAIN_MAX_CONCURRENCY,
+        min_delay: float | None = None,
+        error_window: int = DOMAIN_ERROR_WINDOW,
+        error_rate: float = DOMAIN_ERROR_RATE,
+        error_delay: float = DOMAIN_ERROR_DELAY_SECONDS,
+    ):
+        self.key = key
+        self.max_in_flight = max(1, max_in_flight)
+        self.per_domain = max(1, per_domain)
+        if min_delay is None:
+            # Replay-only runs never touch the network.
+            min_delay = 0.0 if HTML_CACHE_REPLAY_ONLY else DOMAIN_MIN_DELAY_SECONDS
+        self.min_delay = min_delay
+        self.error_threshold = error_rate
+        self.error_delay = error_delay
+        self.error_window = error_window
+
+        self.in_flight = 0
+        self.remaining = 0
+        self._closed = False
+        # Rotation order: a host moves to the back once it is served.
+        self._domains: OrderedDict[str, DomainState] = OrderedDict()
+        self._cond = threading.Condition()
+
+        for item in items:
+            self._enqueue(item)
+
+    def _enqueue(self, item: Any):
+        domain = self.key(item)
+        if domain not in self._domains:
+            self._domains[domain] = DomainState(self.error_window)
+        self._domains[domain].pending.append(item)
+        self.remaining += 1
+
+    def add(self, item: Any):
+        """Queues another item behind its host's pending ones."""
+        with self._cond:
+            self._enqueue(item)
+            self._cond.notify_all()
+
+    def discard(self, item: Any) -> bool:
+        """Removes a not yet dispatched item; False if it was already dispatched."""
+        with self._cond:
+            state = self._domains.get(self.key(item))
+            if state is None or item not in state.pending:
+                return False
+            state.pending.remove(item)
+            self.remaining -= 1
+            return True
+
+    def _is_struggling(self, state: DomainState) -> bool:
+        return state.error_rate() >= self.error_threshold
+
+    def poll(self) -> tuple[Any | None, float | None]:
+        """
+        Dispatches the next eligible item without blocking.
+
+        Returns:
+            `(item, 0.0)` when one was dispatched, `(None, seconds)` when
+            nothing is eligible yet, or `(None, None)` once every item has
+            been dispatched (or the scheduler was closed).
+        """
+        with self._cond:
+            if self._closed or not self.remaining:
+                return None, None
+            if self.in_flight >= self.max_in_flight:
+                return None, _POLL_SECONDS
+
+            now = time.monotonic()
+            wait = _POLL_SECONDS
+            fallback = None
+            for domain, state in self._domains.items():
+                if not state.pending or state.in_flight >= self.per_domain:
+                    continue
+                if state.next_start > now:
+                    wait = min(wait, state.next_start - now)
+                    continue
+                if self._is_struggling(state):
+                    fallback = fallback or domain
+                    continue
+                return self._dispatch(domain, now), 0.0
+            if fallback is not None:
+                return self._dispatch(fallback, now), 0.0
+            return None, wait
+
+    def _dispatch(self, domain: str, now: float):
+        state = self._domains[domain]
+        item = state.pending.popleft()
+        delay = self.error_delay if self._is_struggling(state) else self.min_delay
+        state.next_start = now + delay
+        state.in_flight += 1
+        state.dispatched += 1
+        self.in_flight += 1
+        self.remaining -= 1
+        self._domains.move_to_end(domain)
+        return item
+
+    def release(self, item: Any, ok: bool | None = True):
+        """
+        Frees an item's slot.
+
+        Args:
+            ok: Whether the fetch succeeded; None when no request was made
+                (the item was routed elsewhere), which leaves the host's
+                error rate untouched.
+        """
+        with self._cond:
+            state = self._domains[self.key(item)]
+            state.in_flight -= 1
+            self.in_flight -= 1
+            if ok is not None:
+                was_struggling = self._is_struggling(state)
+                state.outcomes.append(ok)
+                if not ok:
+                    state.errors += 1
+                    if not was_struggling and self._is_struggling(state):
+                        logging.warning(
+                            f"Deprioritizing {self.key(item)}: "
+                            f"{state.error_rate():.0%} of recent fetches failed"
+                        )
+            self._cond.notify_all()
+
+    def close(self):
+        """Stops dispatching; blocked iterators return."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def wait(self, timeout: float | None):
+        """Blocks until an item is added or released, or `timeout` passes."""
+        with self._cond:
+            if not self._closed:
+                self._cond.wait(timeout=timeout)
+
+    def __enter__(self) -> "DomainScheduler":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yields items as they become eligible, blocking in between."""
+        while True:
+            item, wait = self.poll()
+            if item is not None:
+                yield item
+                continue
+            if wait is None:
+                return
+            with self._cond:
+                self._cond.wait(timeout=wait)
+
+    async def iter_async(self) -> AsyncIterator[Any]:
+        """Async counterpart of iterating; for use on a single event loop."""
+        while True:
+            item, wait = self.poll()
+            if item is not None:
+                yield item
+                continue
+            if wait is None:
+                return
+            await asyncio.sleep(min(wait, 0.05))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "domains": len(self._domains),
+                "remaining": self.remaining,
+                "in_flight": self.in_flight,
+                "struggling": [
+                    domain
+                    for domain, state in self._domains.items()
+                    if self._is_struggling(state)
+                ],
+                "errors": sum(state.errors for state in self._domains.values()),
+            }
+
+    def log_stats(self):
+        s = self.stats()
+        logging.info(
+            f"Domain scheduler: {s['domains']} hosts, {s['errors']} failed fetches, "
+            f"deprioritized: {', '.join(s['struggling']) or 'none'}"
+        )
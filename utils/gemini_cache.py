@@ -1,11 +1,26 @@
-from google.genai import types
-from google import genai
-import os
+# utils/gemini_cache.py
+import hashlib
 import json
-from config import GEMINI_MODEL
+import logging
+import threading
+import time
+from pathlib import Path
 
-gemini_client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
-html_sample = str(open("html_dumps/npr.html", "r").read())
+from google.genai import errors, types
+
+from config import (
+    GEMINI_MODEL,
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+    GEMINI_CONTEXT_CACHE_REFRESH_SECONDS,
+)
+
+# After a failed lookup/create (e.g. caching unavailable on this key), calls
+# go uncached for this long before trying again.
+_RETRY_AFTER_FAILURE_SECONDS = 600
+
+html_sample = (Path(__file__).resolve().parent.parent / "html_dumps" / "npr.html").read_text(
+    encoding="utf-8"
+)
 
 everything = {
     "URL": "https://www.npr.org/2025/02/09/g-s1-47467/egypt-emergency-arab-summit",
@@ -62,16 +77,18 @@ source (str): The name of the publication or website (e.g., "The New York Times"
 
 article_text (str): The full readable body of the article. This includes all meaningful paragraphs that make up the story content. Do not include navigation links, ads, sidebars, or captions. Return this as a single plain string with whitespace cleaned up. Do not edit or summarize any of the article text.
 
-published_date (str): The original publication date and time of the article, as shown on the page or in embedded metadata. If you are given a time zone, convert it to Eastern Time (ET). A common time zone is Z (zulu), in a time stamp like this: "2025-04-26T16:30:00.000Z" - that corresponds to GMT or UTC, convert that to EDT (in this example it would be 2025-04-26T12:30:00.000). If you are not given a time zone, leave as is. Use this format: "2025-04-23T14:52:05"
+published_date (str): The original publication date of the article, as shown on the page or in embedded metadata, in ISO 8601 format (YYYY-MM-DD). Take the calendar date as written (for "2025-04-26T16:30:00-04:00" return "2025-04-26"); do not convert time zones.
 
-modified_date (str): The last modified or updated date and time of the article, if present. If there is no update time, return the same value as published_date.
+modified_date (str): The last modified or updated date of the article in the same format, if present. If there is no update time, return the same value as published_date.
 
 Instructions:
 Look first in structured data (json ld, OpenGraph tags, and meta tags).
 
 If structured data is missing or incomplete, fall back to text in visible headers, bylines, or timestamp areas.
 
-If a field is truly not present, return an empty string "" for that field.
+The input may include "known_fields" (values already verified from the page's metadata) and "fields_to_extract". When it does, return the known values unchanged, extract only the fields listed in fields_to_extract, and return "N/A" for any other field. The page text may then be only a short excerpt.
+
+If a field is truly not present, return "N/A" for that field.
 
 Your output must be a single, well-formed JSON object with only the specified keys.
 
@@ -85,33 +102,135 @@ Example Output:
   "authors": "Jerome Socolovsky, Robbie Griffiths",
   "source": "NPR",
   "article_text": "TEL AVIV, Israel — Egypt announced Sunday it would host a summit of Arab leaders later in the month, amid alarm in the region over President Trump's proposals regarding the future of Gaza.\n\nPresident Donald Trump and Israeli Prime Minister Benjamin Netanyahu speak during a news conference in the East Room of the White House on Tuesday.\nMiddle East crisis — explained\nTrump says the U.S. will 'take over' Gaza and relocate its people. What does it mean?\nA statement by the Egyptian foreign ministry says the summit is being called in response to a Palestinian request.\n\nIt said the leaders will gather on Feb. 27 to discuss 'the new and dangerous developments in the Palestinian issue.'\n\nAlso Sunday, Israeli forces began withdrawing from the Netzarim corridor in Gaza, in the latest stage of the ceasefire deal between Israel and Hamas.\n\nThe Netzarim corridor is a four mile strip of land bisecting northern and southern Gaza that Israel fortified during the war, using it as a military zone. Last month, as part of the ceasefire deal, Israel started allowing Palestinians to cross the Netzarim corridor and return to their homes in the North.\n\nThe withdrawal is part of the six week first phase of the ceasefire, in which Hamas is gradually releasing 33 Israeli hostages in exchange for hundreds of Palestinian prisoners and detainees, while allowing aid to Gaza.\n\nIn the next stage of the ceasefire, all remaining living hostages would be released in return for a complete Israeli withdrawal from Gaza, and 'sustainable calm.'\n\nBut negotiations are ongoing on the details. Israel wants Hamas' military and political capabilities eliminated, while Hamas wants all Israeli troops removed from Gaza.\n\nEgypt's announcement of a summit comes less than a week after many Arab states rejected Trump's recent comments about relocating Gaza's residents and creating a \"Riviera of the Middle East\" there, as have Palestinian leaders.\n\nTrump made the proposal Tuesday when he met Israeli Prime Minister Benjamin Netanyahu in Washington D.C. Speaking to reporters at the White House Friday, Trump said he viewed the proposal as \"a real estate transaction, where we'll be an investor in that part of the world.\" He added that he was in \"no rush to do anything.\"\n\nSeveral countries also condemned a suggestion by Israeli Prime Minister Benjamin Netanyahu — that Saudi Arabia has enough land for a Palestinian state.\n\nNetanyahu appeared to be joking in response to a slip by an Israeli TV interviewer, but his words reverberated through the region at a time when tensions are running high.\n\nDisplaced Palestinians making their way back on foot from the southern regions to their homes in the north via Al Rashid Road after the ceasefire agreement in Gaza Strip on January 28, 2025.\nMiddle East crisis — explained\nA brief history of Gaza's tortured role in the Middle East conflict\nAlso on Sunday, there were emotional scenes in Bangkok airport, as five Thai workers who were released after being held hostage for over a year in Gaza arrived back home.\n\n\"We are all very grateful and very happy that we get to return to our homeland. We all would really like to thank you. I don't know what else to say,\" one of the Thai hostages, Pongsak Thaenna, told a news conference at the airport.\n\nThe war in Gaza, sparked by Hamas' attack that killed 1,200 people and saw 250 taken hostage, has killed more than 47,000 Palestinians according to local health authorities.\n\nIn recent days, violence in the West Bank has intensified. On Sunday morning, the Palestinian Health Ministry said a 23-year-old Palestinian woman, who was eight months pregnant, was fatally shot by Israeli gunfire in the Nur Shams urban refugee camp in northern occupied West Bank. The Israeli military said in a statement that it is investigating the incident.",
-  "published_date": "2025-02-09T06:13:44",
-  "modified_date": "2025-02-09T06:13:44"
+  "published_date": "2025-02-09",
+  "modified_date": "2025-02-09"
 }}
 """
 
 
-def create_cache():
-    try:
-        cache_name = gemini_client.caches.list()[0].name
-        potential_existing = gemini_client.caches.get(name=cache_name)
-        # print(f"found existing cache: {cache_name}")
-        return potential_existing
-    except Exception as e:
-        print("cache probably not created yet:", e)
-
-        # Create a cache with a 1 hour TTL
-        print("creating cached system prompt")
-        cache = gemini_client.caches.create(
-            model=GEMINI_MODEL,
+class ContextCacheManager:
+    """
+    Keeps one Gemini cached-content entry alive for a system instruction.
+
+    The entry is found (or created) by a display name derived from a hash of
+    the model and prompt text, so a changed prompt never reuses a stale
+    cache and restarts reuse the live one. Its TTL is extended once less
+    than `refresh_seconds` remain. `cache_name()` returns None whenever no
+    usable cache exists, and callers then send the prompt inline.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        system_instruction: str,
+        ttl_seconds: int = GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+        refresh_seconds: int = GEMINI_CONTEXT_CACHE_REFRESH_SECONDS,
+    ):
+        self.client = client
+        self.model = model
+        self.system_instruction = system_instruction
+        self.ttl_seconds = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self.content_hash = hashlib.sha256(
+            f"{model}\0{system_instruction}".encode("utf-8")
+        ).hexdigest()[:16]
+        self.display_name = f"web-gist-{self.content_hash}"
+
+        self._name: str | None = None
+        self._expires_at = 0.0
+        self._disabled_until = 0.0
+        self._lock = threading.Lock()
+
+    def cache_name(self) -> str | None:
+        """The live cache's resource name, refreshed or created as needed."""
+        with self._lock:
+            now = time.time()
+            if now < self._disabled_until:
+                return None
+            if self._name and self._expires_at - now > self.refresh_seconds:
+                return self._name
+            try:
+                if self._name:
+                    self._refresh()
+                else:
+                    self._find_or_create()
+            except errors.APIError as e:
+                logging.warning(
+                    f"Context cache unavailable, sending prompt inline for "
+                    f"{_RETRY_AFTER_FAILURE_SECONDS}s: {e}"
+                )
+                self._name = None
+                self._disabled_until = now + _RETRY_AFTER_FAILURE_SECONDS
+            return self._name
+
+    def invalidate(self, name: str):
+        """Forgets `name` after the API reported it expired or missing."""
+        with self._lock:
+            if self._name == name:
+                logging.info(f"Context cache {name} expired; will recreate")
+                self._name = None
+
+    def _refresh(self):
+        try:
+            cache = self.client.caches.update(
+                name=self._name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s"),
+            )
+        except errors.ClientError:
+            # Expired or deleted between checks.
+            self._name = None
+            self._find_or_create()
+            return
+        self._remember(cache)
+        logging.info(f"Refreshed context cache {cache.name}")
+
+    def _find_or_create(self):
+        now = time.time()
+        for cache in self.client.caches.list():
+            if (
+                cache.display_name == self.display_name
+                and (cache.model or "").endswith(self.model)
+                and cache.expire_time
+                and cache.expire_time.timestamp() - now > self.refresh_seconds
+            ):
+                self._remember(cache)
+                logging.info(f"Reusing context cache {cache.name}")
+                return
+
+        cache = self.client.caches.create(
+            model=self.model,
             config=types.CreateCachedContentConfig(
-                system_instruction=(html_parser_sys_prompt),
-                ttl="3600s",  # 1 hours
+                display_name=self.display_name,
+                system_instruction=self.system_instruction,
+                ttl=f"{self.ttl_seconds}s",
             ),
         )
-        print(cache.name)
-        print("finished creating cache")
-        return cache
+        self._remember(cache)
+        logging.info(f"Created context cache {cache.name} ({self.display_name})")
+
+    def _remember(self, cache):
+        self._name = cache.name
+        self._expires_at = (
+            cache.expire_time.timestamp()
+            if cache.expire_time
+            else time.time() + self.ttl_seconds
+        )
+
+
+def is_cache_expired_error(exc: Exception) -> bool:
+    """True for API errors caused by a cached-content entry that no longer exists."""
+    return (
+        isinstance(exc, errors.ClientError)
+        and exc.code in (400, 403, 404)
+        and "cache" in str(exc).lower()
+    )
 
 
-# print(create_cache())
+def create_cache():
+    """Returns the live cached content for `html_parser_sys_prompt`, creating it if needed."""
+    from utils.llm_utils import client
+
+    manager = ContextCacheManager(client, GEMINI_MODEL, html_parser_sys_prompt)
+    name = manager.cache_name()
+    return client.caches.get(name=name) if name else None
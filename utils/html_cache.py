@@ -0,0 +1,255 @@
+# utils/html_cache.py
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import (
+    CACHE_DIR,
+    HTML_CACHE_ENABLED,
+    HTML_CACHE_REPLAY_ONLY,
+    HTML_CACHE_MAX_BYTES,
+    HTML_CACHE_DEFAULT_TTL_HOURS,
+    HTML_CACHE_DOMAIN_TTL_HOURS,
+)
+from utils.url_utils import normalize_url, url_domain
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url_key     TEXT PRIMARY KEY,
+    url         TEXT NOT NULL,
+    domain      TEXT NOT NULL,
+    blob_hash   TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    headers     TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+CREATE INDEX IF NOT EXISTS pages_blob_hash ON pages (blob_hash);
+"""
+
+
+class CacheMissError(LookupError):
+    """Raised in replay-only mode when a URL has never been fetched."""
+
+
+class HtmlCache:
+    """
+    Content-addressed on-disk cache of raw page responses.
+
+    Bodies are gzip-compressed and stored once per SHA-256 under `blobs/`;
+    a SQLite index maps each fetched URL (`normalize_url`, not the looser
+    dedupe key) to its blob, response headers and fetch time. Entries expire per domain (HTML_CACHE_DOMAIN_TTL_HOURS) and
+    the least recently used ones are evicted once the blobs exceed
+    HTML_CACHE_MAX_BYTES.
+
+    In replay-only mode expired entries are still served and misses raise
+    `CacheMissError`, so reruns never touch the network.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = HTML_CACHE_MAX_BYTES,
+        replay_only: bool = HTML_CACHE_REPLAY_ONLY,
+    ):
+        self.root = root
+        self.blob_dir = root / "blobs"
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(root / "index.sqlite", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._total_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT DISTINCT blob_hash, size FROM pages)"
+        ).fetchone()[0]
+
+    @staticmethod
+    def ttl_seconds(url: str) -> float:
+        domain = url_domain(url)
+        hours = HTML_CACHE_DOMAIN_TTL_HOURS.get(
+            domain.removeprefix("www."), HTML_CACHE_DEFAULT_TTL_HOURS
+        )
+        return hours * 3600
+
+    def _blob_path(self, blob_hash: str) -> Path:
+        return self.blob_dir / blob_hash[:2] / f"{blob_hash}.gz"
+
+    # --- Lookups ---
+    def get(self, url: str) -> bytes | None:
+        """Returns the cached body for `url`, or None if missing or expired."""
+        entry = self.get_entry(url)
+        return entry["body"] if entry else None
+
+    def get_entry(self, url: str) -> dict | None:
+        """Returns the cached body, headers and fetch time for `url`."""
+        url_key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blob_hash, headers, fetched_at FROM pages WHERE url_key = ?",
+                (url_key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        blob_hash, headers, fetched_at = row
+        if not self.replay_only and time.time() - fetched_at > self.ttl_seconds(url):
+            return None
+        try:
+            body = gzip.decompress(self._blob_path(blob_hash).read_bytes())
+        except (OSError, EOFError) as e:
+            logging.warning(f"Dropping unreadable cache entry for {url}: {e}")
+            self.delete(url)
+            return None
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET last_access = ? WHERE url_key = ?",
+                (time.time(), url_key),
+            )
+            self._db.commit()
+        return {"body": body, "headers": json.loads(headers), "fetched_at": fetched_at}
+
+    # --- Writes ---
+    def put(self, url: str, body: bytes, headers: dict | None = None):
+        """Stores a fetched body for `url`, then evicts down to the byte budget."""
+        url_key = normalize_url(url)
+        blob_hash = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(blob_hash)
+        compressed = None
+        if not blob_path.exists():
+            compressed = gzip.compress(body, compresslevel=6)
+            blob_path.parent.mkdir(exist_ok=True)
+            tmp_path = blob_path.with_suffix(".tmp")
+            tmp_path.write_bytes(compressed)
+            tmp_path.replace(blob_path)
+        size = len(compressed) if compressed is not None else blob_path.stat().st_size
+
+        now = time.time()
+        with self._lock:
+            old = self._db.execute(
+                "SELECT blob_hash FROM pages WHERE url_key = ?", (url_key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url_key,
+                    url,
+                    url_domain(url),
+                    blob_hash,
+                    size,
+                    json.dumps(dict(headers or {})),
+                    now,
+                    now,
+                ),
+            )
+            if compressed is not None:
+                self._total_bytes += size
+            if old and old[0] != blob_hash:
+                self._release_blob(old[0])
+            self._db.commit()
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, url: str):
+        url_key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blob_hash FROM pages WHERE url_key = ?", (url_key,)
+            ).fetchone()
+            if row:
+                self._db.execute("DELETE FROM pages WHERE url_key = ?", (url_key,))
+                self._release_blob(row[0])
+                self._db.commit()
+
+    def _release_blob(self, blob_hash: str):
+        """Deletes a blob file once no entry references it. Caller holds the lock."""
+        still_used = self._db.execute(
+            "SELECT 1 FROM pages WHERE blob_hash = ? LIMIT 1", (blob_hash,)
+        ).fetchone()
+        if still_used:
+            return
+        blob_path = self._blob_path(blob_hash)
+        try:
+            self._total_bytes -= blob_path.stat().st_size
+            blob_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Drops least recently used entries until 90% of the budget. Caller holds the lock."""
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._total_bytes > target:
+            rows = self._db.execute(
+                "SELECT url_key, blob_hash FROM pages ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for url_key, blob_hash in rows:
+                self._db.execute("DELETE FROM pages WHERE url_key = ?", (url_key,))
+                self._release_blob(blob_hash)
+                evicted += 1
+                if self._total_bytes <= target:
+                    break
+        self._db.commit()
+        logging.info(
+            f"HTML cache evicted {evicted} entries "
+            f"({self._total_bytes / 1e6:.1f}MB of {self.max_bytes / 1e6:.0f}MB used)"
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "replay_only": self.replay_only,
+        }
+
+
+# --- Process-wide cache ---
+_cache: HtmlCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_html_cache() -> HtmlCache | None:
+    """Returns the shared cache, or None when HTML_CACHE_ENABLED is off."""
+    global _cache
+    if not HTML_CACHE_ENABLED and not HTML_CACHE_REPLAY_ONLY:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = HtmlCache(Path(CACHE_DIR) / "html")
+        return _cache
+
+
+# --- Command Line ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or seed the HTML cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show entry count and size.")
+    import_cmd = commands.add_parser(
+        "import", help="Store a saved page (e.g. html_dumps/npr.html) for a URL."
+    )
+    import_cmd.add_argument("url")
+    import_cmd.add_argument("file", type=Path)
+    args = parser.parse_args()
+
+    cache = HtmlCache(Path(CACHE_DIR) / "html")
+    if args.command == "import":
+        cache.put(args.url, args.file.read_bytes(), {"x-imported-from": str(args.file)})
+        print(f"Cached {args.file} as {normalize_url(args.url)}")
+    print(cache.stats())
@@ -0,0 +1,226 @@
+# utils/html_parsing.py
+import atexit
+import multiprocessing
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from config import HTML_PARSER_BACKEND, PARSE_EXECUTOR, PARSE_PROCESSES
+from utils.json_ld_finder import extract_ld_json_and_article, build_ld_json_result
+from utils.page_scanner import UNWANTED_TAGS, scan_html
+
+RAW_HTML_LIMIT = 20000  # Chars of raw HTML kept for date extraction.
+
+
+def clean_content_fast(soup: BeautifulSoup) -> str:
+    """Faster content cleaning with targeted removal."""
+    # Remove unwanted elements in one pass
+    for tag_name in UNWANTED_TAGS:
+        for element in soup.find_all(tag_name):
+            element.decompose()
+
+    # Get main content with priority order
+    content_candidates = [
+        soup.find("article"),
+        soup.find("main"),
+        soup.body,
+    ]
+
+    main_content = next((c for c in content_candidates if c), soup)
+    if not main_content:
+        return ""
+
+    # Extract text more efficiently
+    content_text = main_content.get_text(separator=" ", strip=True)
+    return re.sub(r"\s+", " ", content_text).strip()
+
+
+# --- Parser Backends ---
+
+
+class ScannerBackend:
+    """
+    One streaming pass with `PageScanner`, driven by lxml or `html.parser`.
+
+    Replaces the BeautifulSoup flow, which walked the tree once per
+    unwanted tag, again for JSON-LD, paragraphs and the content candidates,
+    and then re-serialized the whole document.
+    """
+
+    def __init__(self, parser: str):
+        self.name = parser
+        self.parser = parser
+
+    def parse_page(self, html_bytes: bytes) -> dict:
+        return scan_html(html_bytes, self.parser, RAW_HTML_LIMIT)
+
+
+class Bs4Backend:
+    """
+    The original multi-walk BeautifulSoup flow, kept as a baseline for bench_parsers.py.
+
+    "bs4" is the flow exactly as it ran before (on `html.parser`); "bs4-lxml"
+    swaps in the lxml tree builder, separating its gain from the scanner's.
+    """
+
+    def __init__(self, parser: str = "html.parser"):
+        self.name = "bs4" if parser == "html.parser" else f"bs4-{parser}"
+        self.parser = parser
+
+    def parse_page(self, html_bytes: bytes) -> dict:
+        soup = BeautifulSoup(html_bytes, self.parser)
+        json_ld = extract_ld_json_and_article(soup)
+        content_text = clean_content_fast(soup)
+        return {
+            "json_ld": json_ld,
+            "content_text": content_text,
+            "raw_html": str(soup)[:RAW_HTML_LIMIT],
+        }
+
+
+class SelectolaxBackend:
+    """The lexbor engine via selectolax; no BeautifulSoup tree is built."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as e:
+            raise ImportError(
+                "HTML_PARSER_BACKEND = 'selectolax' needs `pip install selectolax`"
+            ) from e
+        self._parser_cls = LexborHTMLParser
+
+    def parse_page(self, html_bytes: bytes) -> dict:
+        tree = self._parser_cls(html_bytes)
+        json_ld = build_ld_json_result(
+            [node.text() for node in tree.css('script[type="application/ld+json"]')],
+            lambda: [node.text(strip=True) for node in tree.css("p")],
+        )
+
+        head = _selectolax_head(tree)
+        tree.strip_tags(list(UNWANTED_TAGS))
+        main_content = tree.css_first("article") or tree.css_first("main") or tree.body
+        content_text = ""
+        if main_content is not None:
+            content_text = main_content.text(separator=" ", strip=True)
+            content_text = re.sub(r"\s+", " ", content_text).strip()
+
+        return {
+            "json_ld": json_ld,
+            "content_text": content_text,
+            "raw_html": (tree.html or "")[:RAW_HTML_LIMIT],
+            **head,
+        }
+
+
+def _selectolax_head(tree) -> dict:
+    """Meta/OpenGraph tags, `<time>` elements, canonical link and title."""
+    meta: dict[str, str] = {}
+    for node in tree.css("meta[content]"):
+        attrs = node.attributes
+        key = attrs.get("property") or attrs.get("name") or attrs.get("itemprop")
+        if key and attrs.get("content"):
+            meta.setdefault(key.strip().lower(), attrs["content"].strip())
+
+    canonical = tree.css_first('link[rel~="canonical"][href]')
+    title = tree.css_first("title")
+    return {
+        "meta": meta,
+        "times": [
+            {
+                "datetime": node.attributes.get("datetime"),
+                "text": node.text(separator=" ", strip=True),
+            }
+            for node in tree.css("time")
+        ],
+        "canonical_url": canonical.attributes["href"].strip() if canonical else None,
+        "title": title.text(strip=True) if title else None,
+    }
+
+
+PARSER_BACKENDS = {
+    "html.parser": lambda: ScannerBackend("html.parser"),
+    "lxml": lambda: ScannerBackend("lxml"),
+    "selectolax": SelectolaxBackend,
+    "bs4": Bs4Backend,
+    "bs4-lxml": lambda: Bs4Backend("lxml"),
+}
+
+_backends: dict = {}
+
+
+def get_parser_backend(name: str = HTML_PARSER_BACKEND):
+    """
+    Returns the (cached) backend registered as `name` in PARSER_BACKENDS.
+
+    Raises:
+        ValueError: If `name` is not a known backend.
+        ImportError: If the backend's parser library is not installed.
+    """
+    if name not in PARSER_BACKENDS:
+        raise ValueError(
+            f"Unknown HTML parser backend {name!r}; choose from {sorted(PARSER_BACKENDS)}"
+        )
+    if name not in _backends:
+        _backends[name] = PARSER_BACKENDS[name]()
+    return _backends[name]
+
+
+def parse_html_page(html_bytes: bytes) -> dict:
+    """
+    Runs the CPU-bound parse of one page on the configured HTML_PARSER_BACKEND.
+
+    Takes raw bytes and returns only small, picklable results, so it can run
+    in a worker process without any parse tree crossing the boundary.
+
+    Returns:
+        A dict with `json_ld` (see `extract_ld_json_and_article`),
+        `content_text` (cleaned main-content text), `raw_html` (the start
+        of the cleaned document, for date extraction), and the page's
+        `meta` tags by lowercased name/property, `times` (`<time>`
+        datetime and text), `canonical_url` and `title`.
+    """
+    return get_parser_backend().parse_page(html_bytes)
+
+
+# --- Parse Executor ---
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_parse_executor() -> Executor:
+    """
+    Returns the shared executor for `parse_html_page`.
+
+    With PARSE_EXECUTOR = "process" this is a pool of PARSE_PROCESSES worker
+    processes, so parsing scales with cores instead of queuing on the GIL.
+    Workers are spawned rather than forked because the parent already runs
+    browser and HTTP threads.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if PARSE_EXECUTOR == "process":
+                _executor = ProcessPoolExecutor(
+                    max_workers=PARSE_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PARSE_PROCESSES, thread_name_prefix="parse"
+                )
+        return _executor
+
+
+@atexit.register
+def shutdown_parse_executor():
+    """Stops the parse workers; registered to run at exit."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,207 @@
+# utils/http_fetcher.py
+import importlib.util
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import (
+    CACHE_DIR,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_MIN_BODY_BYTES,
+    DOMAIN_TIER_TTL_DAYS,
+)
+from utils.browser_pool import USER_AGENTS, EXTRA_HEADERS
+from utils.deadlines import timeout_for
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+HTTP_HEADERS = {
+    "User-Agent": USER_AGENTS[0],
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    **EXTRA_HEADERS,
+}
+
+# Statuses that mean "a browser might get through", not "the page is gone".
+BLOCKED_STATUSES = {401, 403, 429, 503}
+
+# Markers that a server-rendered article page is present in the initial HTML.
+CONTENT_MARKERS = re.compile(rb"<article[\s>]|<main[\s>]|application/ld\+json", re.I)
+
+# Interstitials served with a 200 by common bot walls.
+BOT_WALL_MARKERS = re.compile(
+    rb"cf-browser-verification|challenge-platform|captcha-delivery|"
+    rb"<title>\s*(?:Just a moment|Attention Required|Access Denied)",
+    re.I,
+)
+
+# Bot walls announce themselves early; only this much of a page is scanned.
+_SCAN_BYTES = 512 * 1024
+
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+def escalation_reason(status_code: int, body: bytes) -> str | None:
+    """
+    Decides whether a plain-HTTP response is good enough to parse.
+
+    Returns:
+        None if the body can be used as-is, otherwise a short reason why the
+        page should be loaded in a browser instead.
+    """
+    if status_code in BLOCKED_STATUSES:
+        return f"blocked ({status_code})"
+    if status_code >= 400:
+        return f"bad status ({status_code})"
+    if len(body) < HTTP_MIN_BODY_BYTES:
+        return f"empty ({len(body)} bytes)"
+    head = body[:_SCAN_BYTES]
+    if BOT_WALL_MARKERS.search(head):
+        return "bot wall"
+    if not CONTENT_MARKERS.search(body):
+        return "no <article>, <main> or JSON-LD"
+    return None
+
+
+# --- Domain Tier Verdicts ---
+
+
+class DomainTierStore:
+    """
+    Remembers which tier each domain needs, persisted as JSON under CACHE_DIR.
+
+    Verdicts older than DOMAIN_TIER_TTL_DAYS are ignored so a domain that
+    dropped its bot wall is eventually tried over plain HTTP again.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._verdicts: dict[str, dict] = {}
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                self._verdicts = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Ignoring unreadable domain tier file {self.path}: {e}")
+
+    def get(self, url: str) -> str | None:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            verdict = self._verdicts.get(host)
+        if not verdict or time.time() - verdict["updated"] > self.ttl_seconds:
+            return None
+        return verdict["tier"]
+
+    def record(self, url: str, tier: str, reason: str = ""):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            previous = self._verdicts.get(host, {}).get("tier")
+            self._verdicts[host] = {
+                "tier": tier,
+                "reason": reason,
+                "updated": time.time(),
+            }
+            if previous != tier:
+                logging.info(f"Domain tier for {host}: {tier} {reason}".rstrip())
+                self._save()
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(self._verdicts, f, indent=2, sort_keys=True)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logging.warning(f"Could not save domain tiers to {self.path}: {e}")
+
+
+domain_tiers = DomainTierStore(
+    Path(CACHE_DIR) / "domain_tiers.json",
+    ttl_seconds=DOMAIN_TIER_TTL_DAYS * 24 * 3600,
+)
+
+
+def accept_http_response(url: str, status_code: int, body: bytes) -> bool:
+    """
+    Records the domain's tier verdict for a plain-HTTP response.
+
+    Returns True if the body can be parsed, False if the URL should be
+    loaded in a browser. A plain 404/410 only escalates that one URL; it says
+    nothing about what the rest of the domain needs.
+    """
+    reason = escalation_reason(status_code, body)
+    if reason is None:
+        domain_tiers.record(url, TIER_HTTP)
+        return True
+    logging.info(f"Escalating to browser for {url}: {reason}")
+    if status_code < 400 or status_code in BLOCKED_STATUSES:
+        domain_tiers.record(url, TIER_BROWSER, reason)
+    return False
+
+
+# --- Shared HTTP Clients ---
+
+
+def _client_options() -> dict:
+    return {
+        "http2": _HTTP2,
+        "headers": HTTP_HEADERS,
+        "follow_redirects": True,
+        "timeout": HTTP_TIMEOUT_SECONDS,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        ),
+    }
+
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Returns the process-wide keep-alive client (thread-safe)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(**_client_options())
+        return _client
+
+
+def new_async_http_client() -> httpx.AsyncClient:
+    """Creates a pooled async client; use one per event loop."""
+    return httpx.AsyncClient(**_client_options())
+
+
+def http_get(url: str) -> tuple[int, bytes, dict]:
+    """
+    GETs `url` on the shared client and returns (status, raw body, headers).
+
+    The request timeout is cut to what is left of the current `Deadline`.
+    """
+    response = get_http_client().get(
+        url, timeout=timeout_for(HTTP_TIMEOUT_SECONDS, "HTTP fetch")
+    )
+    return response.status_code, response.content, dict(response.headers)
+
+
+async def http_get_async(
+    client: httpx.AsyncClient, url: str
+) -> tuple[int, bytes, dict]:
+    """Async counterpart of `http_get`."""
+    response = await client.get(
+        url, timeout=timeout_for(HTTP_TIMEOUT_SECONDS, "HTTP fetch")
+    )
+    return response.status_code, response.content, dict(response.headers)
@@ -0,0 +1,338 @@
+# utils/job_queue.py
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+from config import (
+    CACHE_DIR,
+    JOB_WORKERS,
+    JOB_MAX_PER_USER,
+    JOB_HISTORY_LIMIT,
+    JOB_SHARD_SIZE,
+)
+from utils.domain_scheduler import DomainScheduler
+from utils.url_ingest import iter_shards
+
+# Job states.
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+ACTIVE_STATES = {JOB_QUEUED, JOB_RUNNING}
+
+# The engines report progress as "Completed <done>/<total> URLs".
+_PROGRESS = re.compile(r"Completed (\d+)/(\d+)")
+_SAVE_EVERY_SECONDS = 2.0
+_IDLE_SECONDS = 1.0
+
+
+class Job:
+    """
+    One submitted batch of URLs and its progress.
+
+    The URLs themselves stay in a spool file (`urls_path`, one per line;
+    see `utils/url_ingest.py`) and are processed `shard_size` at a time.
+    Everything except `result` (the last shard's return value) is saved to
+    disk, so a job outlives the session that submitted it and, if the
+    server restarts, resumes at the shard it was on.
+    """
+
+    _FIELDS = (
+        "id",
+        "owner",
+        "urls_path",
+        "output_path",
+        "timeout_seconds",
+        "state",
+        "submitted_at",
+        "started_at",
+        "finished_at",
+        "done",
+        "total",
+        "message",
+        "stats",
+        "error",
+        "shard_size",
+        "shards_done",
+        "shard_offset",
+    )
+
+    def __init__(
+        self,
+        owner: str,
+        urls_path: str,
+        total: int,
+        output_path: str,
+        timeout_seconds: float | None = None,
+        shard_size: int = JOB_SHARD_SIZE,
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.urls_path = urls_path
+        self.output_path = output_path
+        self.timeout_seconds = timeout_seconds
+        self.state = JOB_QUEUED
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.done = 0
+        self.total = total
+        self.message = ""
+        self.stats: dict | None = None
+        self.error: str | None = None
+        self.result: dict | None = None
+        self.resume = False
+        self.shard_size = shard_size
+        self.shards_done = 0
+        # Output file size when the current shard started.
+        self.shard_offset = 0
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 0.0
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self._FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        job = cls(data["owner"], data["urls_path"], data["total"], data["output_path"])
+        for field in cls._FIELDS:
+            if field in data:
+                setattr(job, field, data[field])
+        return job
+
+
+class JobStore:
+    """One JSON file per job under `directory`, replaced atomically on save."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def save(self, job: Job):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{job.id}.json"
+            tmp_path = path.with_suffix(".tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(job.to_dict(), f)
+            tmp_path.replace(path)
+        except OSError as e:
+            logging.warning(f"Could not save job {job.id}: {e}")
+
+    def delete(self, job: Job):
+        (self.directory / f"{job.id}.json").unlink(missing_ok=True)
+        Path(job.urls_path).unlink(missing_ok=True)
+
+    def load(self) -> list[Job]:
+        """Every saved job, oldest submission first; unreadable files are skipped."""
+        jobs = []
+        for path in self.directory.glob("*.json"):
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    jobs.append(Job.from_dict(json.load(f)))
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Ignoring unreadable job file {path}: {e}")
+        return sorted(jobs, key=lambda job: job.submitted_at)
+
+
+class JobQueue:
+    """
+    Runs submitted jobs on a pool of worker threads outside the UI's script thread.
+
+    Queued jobs are handed out by a `DomainScheduler` keyed on the job's
+    owner, so users are served round-robin and none has more than
+    `per_user` jobs running: one user's long queue never starves another's
+    single job. Jobs interrupted by a restart are queued again and resume
+    at the first shard without rows in their output file.
+
+    Args:
+        runner: Called once per shard as `runner(urls, output_path,
+            status_callback, append=..., keep_results=False,
+            timeout_seconds=...)`; returns the result dict (`process_urls`).
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., dict],
+        workers: int = JOB_WORKERS,
+        per_user: int = JOB_MAX_PER_USER,
+        state_dir: Path = Path(CACHE_DIR) / "jobs",
+        history_limit: int = JOB_HISTORY_LIMIT,
+    ):
+        self.runner = runner
+        self.history_limit = history_limit
+        self.store = JobStore(state_dir)
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._scheduler = DomainScheduler(
+            [],
+            key=lambda job: job.owner,
+            max_in_flight=workers,
+            per_domain=per_user,
+            min_delay=0.0,
+        )
+
+        for job in self.store.load()[-history_limit:]:
+            self._jobs[job.id] = job
+            if job.active:
+                logging.info(f"Resuming job {job.id} ({job.done}/{job.total} URLs done)")
+                job.state, job.resume = JOB_QUEUED, True
+                self._scheduler.add(job)
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        owner: str,
+        urls_path: str,
+        total: int,
+        output_path: str,
+        timeout_seconds: float | None = None,
+    ) -> Job:
+        """
+        Queues a job for the `total` URLs spooled in `urls_path` and returns it
+        right away. The job owns the spool file from then on.
+        """
+        job = Job(owner, urls_path, total, output_path, timeout_seconds)
+        with self._lock:
+            self._jobs[job.id] = job
+        self.store.save(job)
+        self._scheduler.add(job)
+        logging.info(f"Queued job {job.id} for {owner}: {total} URLs")
+        self._trim_history()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a job that has not started yet."""
+        job = self.get(job_id)
+        if job is None or not self._scheduler.discard(job):
+            return False
+        job.state, job.finished_at = JOB_CANCELLED, time.time()
+        self.store.save(job)
+        return True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs_for(self, owner: str) -> list[Job]:
+        """`owner`'s jobs, newest first."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.owner == owner]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "queued": sum(job.state == JOB_QUEUED for job in jobs),
+            "running": sum(job.state == JOB_RUNNING for job in jobs),
+            "users": len({job.owner for job in jobs if job.active}),
+        }
+
+    def _trim_history(self):
+        """Forgets the oldest finished jobs beyond `history_limit`."""
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if not job.active),
+                key=lambda job: job.submitted_at,
+            )
+            dropped = finished[: max(0, len(self._jobs) - self.history_limit)]
+            for job in dropped:
+                del self._jobs[job.id]
+        for job in dropped:
+            self.store.delete(job)
+
+    # --- Workers ---
+    def _work(self):
+        while True:
+            job, wait = self._scheduler.poll()
+            if job is None:
+                self._scheduler.wait(wait or _IDLE_SECONDS)
+                continue
+            try:
+                self._run(job)
+            finally:
+                self._scheduler.release(job, None)
+
+    def _run(self, job: Job):
+        job.state, job.started_at = JOB_RUNNING, time.time()
+        job.error = None
+        self.store.save(job)
+        saved_at = time.monotonic()
+        base = 0
+
+        def on_status(message: str):
+            nonlocal saved_at
+            job.message = message
+            match = _PROGRESS.search(message)
+            if match:
+                job.done = base + int(match.group(1))
+            if time.monotonic() - saved_at >= _SAVE_EVERY_SECONDS:
+                saved_at = time.monotonic()
+                self.store.save(job)
+
+        output_path = Path(job.output_path)
+        try:
+            for index, shard in enumerate(iter_shards(Path(job.urls_path), job.shard_size)):
+                if index < job.shards_done:
+                    base += len(shard)
+                    continue
+                if job.resume and output_path.exists():
+                    # Drop the interrupted shard's partial rows; it runs again.
+                    with output_path.open("r+b") as f:
+                        f.truncate(job.shard_offset)
+                job.resume = False
+                job.shard_offset = output_path.stat().st_size if index else 0
+                self.store.save(job)
+
+                job.result = self.runner(
+                    shard,
+                    job.output_path,
+                    on_status,
+                    append=index > 0,
+                    keep_results=False,
+                    timeout_seconds=job.timeout_seconds,
+                )
+                job.stats = _add_stats(job.stats, job.result.get("stats") or {})
+                base += len(shard)
+                job.done, job.shards_done = base, index + 1
+                self.store.save(job)
+        except Exception as e:
+            logging.error(f"Job {job.id} failed: {e}")
+            job.state, job.error = JOB_FAILED, str(e)
+        else:
+            job.done = job.total
+            job.state = JOB_DONE
+            logging.info(f"Job {job.id} finished: {job.stats}")
+        job.finished_at = time.time()
+        self.store.save(job)
+
+
+def _add_stats(total: dict | None, shard: dict) -> dict:
+    """Sums one shard's `stats` into the job's running totals."""
+    total = dict(total or {})
+    for key, value in shard.items():
+        total[key] = total.get(key, 0) + value
+    return total
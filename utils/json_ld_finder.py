@@ -2,7 +2,7 @@
 import json
 import logging
 from bs4 import BeautifulSoup, Tag
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
 from utils.text_scrubber import scrub_text
 
@@ -19,14 +19,35 @@ def extract_ld_json_and_article(soup: BeautifulSoup) -> Dict[str, Any] | None:
         scrubbed article text, or None if no JSON-LD is found.
     """
     script_tags = soup.find_all("script", type="application/ld+json")
+    return build_ld_json_result(
+        [script_tag.string for script_tag in script_tags],
+        lambda: [p.get_text(strip=True) for p in soup.find_all("p")],
+    )
+
+
+def build_ld_json_result(
+    script_texts: List[str | None],
+    get_paragraphs: Callable[[], List[str]],
+) -> Dict[str, Any] | None:
+    """
+    Parser-independent half of `extract_ld_json_and_article`.
+
+    Args:
+        script_texts: The contents of each `application/ld+json` script tag.
+        get_paragraphs: Returns the stripped text of each `<p>`; only called
+            when at least one JSON-LD block decoded.
+
+    Returns:
+        The same dictionary as `extract_ld_json_and_article`, or None.
+    """
     ld_datas: List[Dict[str, Any]] = []
 
-    for script_tag in script_tags:
+    for script_text in script_texts:
         # Ensure the tag has content
-        if not script_tag.string:
+        if not script_text:
             continue
         try:
-            ld_datas.append(json.loads(script_tag.string))
+            ld_datas.append(json.loads(script_text))
         except json.JSONDecodeError:
             logging.warning("Failed to decode a JSON-LD script tag.")
             continue
@@ -35,7 +56,7 @@ def extract_ld_json_and_article(soup: BeautifulSoup) -> Dict[str, Any] | None:
         return None
 
     # Extract all text in <p> tags and clean it
-    article_text = " ".join(p.get_text(strip=True) for p in soup.find_all("p"))
+    article_text = " ".join(get_paragraphs())
     cleaned_article_text = scrub_text(article_text)
 
     return {"ld_json_list": ld_datas, "article_text": cleaned_article_text}
@@ -0,0 +1,247 @@
+# utils/llm_batch.py
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+import httpx
+
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    LLM_BATCH_BASE_URL,
+    LLM_BATCH_POLL_SECONDS,
+    LLM_BATCH_MAX_WAIT_HOURS,
+)
+
+# Provider-neutral job states returned by `BatchProvider.state`.
+BATCH_PENDING = "pending"
+BATCH_SUCCEEDED = "succeeded"
+BATCH_FAILED = "failed"
+
+
+class BatchJobError(RuntimeError):
+    """Raised when a batch job fails, expires, or never finishes."""
+
+
+class BatchProvider:
+    """
+    A service that runs a JSONL file of LLM requests as one offline job.
+
+    Each request line carries a `key`; each result line echoes it with either
+    a `response` or an `error`.
+    """
+
+    name = "batch"
+
+    def submit(self, requests_path: Path, display_name: str) -> str:
+        """Uploads the request file and starts a job. Returns the job name."""
+        raise NotImplementedError
+
+    def state(self, job_name: str) -> str:
+        """Returns BATCH_PENDING, BATCH_SUCCEEDED or BATCH_FAILED."""
+        raise NotImplementedError
+
+    def download_results(self, job_name: str, dest: Path) -> Path:
+        """Writes the finished job's result JSONL to `dest`."""
+        raise NotImplementedError
+
+
+class GeminiBatchProvider(BatchProvider):
+    """
+    The Gemini Batch API over REST (files upload, batchGenerateContent).
+
+    Pointing `base_url` at `python -m utils.llm_batch_stub` runs the same
+    protocol against a local stand-in, with no quota or cost.
+    """
+
+    name = "gemini-batch"
+    _DONE_STATES = {"BATCH_STATE_SUCCEEDED", "JOB_STATE_SUCCEEDED"}
+    _FAILED_STATES = {
+        "BATCH_STATE_FAILED",
+        "BATCH_STATE_CANCELLED",
+        "BATCH_STATE_EXPIRED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    }
+
+    def __init__(
+        self,
+        api_key: str | None = GEMINI_API_KEY,
+        model: str = GEMINI_MODEL,
+        base_url: str = LLM_BATCH_BASE_URL,
+    ):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(
+            headers={"x-goog-api-key": api_key or ""}, timeout=120.0
+        )
+        self._jobs: dict[str, dict] = {}
+
+    def submit(self, requests_path: Path, display_name: str) -> str:
+        file_name = self._upload(requests_path, display_name)
+        response = self._client.post(
+            f"{self.base_url}/v1beta/models/{self.model}:batchGenerateContent",
+            json={
+                "batch": {
+                    "display_name": display_name,
+                    "input_config": {"file_name": file_name},
+                }
+            },
+        )
+        response.raise_for_status()
+        job_name = response.json()["name"]
+        logging.info(f"Submitted batch job {job_name} ({requests_path})")
+        return job_name
+
+    def _upload(self, path: Path, display_name: str) -> str:
+        """Resumable upload of the request file; returns its `files/...` name."""
+        size = path.stat().st_size
+        start = self._client.post(
+            f"{self.base_url}/upload/v1beta/files",
+            headers={
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "X-Goog-Upload-Header-Content-Length": str(size),
+                "X-Goog-Upload-Header-Content-Type": "application/jsonl",
+            },
+            json={"file": {"display_name": display_name}},
+        )
+        start.raise_for_status()
+        upload_url = start.headers["x-goog-upload-url"]
+        with path.open("rb") as f:
+            finish = self._client.post(
+                upload_url,
+                headers={
+                    "X-Goog-Upload-Offset": "0",
+                    "X-Goog-Upload-Command": "upload, finalize",
+                },
+                content=f.read(),
+            )
+        finish.raise_for_status()
+        return finish.json()["file"]["name"]
+
+    def state(self, job_name: str) -> str:
+        response = self._client.get(f"{self.base_url}/v1beta/{job_name}")
+        response.raise_for_status()
+        job = response.json()
+        self._jobs[job_name] = job
+        state = job.get("metadata", {}).get("state") or job.get("state", "")
+        if state in self._DONE_STATES:
+            return BATCH_SUCCEEDED
+        if state in self._FAILED_STATES or job.get("error"):
+            return BATCH_FAILED
+        return BATCH_PENDING
+
+    def download_results(self, job_name: str, dest: Path) -> Path:
+        job = self._jobs.get(job_name) or {}
+        responses_file = (
+            job.get("response", {}).get("responsesFile")
+            or job.get("metadata", {}).get("output", {}).get("responsesFile")
+        )
+        if not responses_file:
+            raise BatchJobError(f"Batch job {job_name} finished without a results file")
+        with self._client.stream(
+            "GET",
+            f"{self.base_url}/download/v1beta/{responses_file}:download",
+            params={"alt": "media"},
+        ) as response:
+            response.raise_for_status()
+            with dest.open("wb") as f:
+                for chunk in response.iter_bytes():
+                    f.write(chunk)
+        return dest
+
+
+def get_batch_provider() -> BatchProvider:
+    """The provider configured by LLM_BATCH_BASE_URL (Gemini or a local stub)."""
+    return GeminiBatchProvider()
+
+
+class BatchRequestWriter:
+    """Streams batch request lines to a JSONL file, one per unique key."""
+
+    def __init__(self, path: Path, build_request: Callable[[str, dict], dict]):
+        self.path = path
+        self.build_request = build_request
+        self.count = 0
+        self._keys: set[str] = set()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("w", encoding="utf-8")
+
+    def add(self, key: str, pass_dict: dict) -> bool:
+        """Writes one request. Returns False if `key` was already added."""
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        line = json.dumps(self.build_request(key, pass_dict), ensure_ascii=False)
+        self._file.write(line + "\n")
+        self.count += 1
+        return True
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def wait_for_batch(
+    provider: BatchProvider,
+    job_name: str,
+    status_callback: Callable[[str], None] = lambda msg: None,
+    poll_seconds: float = LLM_BATCH_POLL_SECONDS,
+    max_wait_seconds: float = LLM_BATCH_MAX_WAIT_HOURS * 3600,
+):
+    """
+    Polls until the job succeeds.
+
+    Raises:
+        BatchJobError: If the job fails or is still pending after
+            `max_wait_seconds`.
+    """
+    started = time.monotonic()
+    while True:
+        state = provider.state(job_name)
+        if state == BATCH_SUCCEEDED:
+            return
+        if state == BATCH_FAILED:
+            raise BatchJobError(f"Batch job {job_name} failed")
+        waited = time.monotonic() - started
+        if waited > max_wait_seconds:
+            raise BatchJobError(f"Batch job {job_name} still pending after {waited:.0f}s")
+        status_callback(f"⏳ Batch job {job_name} pending ({waited / 60:.0f} min)...")
+        time.sleep(poll_seconds)
+
+
+def iter_batch_results(path: Path) -> Iterator[tuple[str, str | None, str | None]]:
+    """
+    Reads a result JSONL file.
+
+    Yields:
+        `(key, response_text, error)` per line; exactly one of the last two
+        is set.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.warning(f"Skipping unreadable batch result line: {e}")
+                continue
+            key = item.get("key")
+            if item.get("error"):
+                yield key, None, str(item["error"].get("message", item["error"]))
+                continue
+            try:
+                parts = item["response"]["candidates"][0]["content"]["parts"]
+                yield key, "".join(part.get("text", "") for part in parts), None
+            except (KeyError, IndexError, TypeError):
+                yield key, None, "Batch response had no candidate text"
@@ -0,0 +1,154 @@
+# utils/llm_batch_stub.py
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class StubBatchState:
+    """In-memory uploads and jobs for the stub server."""
+
+    def __init__(self, delay_seconds: float):
+        self.delay_seconds = delay_seconds
+        self.files: dict[str, bytes] = {}
+        self.jobs: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+
+def stub_answer(key: str, request: dict) -> dict:
+    """A deterministic, schema-valid answer for one request line."""
+    prompt = "".join(
+        part.get("text", "")
+        for content in request.get("contents", [])
+        for part in content.get("parts", [])
+    )
+    answer = {
+        "title": f"Stub title for {key}",
+        "authors": "N/A",
+        "source": "Stub",
+        "published_date": "N/A",
+        "modified_date": "N/A",
+        "article_text": prompt[:200],
+    }
+    return {
+        "key": key,
+        "response": {"candidates": [{"content": {"parts": [{"text": json.dumps(answer)}]}}]},
+    }
+
+
+class StubBatchHandler(BaseHTTPRequestHandler):
+    """Implements the subset of the Gemini Batch API used by GeminiBatchProvider."""
+
+    state: StubBatchState
+
+    def _send_json(self, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self._read_body()
+        if path == "/upload/v1beta/files":
+            session = uuid.uuid4().hex
+            host = self.headers.get("Host")
+            self._send_json(
+                {}, {"x-goog-upload-url": f"http://{host}/upload-session/{session}"}
+            )
+        elif path.startswith("/upload-session/"):
+            file_name = f"files/{path.rsplit('/', 1)[1]}"
+            with self.state.lock:
+                self.state.files[file_name] = body
+            self._send_json({"file": {"name": file_name}})
+        elif path.endswith(":batchGenerateContent"):
+            input_file = json.loads(body)["batch"]["input_config"]["file_name"]
+            job_name = f"batches/{uuid.uuid4().hex}"
+            with self.state.lock:
+                lines = self.state.files[input_file].decode("utf-8").splitlines()
+                results = [
+                    json.dumps(stub_answer(item["key"], item["request"]))
+                    for item in map(json.loads, filter(None, lines))
+                ]
+                output_file = f"files/{job_name.split('/')[1]}-results"
+                self.state.files[output_file] = ("\n".join(results) + "\n").encode("utf-8")
+                self.state.jobs[job_name] = {
+                    "ready_at": time.monotonic() + self.state.delay_seconds,
+                    "output": output_file,
+                }
+            self._send_json({"name": job_name, "metadata": {"state": "BATCH_STATE_PENDING"}})
+        else:
+            self.send_error(404)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path.startswith("/v1beta/batches/"):
+            job_name = path.removeprefix("/v1beta/")
+            job = self.state.jobs.get(job_name)
+            if job is None:
+                self.send_error(404)
+            elif time.monotonic() < job["ready_at"]:
+                self._send_json({"name": job_name, "metadata": {"state": "BATCH_STATE_RUNNING"}})
+            else:
+                self._send_json(
+                    {
+                        "name": job_name,
+                        "done": True,
+                        "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+                        "response": {"responsesFile": job["output"]},
+                    }
+                )
+        elif path.startswith("/download/v1beta/") and path.endswith(":download"):
+            file_name = path.removeprefix("/download/v1beta/").removesuffix(":download")
+            data = self.state.files.get(file_name)
+            if data is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/jsonl")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_stub_server(port: int = 8765, delay_seconds: float = 2.0) -> ThreadingHTTPServer:
+    """Builds (but does not start) a stub server on localhost:`port`."""
+    handler = type(
+        "BoundStubBatchHandler",
+        (StubBatchHandler,),
+        {"state": StubBatchState(delay_seconds)},
+    )
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+# --- Command Line ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Gemini Batch API. Run batch jobs "
+        "against it with WEB_GIST_BATCH_URL=http://127.0.0.1:<port>."
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--delay", type=float, default=2.0, help="Seconds before a job succeeds."
+    )
+    args = parser.parse_args()
+
+    server = make_stub_server(args.port, args.delay)
+    print(f"Stub batch server on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,149 @@
+# utils/llm_cache.py
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import CACHE_DIR, LLM_CACHE_ENABLED
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key      TEXT PRIMARY KEY,
+    model          TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    url            TEXT,
+    response_json  TEXT NOT NULL,
+    created_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_prompt_version ON responses (prompt_version);
+"""
+
+# Fields that identify where the input came from rather than what it says.
+# Leaving them out lets syndicated copies of the same wire story share a hit.
+_IGNORED_INPUT_KEYS = {"url", "URL"}
+
+
+def _normalize(value):
+    """Collapses whitespace in strings and drops volatile keys, recursively."""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, dict):
+        return {
+            str(k): _normalize(v)
+            for k, v in value.items()
+            if k not in _IGNORED_INPUT_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(model: str, prompt_version: str, pass_dict: dict) -> str:
+    """Stable hash of model name, prompt version and normalized input."""
+    normalized = json.dumps(
+        _normalize(pass_dict), sort_keys=True, ensure_ascii=False, default=str
+    )
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, normalized):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LlmResponseCache:
+    """
+    Persistent SQLite cache of validated LLM extractions.
+
+    Stores the JSON of each validated response under `make_cache_key`, and
+    counts hits and misses for the current process.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response_json FROM responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(
+        self, key: str, model: str, prompt_version: str, url: str, response: dict
+    ):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    model,
+                    prompt_version,
+                    url,
+                    json.dumps(response, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+
+    def invalidate(self, prompt_version: str | None = None) -> int:
+        """
+        Deletes cached responses for one prompt version, or all of them.
+
+        Returns:
+            The number of entries removed.
+        """
+        with self._lock:
+            if prompt_version is None:
+                cursor = self._db.execute("DELETE FROM responses")
+            else:
+                cursor = self._db.execute(
+                    "DELETE FROM responses WHERE prompt_version = ?",
+                    (prompt_version,),
+                )
+            self._db.commit()
+        logging.info(
+            f"Invalidated {cursor.rowcount} LLM cache entries"
+            + (f" for prompt version {prompt_version}" if prompt_version else "")
+        )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# --- Process-wide cache ---
+_cache: LlmResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LlmResponseCache | None:
+    """Returns the shared cache, or None when LLM_CACHE_ENABLED is off."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LlmResponseCache(Path(CACHE_DIR) / "llm_cache.sqlite")
+        return _cache
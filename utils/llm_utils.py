@@ -1,15 +1,32 @@
 # utils/llm_utils.py
 import os
 import re
+import hashlib
 import logging
 import json
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field, ValidationError
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 import backoff
-from config import GEMINI_MODEL
+from config import GEMINI_MODEL, GEMINI_CONTEXT_CACHE_ENABLED
+from utils.llm_cache import get_llm_cache, make_cache_key
+from utils.rate_limiter import get_llm_limiter
+from utils.prompt_compaction import estimate_tokens, serialize_pass_dict
+from utils.deadlines import (
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    earliest,
+    timeout_for,
+)
+from utils.gemini_cache import (
+    ContextCacheManager,
+    html_parser_sys_prompt,
+    is_cache_expired_error,
+)
 
 # --- Setup Logging ---
 logging.basicConfig(
@@ -59,9 +76,10 @@ Rules:
 1. Output ONLY valid JSON, no markdown, comments, or extra text
 2. Use "N/A" for missing or unavailable fields
 3. Properly escape all quotes and special characters in JSON
-4. For dates, use ISO 8601 format (YYYY-MM-DD) or "N/A"
+4. For dates, use ISO 8601 format (YYYY-MM-DD) or "N/A"; keep the calendar date as written, without converting time zones
 5. Use "modified_date" field for last updated/modified date
 6. Be accurate and concise
+7. If the input has "known_fields", return those values unchanged; extract only the fields listed in "fields_to_extract" and use "N/A" for any other field
 
 Example output structure:
 {{
@@ -73,6 +91,26 @@ Example output structure:
     "article_text": "Full article content here..."
 }}"""
 
+# The long few-shot prompt is only worth sending when it is served from a
+# Gemini context cache. Calls without a live cache, and batch requests, send
+# the short schema prompt; both ask for the same fields and formats.
+CACHED_PROMPT = html_parser_sys_prompt
+context_cache = (
+    ContextCacheManager(client, GEMINI_MODEL_NAME, CACHED_PROMPT)
+    if GEMINI_CONTEXT_CACHE_ENABLED
+    else None
+)
+
+# Bumps automatically whenever either prompt or the schema changes, so cached
+# responses from an older prompt are never served.
+PROMPT_VERSION = hashlib.sha256(
+    (SYSTEM_PROMPT + CACHED_PROMPT).encode("utf-8")
+).hexdigest()[:12]
+
+# Placeholder texts for responses that could not be parsed; never cached.
+PARSE_FAILED_TEXT = "Parsing failed - invalid JSON response"
+PARTIAL_SUFFIX = "... [partial]"
+
 
 # --- Improved Helper Function to Clean LLM Output ---
 def _clean_llm_json_output(raw_string: str) -> str:
@@ -145,7 +183,7 @@ def _clean_llm_json_output(raw_string: str) -> str:
                         "source": "N/A",
                         "published_date": "N/A",
                         "modified_date": "N/A",  # Fixed: use modified_date consistently
-                        "article_text": "Parsing failed - invalid JSON response",
+                        "article_text": PARSE_FAILED_TEXT,
                     }
                 )
 
@@ -161,37 +199,226 @@ def log_backoff(details):
     )
 
 
+def _is_permanent_error(exc: Exception) -> bool:
+    """4xx errors other than 429 fail the same way on every retry; so does a spent deadline."""
+    deadline = current_deadline()
+    if isinstance(exc, DeadlineExceeded) or (deadline is not None and deadline.expired):
+        return True
+    return (
+        isinstance(exc, errors.APIError)
+        and exc.code is not None
+        and 400 <= exc.code < 500
+        and exc.code != 429
+    )
+
+
+def _retry_budget_seconds(limit: float) -> float:
+    """Total time for an API call and its retries: `limit`, cut to the current deadline."""
+    deadline = current_deadline()
+    remaining = deadline.remaining() if deadline else None
+    return limit if remaining is None else min(limit, remaining)
+
+
+def _retry_delay_seconds(exc: errors.APIError) -> float | None:
+    """Reads the RetryInfo delay (e.g. "17s") that Gemini attaches to 429s."""
+    details = exc.details.get("error", {}).get("details", []) if isinstance(exc.details, dict) else []
+    for detail in details:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if isinstance(delay, str) and delay.endswith("s"):
+            try:
+                return float(delay[:-1])
+            except ValueError:
+                return None
+    return None
+
+
+def estimate_prompt_tokens(content: str, cache_name: str | None = None) -> int:
+    """Pre-call estimate of the prompt size, for the tokens-per-minute bucket."""
+    return estimate_tokens((CACHED_PROMPT if cache_name else SYSTEM_PROMPT) + content)
+
+
+def _generation_config(cache_name: str | None) -> types.GenerateContentConfig:
+    """
+    Config referencing the context cache, or carrying the short prompt inline.
+
+    Under a `Deadline`, the request's HTTP timeout is the budget left.
+    """
+    timeout = timeout_for(stage="LLM call")
+    http_options = (
+        types.HttpOptions(timeout=max(1, int(timeout * 1000)))
+        if timeout is not None
+        else None
+    )
+    if cache_name:
+        return types.GenerateContentConfig(
+            cached_content=cache_name,
+            response_mime_type="application/json",
+            response_schema=ArticleInfo.model_json_schema(),
+            http_options=http_options,
+        )
+    return types.GenerateContentConfig(
+        system_instruction=SYSTEM_PROMPT,
+        response_mime_type="application/json",
+        response_schema=ArticleInfo.model_json_schema(),
+        http_options=http_options,
+    )
+
+
+def _generate_content(content: str):
+    """
+    One `generate_content` call, paced by the shared Gemini limiter.
+
+    Uses the context cache when one is live. If the API reports the cache
+    expired, the cache is dropped and the call is repeated with the short
+    prompt inline.
+
+    Under a `Deadline`, the wait for a limiter slot and the request itself
+    are both bounded by the budget left.
+
+    Raises:
+        errors.APIError: Passed through after 429/5xx responses have been
+            reported to the limiter.
+        TimeoutError: If the budget runs out while waiting for a slot.
+    """
+    limiter = get_llm_limiter()
+    cache_name = context_cache.cache_name() if context_cache else None
+    estimated_tokens = estimate_prompt_tokens(content, cache_name)
+    with limiter.slot(estimated_tokens, timeout_for(stage="LLM queue")):
+        try:
+            try:
+                response = client.models.generate_content(
+                    model=GEMINI_MODEL_NAME,
+                    contents=content,
+                    config=_generation_config(cache_name),
+                )
+            except errors.APIError as e:
+                if not (cache_name and is_cache_expired_error(e)):
+                    raise
+                context_cache.invalidate(cache_name)
+                response = client.models.generate_content(
+                    model=GEMINI_MODEL_NAME,
+                    contents=content,
+                    config=_generation_config(None),
+                )
+        except errors.APIError as e:
+            if e.code == 429 or (e.code or 0) >= 500:
+                limiter.record_throttle(e.code, _retry_delay_seconds(e))
+            raise
+    usage = getattr(response, "usage_metadata", None)
+    limiter.record_success(estimated_tokens, getattr(usage, "prompt_token_count", None))
+    return response
+
+
 # --- Optimized LLM Interaction Logic ---
+def gemini_extract_article_info(pass_dict: dict) -> ArticleInfo | None:
+    """
+    Uses Gemini to extract article information, serving repeats from the LLM cache.
+
+    Inputs that normalize to one already extracted with the same model and
+    prompt version (reruns, syndicated copies) skip the API call entirely.
+    """
+    cached = get_cached_article_info(pass_dict)
+    if cached is not None:
+        logging.info(f"LLM cache hit for: {pass_dict.get('url', 'unknown')}")
+        return cached
+
+    article_info = _gemini_extract_uncached(pass_dict)
+    cache_article_info(pass_dict, article_info)
+    return article_info
+
+
+def get_cached_article_info(pass_dict: dict) -> ArticleInfo | None:
+    """Returns the cached extraction for `pass_dict`, or None on a miss."""
+    cache = get_llm_cache()
+    if cache is None:
+        return None
+    cached = cache.get(make_cache_key(GEMINI_MODEL_NAME, PROMPT_VERSION, pass_dict))
+    return ArticleInfo.model_validate(cached) if cached is not None else None
+
+
+def is_placeholder_text(article_text: str | None) -> bool:
+    """True for the stand-in texts of a response that could not be parsed."""
+    return article_text is not None and (
+        article_text == PARSE_FAILED_TEXT or article_text.endswith(PARTIAL_SUFFIX)
+    )
+
+
+def cache_article_info(pass_dict: dict, article_info: ArticleInfo | None):
+    """Stores a validated extraction; placeholders for failed parses are skipped."""
+    cache = get_llm_cache()
+    if (
+        cache is not None
+        and article_info is not None
+        and not is_placeholder_text(article_info.article_text)
+    ):
+        cache.put(
+            make_cache_key(GEMINI_MODEL_NAME, PROMPT_VERSION, pass_dict),
+            GEMINI_MODEL_NAME,
+            PROMPT_VERSION,
+            pass_dict.get("url", "unknown"),
+            article_info.model_dump(),
+        )
+
+
+def build_prompt_content(pass_dict: dict) -> str:
+    """The user-turn text sent to Gemini for one `pass_dict`."""
+    # Truncate very long content to speed up processing
+    content = serialize_pass_dict(pass_dict)
+    if len(content) > 50000:  # Limit to ~50k chars
+        content = content[:50000] + "... [truncated]"
+        logging.info(f"Content truncated for speed: {pass_dict.get('url', 'unknown')}")
+    return f"Extract info from: {content}"
+
+
+def build_batch_request(key: str, pass_dict: dict) -> dict:
+    """
+    One line of a Gemini batch-job JSONL file, with the short prompt and
+    the response schema of the online call.
+    """
+    return {
+        "key": key,
+        "request": {
+            "contents": [
+                {"role": "user", "parts": [{"text": build_prompt_content(pass_dict)}]}
+            ],
+            "system_instruction": {"parts": [{"text": SYSTEM_PROMPT}]},
+            "generation_config": {
+                "response_mime_type": "application/json",
+                "response_schema": ArticleInfo.model_json_schema(),
+            },
+        },
+    }
+
+
+def parse_article_info(text: str) -> ArticleInfo:
+    """
+    Validates a raw Gemini JSON answer into `ArticleInfo`.
+
+    Raises:
+        json.JSONDecodeError: If no JSON object can be recovered.
+        ValidationError: If the JSON does not match the schema.
+    """
+    return ArticleInfo.model_validate(json.loads(_clean_llm_json_output(text)))
+
+
 @backoff.on_exception(
     backoff.expo,
     (ValidationError, json.JSONDecodeError, Exception),
     max_tries=3,
-    max_time=90,
+    max_time=lambda: _retry_budget_seconds(90),
+    giveup=_is_permanent_error,
     on_backoff=log_backoff,
 )
-def gemini_extract_article_info(pass_dict: dict) -> ArticleInfo | None:
+def _gemini_extract_uncached(pass_dict: dict) -> ArticleInfo | None:
     """
     Uses Gemini to extract article information with optimizations for speed.
     """
     url = pass_dict.get("url", "unknown")
     logging.info(f"Calling Gemini for: {url}")
-
-    # Truncate very long content to speed up processing
-    content = str(pass_dict)
-    if len(content) > 50000:  # Limit to ~50k chars
-        content = content[:50000] + "... [truncated]"
-        logging.info(f"Content truncated for speed: {url}")
+    content = build_prompt_content(pass_dict)
 
     try:
-        response = client.models.generate_content(
-            model=GEMINI_MODEL_NAME,
-            contents=f"Extract info from: {content}",
-            config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_PROMPT,
-                response_mime_type="application/json",
-                response_schema=ArticleInfo.model_json_schema(),
-            ),
-        )
+        response = _generate_content(content)
 
         if not response or not response.text:
             raise ValueError("Empty response from Gemini API")
@@ -232,7 +459,7 @@ def gemini_extract_article_info(pass_dict: dict) -> ArticleInfo | None:
                     "source": "N/A",
                     "published_date": "N/A",
                     "modified_date": "N/A",
-                    "article_text": response.text[:1000] + "... [partial]",
+                    "article_text": response.text[:1000] + PARTIAL_SUFFIX,
                 }
                 return ArticleInfo.model_validate(partial_data)
         except:
@@ -289,31 +516,21 @@ def gemini_extract_with_timeout(
 ) -> ArticleInfo | None:
     """
     Extract with a timeout to prevent hanging.
-    """
-    import signal
-
-    def timeout_handler(signum, frame):
-        raise TimeoutError("Gemini call timed out")
-
-    # Set up timeout
-    old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(timeout_seconds)
 
+    The timeout is a `Deadline` rather than SIGALRM, so this works from any
+    thread; a shorter deadline already in effect (the URL's) still applies.
+    """
+    url = pass_dict.get("url", "unknown")
+    deadline = earliest(current_deadline(), Deadline(timeout_seconds, url))
     try:
-        result = gemini_extract_article_info(pass_dict)
-        signal.alarm(0)  # Cancel timeout
-        return result
-    except TimeoutError:
-        logging.error(f"Timeout processing {pass_dict.get('url', 'unknown')}")
-        signal.alarm(0)
+        with deadline_scope(deadline):
+            return gemini_extract_article_info(pass_dict)
+    except TimeoutError as e:
+        logging.error(f"Timeout processing {url}: {e}")
         return None
     except Exception as e:
-        signal.alarm(0)
-        logging.error(f"Error processing {pass_dict.get('url', 'unknown')}: {e}")
+        logging.error(f"Error processing {url}: {e}")
         return None
-    finally:
-        # Restore original signal handler
-        signal.signal(signal.SIGALRM, old_handler)
 
 
 def ollama_parse_url_metadata(url: str) -> ArticleInfo | None:
@@ -0,0 +1,183 @@
+# utils/near_duplicates.py
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from config import (
+    NEAR_DUPLICATE_MAX_DISTANCE,
+    NEAR_DUPLICATE_MIN_CHARS,
+    NEAR_DUPLICATE_MAX_ENTRIES,
+)
+from utils.structured_metadata import StructuredMetadata
+
+FINGERPRINT_BITS = 64
+SHINGLE_WORDS = 3
+# Only the start of a page is fingerprinted; wire copies diverge at the end
+# (outlet boilerplate, related links) long before they do at the top.
+_MAX_FINGERPRINT_CHARS = 20000
+# Confidence given to an article body reused from a near-duplicate page.
+REUSED_BODY_CONFIDENCE = 0.9
+REUSED_BODY_SOURCE = "near-duplicate"
+
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over lowercased three-word shingles of `text`."""
+    words = _WORD.findall(text[:_MAX_FINGERPRINT_CHARS].lower())
+    shingles = {
+        " ".join(words[i : i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+    counts = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        h = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(FINGERPRINT_BITS):
+            counts[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, count in enumerate(counts) if count > 0)
+
+
+class NearDuplicateIndex:
+    """
+    SimHash fingerprints of extracted articles, searchable by Hamming distance.
+
+    Fingerprints are split into `max_distance + 1` bands; two fingerprints
+    within `max_distance` bits of each other always share at least one band
+    exactly, so only articles sharing a band are compared. The index keeps
+    the `max_entries` most recently used articles.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE,
+        max_entries: int = NEAR_DUPLICATE_MAX_ENTRIES,
+    ):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.bands = max_distance + 1
+        self._band_bits = FINGERPRINT_BITS // self.bands
+        # fingerprint -> (url, article_text)
+        self._articles: OrderedDict[int, tuple[str, str]] = OrderedDict()
+        self._buckets: list[dict[int, set[int]]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.lookups = 0
+
+    def _band_keys(self, fingerprint: int) -> list[int]:
+        mask = (1 << self._band_bits) - 1
+        return [fingerprint >> (i * self._band_bits) & mask for i in range(self.bands)]
+
+    def add(self, fingerprint: int, url: str, article_text: str):
+        with self._lock:
+            if fingerprint in self._articles:
+                self._articles.move_to_end(fingerprint)
+                return
+            self._articles[fingerprint] = (url, article_text)
+            for bucket, key in zip(self._buckets, self._band_keys(fingerprint)):
+                bucket.setdefault(key, set()).add(fingerprint)
+            while len(self._articles) > self.max_entries:
+                self._remove(next(iter(self._articles)))
+
+    def _remove(self, fingerprint: int):
+        del self._articles[fingerprint]
+        for bucket, key in zip(self._buckets, self._band_keys(fingerprint)):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(fingerprint)
+                if not members:
+                    del bucket[key]
+
+    def find(self, fingerprint: int) -> tuple[str, str] | None:
+        """The closest indexed `(url, article_text)` within `max_distance`, if any."""
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for bucket, key in zip(self._buckets, self._band_keys(fingerprint)):
+                candidates |= bucket.get(key, set())
+            best, best_distance = None, self.max_distance + 1
+            for candidate in candidates:
+                distance = (candidate ^ fingerprint).bit_count()
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+            if best is None:
+                return None
+            self.hits += 1
+            self._articles.move_to_end(best)
+            return self._articles[best]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "articles": len(self._articles),
+                "lookups": self.lookups,
+                "hits": self.hits,
+            }
+
+
+def reuse_near_duplicate(
+    url: str, content_text: str, structured: StructuredMetadata
+) -> bool:
+    """
+    Fills `structured`'s article body from an already-extracted near-duplicate.
+
+    Also sets `structured.fingerprint`, so `remember_extraction` can index
+    the page once it is extracted.
+
+    Returns:
+        True if a body was reused.
+    """
+    if len(content_text) < NEAR_DUPLICATE_MIN_CHARS:
+        return False
+    structured.fingerprint = simhash(content_text)
+    if structured.is_confident("article_text"):
+        return False
+    match = get_near_duplicate_index().find(structured.fingerprint)
+    if match is None:
+        return False
+    original_url, article_text = match
+    structured.offer(
+        "article_text",
+        article_text,
+        REUSED_BODY_CONFIDENCE,
+        f"{REUSED_BODY_SOURCE}:{original_url}",
+    )
+    logging.info(f"Reusing article text of {original_url} for near-duplicate {url}")
+    return True
+
+
+def remember_extraction(
+    url: str, structured: StructuredMetadata | None, article_info
+):
+    """
+    Indexes a finished extraction so later near-duplicates can reuse it.
+
+    Missing bodies and the placeholders of unparseable LLM replies are not
+    indexed; they would be handed to every later copy of the page.
+    """
+    from utils.llm_utils import is_placeholder_text
+
+    if structured is None or structured.fingerprint is None or article_info is None:
+        return
+    if structured.sources.get("article_text", "").startswith(REUSED_BODY_SOURCE):
+        return
+    article_text = article_info.article_text
+    if article_text and article_text != "N/A" and not is_placeholder_text(article_text):
+        get_near_duplicate_index().add(structured.fingerprint, url, article_text)
+
+
+# --- Process-wide index ---
+_index: NearDuplicateIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Returns the index shared by every engine in this process."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex()
+        return _index
@@ -0,0 +1,303 @@
+# utils/page_scanner.py
+import html
+import re
+from html.parser import HTMLParser
+
+from bs4 import UnicodeDammit
+
+from utils.json_ld_finder import build_ld_json_result
+
+# Tags stripped (with their contents) before the main text is extracted.
+UNWANTED_TAGS = frozenset(
+    {"script", "style", "nav", "footer", "aside", "form", "header"}
+)
+
+# Main-content candidates, in priority order.
+CONTENT_CANDIDATES = ("article", "main", "body")
+
+VOID_TAGS = frozenset(
+    {
+        "area", "base", "br", "col", "embed", "hr", "img", "input",
+        "link", "meta", "param", "source", "track", "wbr",
+    }
+)
+
+# Elements whose text is code, not prose.
+_CODE_TAGS = frozenset({"script", "style", "template"})
+
+
+class PageScanner:
+    """
+    Collects everything `parse_html_page` needs in a single walk.
+
+    Implements the lxml parser-target interface (`start`, `end`, `data`,
+    `comment`, `close`), so lxml can drive it directly while parsing and
+    `StdlibDriver` can drive it from the pure-Python parser. No tree is
+    ever built: JSON-LD blobs, meta/OpenGraph tags, `<time>` elements,
+    `<link rel=canonical>`, paragraph text, the main-content text and a
+    bounded cleaned-HTML prefix are all gathered from the event stream.
+
+    Events must be balanced (every `start` has a matching `end`).
+    """
+
+    def __init__(self, raw_html_limit: int):
+        self.raw_html_limit = raw_html_limit
+
+        self._stack: list[str] = []
+        self._pending: list[str] = []
+        self._skip_depth = 0  # Inside an UNWANTED_TAGS element.
+        self._code_depth = 0  # Inside script/style/template.
+
+        self._script_parts: list[str] | None = None
+        self._title_parts: list[str] | None = None
+        self._time: dict | None = None
+        self._paragraph_parts: list[str] | None = None
+        self._paragraph_depth = 0
+        self._candidate_text: dict[str, list[str]] = {}
+        self._open_candidates: dict[str, int] = {}
+        self._document_text: list[str] = []
+        self._raw_parts: list[str] = []
+        self._raw_length = 0
+
+        self.json_ld_scripts: list[str] = []
+        self.paragraphs: list[str] = []
+        self.meta: dict[str, str] = {}
+        self.times: list[dict] = []
+        self.canonical_url: str | None = None
+        self.title: str | None = None
+
+    # --- Parser target interface ---
+    def start(self, tag: str, attrib) -> None:
+        self._flush_text()
+        self._stack.append(tag)
+        if tag in UNWANTED_TAGS:
+            self._skip_depth += 1
+        if tag in _CODE_TAGS:
+            self._code_depth += 1
+        if not self._skip_depth:
+            self._emit_start_tag(tag, attrib)
+
+        if tag == "script":
+            if (attrib.get("type") or "").strip().lower() == "application/ld+json":
+                self._script_parts = []
+        elif tag == "meta":
+            key = attrib.get("property") or attrib.get("name") or attrib.get("itemprop")
+            content = attrib.get("content")
+            if key and content:
+                self.meta.setdefault(key.strip().lower(), content.strip())
+        elif tag == "link":
+            rel = (attrib.get("rel") or "").lower().split()
+            if "canonical" in rel and attrib.get("href") and not self.canonical_url:
+                self.canonical_url = attrib["href"].strip()
+        elif tag == "title":
+            if self.title is None and self._title_parts is None:
+                self._title_parts = []
+        elif tag == "time":
+            self._time = {"datetime": attrib.get("datetime"), "parts": []}
+        elif tag == "p":
+            self._paragraph_parts = []
+            self._paragraph_depth = len(self._stack)
+        elif tag in CONTENT_CANDIDATES:
+            if not self._skip_depth and tag not in self._candidate_text:
+                self._candidate_text[tag] = []
+                self._open_candidates[tag] = len(self._stack)
+
+    def end(self, tag: str) -> None:
+        self._flush_text()
+        depth = len(self._stack)
+        if self._stack:
+            self._stack.pop()
+
+        if tag in UNWANTED_TAGS:
+            self._skip_depth -= 1
+        elif not self._skip_depth and tag not in VOID_TAGS:
+            self._emit(f"</{tag}>")
+        if tag in _CODE_TAGS:
+            self._code_depth -= 1
+
+        if tag == "script" and self._script_parts is not None:
+            self.json_ld_scripts.append("".join(self._script_parts))
+            self._script_parts = None
+        elif tag == "title" and self._title_parts is not None:
+            self.title = " ".join(self._title_parts)
+            self._title_parts = None
+        elif tag == "time" and self._time is not None:
+            self.times.append(
+                {
+                    "datetime": self._time["datetime"],
+                    "text": " ".join(self._time["parts"]),
+                }
+            )
+            self._time = None
+        elif tag == "p" and self._paragraph_parts is not None:
+            if depth == self._paragraph_depth:
+                self.paragraphs.append("".join(self._paragraph_parts))
+                self._paragraph_parts = None
+        elif self._open_candidates.get(tag) == depth:
+            del self._open_candidates[tag]
+
+    def data(self, text: str) -> None:
+        self._pending.append(text)
+
+    def comment(self, text: str) -> None:
+        # Comments end a text node, like any tag does.
+        self._flush_text()
+
+    def close(self) -> dict:
+        self._flush_text()
+        return self.result()
+
+    # --- Collection ---
+    def _flush_text(self):
+        """Dispatches one complete text node to whatever is collecting it."""
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+
+        if self._script_parts is not None:
+            self._script_parts.append(text)
+            return
+        if not self._skip_depth:
+            self._emit(html.escape(text, quote=False))
+
+        stripped = text.strip()
+        if not stripped or self._code_depth:
+            return
+        if self._title_parts is not None:
+            self._title_parts.append(stripped)
+        if self._time is not None:
+            self._time["parts"].append(stripped)
+        if self._paragraph_parts is not None:
+            self._paragraph_parts.append(stripped)
+        if not self._skip_depth:
+            self._document_text.append(stripped)
+            for name in self._open_candidates:
+                self._candidate_text[name].append(stripped)
+
+    def _emit_start_tag(self, tag: str, attrib):
+        if self._raw_length >= self.raw_html_limit:
+            return
+        attrs = "".join(
+            f' {name}="{html.escape(value or "", quote=True)}"'
+            for name, value in attrib.items()
+        )
+        self._emit(f"<{tag}{attrs}>")
+
+    def _emit(self, markup: str):
+        if self._raw_length < self.raw_html_limit:
+            self._raw_parts.append(markup)
+            self._raw_length += len(markup)
+
+    def main_content_text(self) -> str:
+        """Text of the first <article>, else <main>, else <body>, else the page."""
+        parts = next(
+            (
+                self._candidate_text[name]
+                for name in CONTENT_CANDIDATES
+                if name in self._candidate_text
+            ),
+            self._document_text,
+        )
+        return re.sub(r"\s+", " ", " ".join(parts)).strip()
+
+    def result(self) -> dict:
+        """The `parse_html_page` result for the events seen so far."""
+        return {
+            "json_ld": build_ld_json_result(
+                self.json_ld_scripts, lambda: self.paragraphs
+            ),
+            "content_text": self.main_content_text(),
+            "raw_html": "".join(self._raw_parts)[: self.raw_html_limit],
+            "meta": self.meta,
+            "times": self.times,
+            "canonical_url": self.canonical_url,
+            "title": self.title,
+        }
+
+
+class StdlibDriver(HTMLParser):
+    """
+    Feeds `html.parser` events to a `PageScanner`.
+
+    The stdlib parser reports tags exactly as written, so this closes void
+    elements immediately and closes any still-open children when an
+    ancestor's end tag (or a new `<p>`) arrives, keeping events balanced.
+    """
+
+    def __init__(self, target: PageScanner):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+        self._open: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "p" and "p" in self._open:
+            self._close_through("p")
+        self.target.start(tag, dict(attrs))
+        if tag in VOID_TAGS:
+            self.target.end(tag)
+        else:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._open:
+            self._close_through(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def handle_comment(self, data):
+        self.target.comment(data)
+
+    def _close_through(self, tag: str):
+        while self._open:
+            open_tag = self._open.pop()
+            self.target.end(open_tag)
+            if open_tag == tag:
+                return
+
+    def close(self) -> dict:
+        super().close()
+        while self._open:
+            self.target.end(self._open.pop())
+        return self.target.close()
+
+
+def decode_html(html_bytes: bytes) -> str:
+    """Decodes a fetched page the same way BeautifulSoup would."""
+    if not html_bytes:
+        return ""
+    return UnicodeDammit(html_bytes, is_html=True).unicode_markup or ""
+
+
+def scan_html(html_bytes: bytes, parser: str, raw_html_limit: int) -> dict:
+    """
+    Parses a page in one streaming pass.
+
+    Args:
+        html_bytes: The raw page body.
+        parser: "lxml" (libxml2 driving the scanner from C) or
+            "html.parser" (the standard library).
+        raw_html_limit: Maximum length of the cleaned-HTML prefix.
+
+    Returns:
+        The `PageScanner.result()` dict.
+    """
+    scanner = PageScanner(raw_html_limit)
+    markup = decode_html(html_bytes)
+    if parser == "lxml":
+        from lxml import etree
+
+        if not markup.strip():
+            return scanner.close()
+        lxml_parser = etree.HTMLParser(target=scanner)
+        lxml_parser.feed(markup)
+        return lxml_parser.close()
+
+    driver = StdlibDriver(scanner)
+    driver.feed(markup)
+    return driver.close()
@@ -0,0 +1,204 @@
+# utils/parquet_results.py
+import argparse
+import csv
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from config import PARQUET_COMPRESSION, PARQUET_ROW_GROUP_ROWS
+
+# Low-cardinality columns are stored as dictionaries (a few distinct values
+# repeated on every row); dates are real timestamps, not strings.
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+_TIMESTAMP = pa.timestamp("ms", tz="UTC")
+
+# The output columns of write_csv_header(), plus the URL's processing time.
+# Article text is never truncated here, unlike the CSV's CHAR_LIMIT.
+RESULT_SCHEMA = pa.schema(
+    [
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("authors", pa.string()),
+        ("source", _CATEGORY),
+        ("published_date", _TIMESTAMP),
+        ("modified_date", _TIMESTAMP),
+        ("llm_used", _CATEGORY),
+        ("status", _CATEGORY),
+        ("error_message", pa.string()),
+        ("article_text", pa.large_string()),
+        ("processing_seconds", pa.float64()),
+    ]
+)
+# Results store exports add the row's key, prompt version and update time.
+STORE_SCHEMA = pa.schema(
+    list(RESULT_SCHEMA)
+    + [
+        ("url_key", pa.string()),
+        ("prompt_version", _CATEGORY),
+        ("updated_at", _TIMESTAMP),
+    ]
+)
+
+_MISSING = {"", "N/A", "n/a", "None", "null"}
+
+
+def parse_timestamp(value) -> datetime | None:
+    """
+    An ISO 8601 date/datetime string or epoch seconds as a UTC datetime.
+
+    Dates without a zone are taken as UTC; "N/A" and anything unparseable
+    become None (a null timestamp).
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc)
+    value = str(value).strip()
+    if value in _MISSING:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            # A datetime form fromisoformat() rejects (e.g. nanoseconds): keep the date.
+            parsed = datetime.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class ParquetResultWriter:
+    """
+    Writes result rows to a Parquet file one row group at a time.
+
+    Rows are buffered until `row_group_rows` have arrived and then written
+    as one compressed row group, so memory stays bounded while the batch
+    loop runs. The file is built under a temporary name and moved into
+    place by `close()`; a Parquet file is unreadable until its footer is
+    written, and this way an interrupted run leaves the previous file intact.
+    Leaving a `with` block on an exception calls `abort()` instead, so an
+    aborted run is never mistaken for a complete file.
+
+    Args:
+        schema: RESULT_SCHEMA for run outputs, STORE_SCHEMA for store exports.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        schema: pa.Schema = RESULT_SCHEMA,
+        row_group_rows: int = PARQUET_ROW_GROUP_ROWS,
+        compression: str = PARQUET_COMPRESSION,
+    ):
+        self.path = path
+        self.schema = schema
+        self.row_group_rows = row_group_rows
+        self.rows_written = 0
+        self._timestamp_fields = [
+            field.name for field in schema if pa.types.is_timestamp(field.type)
+        ]
+        self._rows: list[dict] = []
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._writer = pq.ParquetWriter(
+            self._tmp_path,
+            schema,
+            compression=compression,
+            use_dictionary=[
+                field.name for field in schema if pa.types.is_dictionary(field.type)
+            ],
+        )
+
+    def __enter__(self) -> "ParquetResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def carry_over(self, successful_only: bool = False) -> set[str]:
+        """
+        Copies the rows of the existing file at `path` into the new one.
+
+        Returns:
+            The URLs of the copied rows whose status is a success.
+        """
+        successful: set[str] = set()
+        if not self.path.exists():
+            return successful
+        for batch in pq.ParquetFile(self.path).iter_batches(self.row_group_rows):
+            table = pa.Table.from_batches([batch]).cast(self.schema)
+            ok = pc.starts_with(table.column("status").cast(pa.string()), "success")
+            ok = pc.fill_null(ok, False)
+            successful.update(table.filter(ok).column("url").to_pylist())
+            if successful_only:
+                table = table.filter(ok)
+            self._writer.write_table(table)
+            self.rows_written += table.num_rows
+        return successful
+
+    def write(self, row: dict):
+        """Adds one row (a dict keyed by schema field); missing fields are null."""
+        row = dict(row)
+        for name in self._timestamp_fields:
+            row[name] = parse_timestamp(row.get(name))
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_rows:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[dict]):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        """Writes the buffered rows as a row group."""
+        if not self._rows:
+            return
+        table = pa.Table.from_pylist(self._rows, schema=self.schema)
+        self._writer.write_table(table)
+        self.rows_written += table.num_rows
+        self._rows.clear()
+
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        self._writer = None
+        self._tmp_path.replace(self.path)
+
+    def abort(self):
+        """Discards the rows written so far; the file at `path` is left as it was."""
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self._rows.clear()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+# --- Command Line ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert an output CSV (e.g. an enriched links file) to Parquet."
+    )
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    with args.input.open(
+        "r", newline="", encoding="utf-8-sig", errors="replace"
+    ) as f, ParquetResultWriter(args.output) as writer:
+        writer.write_rows(
+            {name: value or None for name, value in row.items() if name}
+            for row in csv.DictReader(f)
+        )
+    print(f"Wrote {writer.rows_written} rows to {args.output}")
@@ -0,0 +1,155 @@
+# utils/pipeline.py
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+_POLL_SECONDS = 0.5
+
+
+class Finished:
+    """Returned by a stage to end an item early with its final result."""
+
+    def __init__(self, result: Any):
+        self.result = result
+
+
+class PipelineStage:
+    """
+    One step of a `run_pipeline` chain, served by its own pool of threads.
+
+    Args:
+        name: Used in thread names and the end-of-run stats log.
+        fn: Called with the item produced by the previous stage. Returns the
+            item for the next stage, or `Finished(result)` to stop early.
+        workers: Number of threads serving this stage.
+        rate_per_minute: Optional cap on how often `fn` may start, shared by
+            all of this stage's threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        workers: int,
+        rate_per_minute: float | None = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_for_rate_slot(self):
+        if not self.min_interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.min_interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    def _record(self, seconds: float):
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+
+
+def run_pipeline(
+    items: Iterable[Any],
+    stages: list[PipelineStage],
+    on_error: Callable[[Any, Exception], Any],
+    queue_size: int = 16,
+) -> Iterator[Any]:
+    """
+    Pushes items through `stages`, yielding final results as they complete.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure upstream instead of letting work pile up in memory. If a
+    stage raises, `on_error(item, exc)` builds that item's final result.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    results: queue.Queue = queue.Queue()
+    threads: list[threading.Thread] = []
+
+    def put(q: queue.Queue, value: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(value, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker(index: int):
+        stage = stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else results
+        while not stop.is_set():
+            try:
+                item = inbox.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+            stage._wait_for_rate_slot()
+            started = time.monotonic()
+            try:
+                output = stage.fn(item)
+            except Exception as e:
+                output = Finished(on_error(item, e))
+            stage._record(time.monotonic() - started)
+
+            if isinstance(output, Finished):
+                put(results, output.result)
+            elif outbox is results:
+                put(results, output)
+            else:
+                put(outbox, output)
+
+    submitted = 0
+    feeder_done = threading.Event()
+
+    def feeder():
+        nonlocal submitted
+        try:
+            for item in items:
+                if not put(queues[0], item):
+                    return
+                submitted += 1
+        finally:
+            feeder_done.set()
+
+    for index, stage in enumerate(stages):
+        for n in range(stage.workers):
+            thread = threading.Thread(
+                target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+    threading.Thread(target=feeder, name="pipeline-feeder", daemon=True).start()
+
+    received = 0
+    try:
+        while not (feeder_done.is_set() and received >= submitted):
+            try:
+                result = results.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            received += 1
+            yield result
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=_POLL_SECONDS * 2)
+        for stage in stages:
+            logging.info(
+                f"Pipeline stage '{stage.name}': {stage.processed} items, "
+                f"{stage.busy_seconds:.1f}s busy across {stage.workers} workers"
+            )
@@ -0,0 +1,217 @@
+# utils/prompt_compaction.py
+import html
+import json
+import logging
+import re
+import threading
+
+from config import PROMPT_DEDUPE_OVERLAP, PROMPT_RAW_HTML_FALLBACK_CHARS
+
+# Rough chars-per-token ratio used to size prompts without an API call.
+CHARS_PER_TOKEN = 4
+
+# JSON-LD keys that never help with title/author/date/body extraction.
+PRUNED_LD_KEYS = {
+    "image",
+    "thumbnail",
+    "thumbnailUrl",
+    "caption",
+    "sameAs",
+    "logo",
+    "video",
+    "associatedMedia",
+    "potentialAction",
+    "speakable",
+    "@context",
+}
+# JSON-LD nodes (usually @graph members) that are pure page furniture.
+PRUNED_LD_TYPES = {
+    "imageobject",
+    "videoobject",
+    "breadcrumblist",
+    "website",
+    "searchaction",
+    "sitenavigationelement",
+}
+
+# Meta tags worth keeping in the HTML snippet that replaces raw HTML.
+_SNIPPET_META_PATTERN = re.compile(
+    r"date|time|author|byl|title|site_name|publish|modif|updated|creator"
+)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Token estimate from character count; no API round trip."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def serialize_pass_dict(pass_dict: dict) -> str:
+    """Compact JSON: no indentation, no separator spaces, no \\u escapes."""
+    return json.dumps(pass_dict, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def prune_json_ld(value):
+    """Drops media/social keys and furniture nodes from JSON-LD, recursively."""
+    if isinstance(value, list):
+        pruned = [prune_json_ld(item) for item in value if not _is_furniture(item)]
+        return [item for item in pruned if item not in (None, {}, [])]
+    if isinstance(value, dict):
+        return {
+            key: prune_json_ld(item)
+            for key, item in value.items()
+            if key not in PRUNED_LD_KEYS and not _is_furniture(item)
+        }
+    return value
+
+
+def _is_furniture(node) -> bool:
+    if not isinstance(node, dict):
+        return False
+    types = node.get("@type") or []
+    if isinstance(types, str):
+        types = [types]
+    return bool(types) and all(str(t).lower() in PRUNED_LD_TYPES for t in types)
+
+
+def _sentences(text: str) -> set[str]:
+    return {
+        s.strip().lower()
+        for s in _SENTENCE_SPLIT.split(text)
+        if len(s.strip()) > 20
+    }
+
+
+def is_duplicate_text(text: str, reference: str) -> bool:
+    """
+    True when most of `text` already appears in `reference`.
+
+    Compares sentences rather than whole strings, so the same article
+    extracted with slightly different boilerplate still counts.
+    """
+    if not text:
+        return True
+    if text in reference:
+        return True
+    sentences = _sentences(text)
+    if not sentences:
+        return False
+    overlap = len(sentences & _sentences(reference)) / len(sentences)
+    return overlap >= PROMPT_DEDUPE_OVERLAP
+
+
+def date_snippet(parsed: dict) -> str:
+    """
+    A `<head>`/`<time>`-only HTML snippet for date (and byline) extraction.
+
+    Built from the meta tags and `<time>` elements collected while parsing;
+    falls back to the start of the cleaned HTML when the page has neither.
+    """
+    lines = []
+    if parsed.get("title"):
+        lines.append(f"<title>{html.escape(parsed['title'])}</title>")
+    for key, content in (parsed.get("meta") or {}).items():
+        if _SNIPPET_META_PATTERN.search(key):
+            lines.append(
+                f'<meta name="{html.escape(key)}" content="{html.escape(content)}">'
+            )
+    for time_el in parsed.get("times") or []:
+        attr = (
+            f' datetime="{html.escape(time_el["datetime"])}"'
+            if time_el.get("datetime")
+            else ""
+        )
+        lines.append(f"<time{attr}>{html.escape(time_el.get('text') or '')}</time>")
+    if lines:
+        return "\n".join(lines)
+    return (parsed.get("raw_html") or "")[:PROMPT_RAW_HTML_FALLBACK_CHARS]
+
+
+class CompactionStats:
+    """Process-wide totals of estimated prompt tokens before and after compaction."""
+
+    def __init__(self):
+        self.requests = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    def record(self, before: int, after: int):
+        with self._lock:
+            self.requests += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+    def stats(self) -> dict:
+        with self._lock:
+            saved = self.tokens_before - self.tokens_after
+            return {
+                "requests": self.requests,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "saved_pct": round(100 * saved / self.tokens_before, 1)
+                if self.tokens_before
+                else 0.0,
+            }
+
+
+compaction_stats = CompactionStats()
+
+
+def compact_pass_dict(pass_dict: dict, parsed: dict) -> dict:
+    """
+    Shrinks a `pass_dict` before it is sent to the LLM.
+
+    - JSON-LD is pruned of media/social keys and furniture nodes.
+    - Paragraph text and `articleBody` that repeat the page text are
+      dropped. They are compared with the full `parsed["content_text"]`,
+      not `website_content`, which `build_pass_dict` may have cut to a
+      short excerpt.
+    - `raw_html_for_dates` becomes a `<head>`/`<time>` snippet.
+
+    Logs and records estimated tokens before (as the old `str(pass_dict)`)
+    and after (as compact JSON).
+
+    Returns:
+        A new dict; `pass_dict` is not modified.
+    """
+    before = estimate_tokens(str(pass_dict))
+    compact = dict(pass_dict)
+    body = parsed.get("content_text") or compact.get("website_content") or ""
+
+    json_ld = compact.get("json_ld")
+    if json_ld:
+        ld_list = prune_json_ld(json_ld.get("ld_json_list") or [])
+        for node in _iter_nodes(ld_list):
+            if isinstance(node.get("articleBody"), str) and is_duplicate_text(
+                node["articleBody"], body
+            ):
+                del node["articleBody"]
+        compacted_ld = {"ld_json_list": ld_list}
+        article_text = json_ld.get("article_text") or ""
+        if article_text and not is_duplicate_text(article_text, body):
+            compacted_ld["article_text"] = article_text
+        compact["json_ld"] = compacted_ld
+
+    if "raw_html_for_dates" in compact:
+        compact["raw_html_for_dates"] = date_snippet(parsed)
+
+    after = estimate_tokens(serialize_pass_dict(compact))
+    compaction_stats.record(before, after)
+    logging.info(
+        f"Prompt compaction for {pass_dict.get('url', 'unknown')}: "
+        f"~{before} -> ~{after} tokens"
+    )
+    return compact
+
+
+def _iter_nodes(value):
+    """Every dict inside a JSON-LD value (after pruning, so already copied)."""
+    if isinstance(value, list):
+        for item in value:
+            yield from _iter_nodes(item)
+    elif isinstance(value, dict):
+        yield value
+        for item in value.values():
+            if isinstance(item, (list, dict)):
+                yield from _iter_nodes(item)
@@ -0,0 +1,223 @@
+# utils/rate_limiter.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from config import (
+    GEMINI_REQUESTS_PER_MINUTE,
+    GEMINI_TOKENS_PER_MINUTE,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_MIN_CONCURRENCY,
+    LLM_LIMITER_LOG_SECONDS,
+)
+
+# Minimum gap between two multiplicative decreases, so a burst of 429s from
+# calls that were already in flight only halves the window once.
+_DECREASE_COOLDOWN_SECONDS = 5.0
+# Pause applied after a throttle when the server gives no retry delay.
+_DEFAULT_THROTTLE_PAUSE_SECONDS = 2.0
+# Seconds of quota a bucket can hold. Kept short so that any 60-second window
+# stays within a few percent of the per-minute quota instead of allowing a
+# full minute's burst on top of the steady rate.
+_BURST_SECONDS = 2.0
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding `burst_seconds` worth of quota."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = _BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill(now)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        """Spends `amount` units; negative amounts refund. May go below zero."""
+        self.level = min(self.capacity, self.level - amount)
+
+
+class AdaptiveRateLimiter:
+    """
+    Requests-per-minute, tokens-per-minute and concurrency limits for one API.
+
+    Shared by every worker thread. A call first waits for a concurrency slot,
+    then for both buckets to cover one request and its estimated prompt
+    tokens. The concurrency window follows AIMD: it grows by 1/window on each
+    success and halves on a 429 or 5xx, which also pauses new calls for the
+    server's retry delay. The estimate is corrected with the real token count
+    once the response reports it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        log_every: float = 30.0,
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.window = float(self.max_concurrency)
+        self.log_every = log_every
+
+        self.in_flight = 0
+        self.calls = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+        self.tokens_estimated = 0
+        self.tokens_reported = 0
+
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._last_log = time.monotonic()
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, estimated_tokens: int, timeout: float | None = None):
+        """Holds one call's slot for the duration of the `with` block."""
+        self.acquire(estimated_tokens, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, estimated_tokens: int, timeout: float | None = None):
+        """
+        Blocks until a call may start.
+
+        Raises:
+            TimeoutError: If no slot was free within `timeout` seconds.
+        """
+        # A prompt larger than the whole bucket would otherwise wait forever.
+        tokens = min(estimated_tokens, self.tokens.capacity)
+        started = time.monotonic()
+        give_up_at = started + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.in_flight >= int(self.window):
+                    wait = 1.0
+                else:
+                    wait = max(
+                        self._paused_until - now,
+                        self.requests.delay_for(1, now),
+                        self.tokens.delay_for(tokens, now),
+                    )
+                    if wait <= 0:
+                        break
+                if give_up_at is not None:
+                    if now >= give_up_at:
+                        self.waited_seconds += now - started
+                        raise TimeoutError(
+                            f"{self.name} limiter: no slot within {timeout:.1f}s"
+                        )
+                    wait = min(wait, give_up_at - now)
+                self._cond.wait(timeout=wait)
+
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            self.calls += 1
+            self.tokens_estimated += tokens
+            self.waited_seconds += time.monotonic() - started
+        self._maybe_log()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def record_success(self, estimated_tokens: int, reported_tokens: int | None = None):
+        """Additive increase, plus a bucket correction from the real token count."""
+        with self._cond:
+            self.window = min(self.max_concurrency, self.window + 1.0 / self.window)
+            if reported_tokens:
+                self.tokens.take(reported_tokens - estimated_tokens)
+                self.tokens_reported += reported_tokens
+            self._cond.notify_all()
+
+    def record_throttle(self, status: int | None, retry_after: float | None = None):
+        """Multiplicative decrease and a pause after a 429 or 5xx."""
+        with self._cond:
+            now = time.monotonic()
+            self.throttled += 1
+            if now - self._last_decrease >= _DECREASE_COOLDOWN_SECONDS:
+                self.window = max(self.min_concurrency, self.window / 2)
+                self._last_decrease = now
+            pause = retry_after if retry_after is not None else _DEFAULT_THROTTLE_PAUSE_SECONDS
+            self._paused_until = max(self._paused_until, now + pause)
+        logging.warning(
+            f"{self.name} limiter: HTTP {status}, pausing {pause:.1f}s; {self.describe()}"
+        )
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            return {
+                "window": round(self.window, 2),
+                "in_flight": self.in_flight,
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 1),
+                "requests_available": int(self.requests.level),
+                "tokens_available": int(self.tokens.level),
+                "tokens_estimated": self.tokens_estimated,
+                "tokens_reported": self.tokens_reported,
+            }
+
+    def describe(self) -> str:
+        s = self.stats()
+        return (
+            f"window {s['window']}/{self.max_concurrency}, {s['in_flight']} in flight, "
+            f"{s['calls']} calls, {s['throttled']} throttled, "
+            f"{s['waited_seconds']}s waited, "
+            f"{s['requests_available']} req / {s['tokens_available']} tok available"
+        )
+
+    def _maybe_log(self):
+        now = time.monotonic()
+        with self._cond:
+            if now - self._last_log < self.log_every:
+                return
+            self._last_log = now
+        logging.info(f"{self.name} limiter: {self.describe()}")
+
+
+# --- Process-wide limiter ---
+_limiter: AdaptiveRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_llm_limiter() -> AdaptiveRateLimiter:
+    """Returns the limiter shared by every Gemini call in this process."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveRateLimiter(
+                "Gemini",
+                GEMINI_REQUESTS_PER_MINUTE,
+                GEMINI_TOKENS_PER_MINUTE,
+                GEMINI_MAX_CONCURRENCY,
+                GEMINI_MIN_CONCURRENCY,
+                LLM_LIMITER_LOG_SECONDS,
+            )
+        return _limiter
@@ -0,0 +1,394 @@
+# utils/results_store.py
+import argparse
+import csv
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from config import (
+    CACHE_DIR,
+    CHAR_LIMIT,
+    RESULTS_STORE_ENABLED,
+    RESULTS_STORE_BATCH_SIZE,
+    RESULTS_STORE_FLUSH_SECONDS,
+)
+from utils.parquet_results import STORE_SCHEMA, ParquetResultWriter
+from utils.url_utils import canonicalize_url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    url_key            TEXT PRIMARY KEY,
+    url                TEXT NOT NULL,
+    title              TEXT,
+    authors            TEXT,
+    source             TEXT,
+    published_date     TEXT,
+    modified_date      TEXT,
+    article_text       TEXT,
+    llm_used           TEXT,
+    status             TEXT NOT NULL,
+    error_message      TEXT,
+    prompt_version     TEXT,
+    processing_seconds REAL,
+    updated_at         REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_status ON results (status);
+CREATE INDEX IF NOT EXISTS results_updated_at ON results (updated_at);
+"""
+
+ARTICLE_FIELDS = (
+    "title",
+    "authors",
+    "source",
+    "published_date",
+    "modified_date",
+    "article_text",
+)
+# Columns of an export, in order: the output CSV's columns first.
+EXPORT_COLUMNS = (
+    "url",
+    "title",
+    "authors",
+    "source",
+    "published_date",
+    "modified_date",
+    "llm_used",
+    "status",
+    "error_message",
+    "article_text",
+    "url_key",
+    "prompt_version",
+    "processing_seconds",
+    "updated_at",
+)
+_ROW_COLUMNS = ("url_key", "url", *ARTICLE_FIELDS) + (
+    "llm_used",
+    "status",
+    "error_message",
+    "prompt_version",
+    "processing_seconds",
+    "updated_at",
+)
+
+# A newer failure never replaces a stored success; anything else is replaced.
+_UPSERT = f"""
+INSERT INTO results ({", ".join(_ROW_COLUMNS)})
+VALUES ({", ".join("?" for _ in _ROW_COLUMNS)})
+ON CONFLICT (url_key) DO UPDATE SET
+    {", ".join(f"{c} = excluded.{c}" for c in _ROW_COLUMNS[1:])}
+WHERE excluded.status LIKE 'success%' OR results.status NOT LIKE 'success%'
+"""
+# Imported rows only fill gaps; the store's own rows are newer.
+_INSERT_MISSING = f"""
+INSERT INTO results ({", ".join(_ROW_COLUMNS)})
+VALUES ({", ".join("?" for _ in _ROW_COLUMNS)})
+ON CONFLICT (url_key) DO NOTHING
+"""
+
+# Bound parameters per `IN (...)` lookup; SQLite allows a few thousand.
+_LOOKUP_CHUNK = 500
+
+
+def url_key(url: str) -> str:
+    """The row key of `url`: its canonical form (non-HTTP strings as they are)."""
+    if url.startswith(("http://", "https://")):
+        return canonicalize_url(url)
+    return url
+
+
+class ResultsStore:
+    """
+    One SQLite table holding the latest result for every canonical URL.
+
+    Rows are upserted in batches of `batch_size` (or every `flush_seconds`)
+    inside a single transaction, and a failed attempt never overwrites an
+    earlier success. "Has this URL been parsed?" is a primary-key lookup,
+    which is what resumed runs use instead of re-reading their output CSV.
+    The table exports to CSV or Parquet on demand.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = RESULTS_STORE_BATCH_SIZE,
+        flush_seconds: float = RESULTS_STORE_FLUSH_SECONDS,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._pending: list[tuple] = []
+        self._last_flush = time.monotonic()
+
+    def add(
+        self,
+        url: str,
+        status: str,
+        article: dict | None = None,
+        llm_used: str | None = None,
+        error_message: str | None = None,
+        prompt_version: str | None = None,
+        processing_seconds: float | None = None,
+    ):
+        """Queues one result; it is written with the next batch."""
+        row = _row(
+            url,
+            status,
+            article,
+            llm_used,
+            error_message,
+            prompt_version,
+            processing_seconds,
+        )
+        with self._lock:
+            self._pending.append(row)
+            if (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            ):
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        try:
+            with self._db:
+                self._db.executemany(_UPSERT, self._pending)
+        except sqlite3.Error as e:
+            # The output file still has the rows; the store is only an index.
+            logging.warning(f"Could not save {len(self._pending)} results: {e}")
+        self._pending.clear()
+
+    def successful(self, urls: Iterable[str]) -> Iterator[tuple[str, dict]]:
+        """
+        `(url, row)` for each of `urls` whose canonical page already has a
+        successful result; `row` maps the EXPORT_COLUMNS to values.
+        """
+        self.flush()
+        by_key: dict[str, list[str]] = {}
+        for url in urls:
+            by_key.setdefault(url_key(url), []).append(url)
+        keys = list(by_key)
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start : start + _LOOKUP_CHUNK]
+            with self._lock:
+                cursor = self._db.execute(
+                    f"SELECT {', '.join(EXPORT_COLUMNS)} FROM results "
+                    f"WHERE url_key IN ({', '.join('?' for _ in chunk)}) "
+                    "AND status LIKE 'success%'",
+                    chunk,
+                )
+                rows = cursor.fetchall()
+            for values in rows:
+                row = dict(zip(EXPORT_COLUMNS, values))
+                for url in by_key[row["url_key"]]:
+                    yield url, row
+
+    def get(self, url: str) -> dict | None:
+        """The stored row for `url`'s canonical page, whatever its status."""
+        self.flush()
+        with self._lock:
+            values = self._db.execute(
+                f"SELECT {', '.join(EXPORT_COLUMNS)} FROM results WHERE url_key = ?",
+                (url_key(url),),
+            ).fetchone()
+        return None if values is None else dict(zip(EXPORT_COLUMNS, values))
+
+    def iter_rows(
+        self, status_prefix: str | None = None, batch_rows: int = 1000
+    ) -> Iterator[list[tuple]]:
+        """Every row (EXPORT_COLUMNS order), oldest update first, in batches."""
+        self.flush()
+        # A separate connection, so a long export doesn't hold the lock.
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            query = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM results"
+            params: tuple = ()
+            if status_prefix:
+                query += " WHERE status LIKE ?"
+                params = (status_prefix + "%",)
+            cursor = db.execute(query + " ORDER BY updated_at", params)
+            while rows := cursor.fetchmany(batch_rows):
+                yield rows
+        finally:
+            db.close()
+
+    def export_csv(self, path: Path, status_prefix: str | None = None) -> int:
+        """
+        Writes the table as a CSV (UTF-8 with BOM, like the run outputs) and
+        returns the row count. Article text is cut at CHAR_LIMIT so the file
+        still opens in a spreadsheet; use `export_parquet` for the full text.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text_column = EXPORT_COLUMNS.index("article_text")
+        count = 0
+        with path.open("w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in self.iter_rows(status_prefix):
+                for row in rows:
+                    row = list(row)
+                    row[text_column] = (row[text_column] or "")[:CHAR_LIMIT]
+                    writer.writerow(row)
+                count += len(rows)
+        return count
+
+    def export_parquet(self, path: Path, status_prefix: str | None = None) -> int:
+        """Writes the table as a Parquet file (STORE_SCHEMA) and returns the row count."""
+        with ParquetResultWriter(path, STORE_SCHEMA) as writer:
+            for rows in self.iter_rows(status_prefix, batch_rows=writer.row_group_rows):
+                writer.write_rows(dict(zip(EXPORT_COLUMNS, row)) for row in rows)
+        return writer.rows_written
+
+    def import_csv(self, path: Path) -> int:
+        """
+        Loads the rows of an existing output CSV (or export) for pages the
+        store has no row for yet.
+
+        Returns:
+            The number of rows read.
+        """
+        self.flush()
+        count = 0
+        batch = []
+        with path.open("r", newline="", encoding="utf-8-sig", errors="replace") as f:
+            for row in csv.DictReader(f):
+                url, status = row.get("url"), row.get("status")
+                if not url or not status:
+                    continue
+                batch.append(
+                    _row(
+                        url,
+                        status,
+                        article=row,
+                        llm_used=row.get("llm_used") or None,
+                        error_message=row.get("error_message") or None,
+                        prompt_version=row.get("prompt_version") or None,
+                    )
+                )
+                count += 1
+                if len(batch) >= self.batch_size:
+                    self._insert_missing(batch)
+        self._insert_missing(batch)
+        return count
+
+    def _insert_missing(self, rows: list[tuple]):
+        with self._lock, self._db:
+            self._db.executemany(_INSERT_MISSING, rows)
+        rows.clear()
+
+    def stats(self) -> dict:
+        self.flush()
+        with self._lock:
+            counts = dict(
+                self._db.execute(
+                    "SELECT status, COUNT(*) FROM results GROUP BY status"
+                ).fetchall()
+            )
+        return {
+            "pages": sum(counts.values()),
+            "successful": sum(n for s, n in counts.items() if s.startswith("success")),
+            "by_status": counts,
+        }
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+def _row(
+    url: str,
+    status: str,
+    article: dict | None = None,
+    llm_used: str | None = None,
+    error_message: str | None = None,
+    prompt_version: str | None = None,
+    processing_seconds: float | None = None,
+) -> tuple:
+    """A `results` row (_ROW_COLUMNS order), stamped with the current time."""
+    article = article or {}
+    return (
+        url_key(url),
+        url,
+        *(article.get(field) for field in ARTICLE_FIELDS),
+        llm_used,
+        status,
+        error_message,
+        prompt_version,
+        processing_seconds,
+        time.time(),
+    )
+
+
+# --- Process-wide store ---
+_store: ResultsStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore | None:
+    """Returns the shared store, or None when RESULTS_STORE_ENABLED is off."""
+    global _store
+    if not RESULTS_STORE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore(Path(CACHE_DIR) / "results.sqlite")
+        return _store
+
+
+# --- Command Line ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query and export the results store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Row counts by status.")
+    lookup = commands.add_parser("lookup", help="Show the stored result for URLs.")
+    lookup.add_argument("urls", nargs="+")
+    export = commands.add_parser("export", help="Write a .csv or .parquet file.")
+    export.add_argument("output", type=Path)
+    export.add_argument(
+        "--status", help="Only rows whose status starts with this, e.g. success."
+    )
+    load = commands.add_parser("import", help="Load existing output CSVs.")
+    load.add_argument("csv_files", type=Path, nargs="+")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    store = ResultsStore(Path(CACHE_DIR) / "results.sqlite")
+    if args.command == "stats":
+        print(store.stats())
+    elif args.command == "lookup":
+        for url in args.urls:
+            row = store.get(url)
+            if row is None:
+                print(f"{url}: not parsed")
+            else:
+                print(
+                    f"{url}: {row['status']} by {row['llm_used']} at "
+                    f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['updated_at']))}"
+                    f" - {row['title'] or row['error_message']}"
+                )
+    elif args.command == "export":
+        if args.output.suffix == ".parquet":
+            count = store.export_parquet(args.output, args.status)
+        else:
+            count = store.export_csv(args.output, args.status)
+        print(f"Exported {count} rows to {args.output}")
+    else:
+        for path in args.csv_files:
+            print(f"Imported {store.import_csv(path)} rows from {path}")
+    store.close()
@@ -0,0 +1,204 @@
+# utils/routing_rules.py
+import argparse
+import fnmatch
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from config import ROUTING_RULES_FILE, NAUGHTY_LINKS_FILE, ROUTING_RELOAD_SECONDS
+from utils.http_fetcher import TIER_HTTP, TIER_BROWSER
+
+# Per-rule actions. The fetch actions pin a URL to one tier of `fetch_html`.
+ACTION_URL_ONLY = "url_only"  # Infer metadata from the URL string; no fetch.
+ACTION_HTTP = TIER_HTTP  # Plain HTTP only; never escalate to a browser.
+ACTION_BROWSER = TIER_BROWSER  # Skip the HTTP attempt.
+ACTION_SKIP = "skip"  # Don't process the URL at all.
+ACTIONS = {ACTION_URL_ONLY, ACTION_HTTP, ACTION_BROWSER, ACTION_SKIP}
+
+_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://", re.I)
+
+
+def _normalize_host(host: str) -> str:
+    return host.lower().strip(".").removeprefix("www.")
+
+
+class RoutingRule:
+    """One compiled `<host>[/<path glob>] <action>` line."""
+
+    def __init__(self, pattern: str, action: str, source: str):
+        self.pattern = pattern
+        self.action = action
+        self.source = source
+
+        spec = _SCHEME.sub("", pattern.strip())
+        host, slash, path = spec.partition("/")
+        self.host = _normalize_host(host.removeprefix("*."))
+        if not self.host or "*" in self.host:
+            raise ValueError(f"Unsupported host pattern: {pattern!r}")
+        self.path_regex = None
+        if slash and path:
+            glob = "/" + path.split("?", 1)[0]
+            if "*" not in glob and "?" not in glob:
+                glob += "*"  # A plain path is a prefix.
+            self.path_regex = re.compile(fnmatch.translate(glob))
+
+    def matches_path(self, path: str) -> bool:
+        return self.path_regex is None or bool(self.path_regex.match(path or "/"))
+
+    def __repr__(self) -> str:
+        return f"RoutingRule({self.pattern!r} -> {self.action}, {self.source})"
+
+
+def parse_rules_file(path: Path, default_action: str | None = None) -> list[RoutingRule]:
+    """
+    Reads one rules file; unreadable lines are logged and skipped.
+
+    Args:
+        default_action: Action for lines that give only a pattern. Such
+            lines are article URLs from the legacy naughty list, so they
+            route their whole host.
+    """
+    rules = []
+    with path.open("r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            # "#" starts a comment only at the line start or after a space,
+            # so hash-routed URLs keep their fragment.
+            line = re.sub(r"(^|\s)#.*", "", line).strip()
+            if not line:
+                continue
+            pattern, *rest = line.split(None, 1)
+            action = rest[0].strip().lower() if rest else ""
+            if not action:
+                action = default_action
+                pattern = _SCHEME.sub("", pattern).split("/", 1)[0]
+            try:
+                if action not in ACTIONS:
+                    raise ValueError(f"Unknown action {action!r}")
+                rules.append(RoutingRule(pattern, action, f"{path.name}:{line_number}"))
+            except ValueError as e:
+                logging.warning(f"Ignoring routing rule {path.name}:{line_number}: {e}")
+    return rules
+
+
+class RoutingRules:
+    """
+    URL routing table compiled from the rules file and the legacy naughty list.
+
+    A rule's host matches itself and every subdomain, ignoring scheme and a
+    leading "www.", so `reuters.com` covers `https://www.reuters.com/...`
+    and `http://graphics.reuters.com/...`. The most specific host wins; among
+    rules for the same host, the first one in file order whose path glob
+    matches. Rules from ROUTING_RULES_FILE come before the naughty list.
+
+    The files are re-read when their modification time changes, checked at
+    most every ROUTING_RELOAD_SECONDS, so edits apply without a restart.
+    """
+
+    def __init__(
+        self,
+        rules_path: Path = Path(ROUTING_RULES_FILE),
+        naughty_path: Path | None = Path(NAUGHTY_LINKS_FILE),
+        reload_seconds: float = ROUTING_RELOAD_SECONDS,
+    ):
+        self.rules_path = rules_path
+        self.naughty_path = naughty_path
+        self.reload_seconds = reload_seconds
+        self._by_host: dict[str, list[RoutingRule]] = {}
+        self._mtimes: tuple = ()
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _current_mtimes(self) -> tuple:
+        mtimes = []
+        for path in (self.rules_path, self.naughty_path):
+            try:
+                mtimes.append(path.stat().st_mtime_ns if path else None)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def reload(self):
+        """Recompiles the table from disk."""
+        mtimes = self._current_mtimes()
+        rules = []
+        for path, default_action in (
+            (self.rules_path, None),
+            (self.naughty_path, ACTION_URL_ONLY),
+        ):
+            if path is None or not path.exists():
+                continue
+            try:
+                rules.extend(parse_rules_file(path, default_action))
+            except OSError as e:
+                logging.warning(f"Could not read routing rules from {path}: {e}")
+
+        by_host: dict[str, list[RoutingRule]] = {}
+        for rule in rules:
+            by_host.setdefault(rule.host, []).append(rule)
+        with self._lock:
+            self._by_host = by_host
+            self._mtimes = mtimes
+            self._checked_at = time.monotonic()
+        logging.info(f"Loaded {len(rules)} routing rules for {len(by_host)} hosts")
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.reload_seconds:
+                return
+            self._checked_at = now
+        if self._current_mtimes() != self._mtimes:
+            self.reload()
+
+    def match(self, url: str) -> RoutingRule | None:
+        """The rule that applies to `url`, or None for the default route."""
+        self._maybe_reload()
+        parts = urlsplit(url)
+        labels = _normalize_host(parts.hostname or "").split(".")
+        with self._lock:
+            by_host = self._by_host
+        for i in range(len(labels)):
+            for rule in by_host.get(".".join(labels[i:]), ()):
+                if rule.matches_path(parts.path):
+                    return rule
+        return None
+
+    def action(self, url: str) -> str | None:
+        rule = self.match(url)
+        return rule.action if rule else None
+
+    def fetch_tier(self, url: str) -> str | None:
+        """TIER_HTTP or TIER_BROWSER when a rule pins the tier, else None."""
+        action = self.action(url)
+        return action if action in (ACTION_HTTP, ACTION_BROWSER) else None
+
+
+# --- Process-wide rules ---
+_rules: RoutingRules | None = None
+_rules_lock = threading.Lock()
+
+
+def get_routing_rules() -> RoutingRules:
+    """Returns the hot-reloading routing table shared by the whole process."""
+    global _rules
+    with _rules_lock:
+        if _rules is None:
+            _rules = RoutingRules()
+        return _rules
+
+
+# --- Command Line ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show how URLs are routed.")
+    parser.add_argument("urls", nargs="+")
+    args = parser.parse_args()
+
+    routing = get_routing_rules()
+    for url in args.urls:
+        rule = routing.match(url)
+        print(f"{url}\t{rule.action if rule else 'default'}\t{rule.source if rule else ''}")
@@ -1,35 +1,22 @@
 # utils/scraping_utils.py
+import asyncio
 import random
 import time
 import logging
-from playwright.sync_api import (
-    sync_playwright,
-    Route,
-    Playwright,
-    BrowserContext,
-    Page,
-    Response,
+from playwright.sync_api import Route
+
+from utils.browser_pool import get_browser_pool
+from utils.html_cache import get_html_cache, CacheMissError
+from utils.http_fetcher import (
+    TIER_HTTP,
+    TIER_BROWSER,
+    domain_tiers,
+    accept_http_response,
+    http_get,
+    http_get_async,
 )
-
-# --- Constants ---
-USER_AGENTS = [
-    # "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 12_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15",
-    # "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.5672.127 Safari/537.36",
-]
-
-VIEWPORTS = [
-    {"width": 1920, "height": 1080},
-    {"width": 1366, "height": 768},
-    {"width": 1440, "height": 900},
-]
-
-EXTRA_HEADERS = {
-    "Accept-Language": "en-US,en;q=0.9",
-    "Referer": "https://www.google.com/",
-    "DNT": "1",
-    "Upgrade-Insecure-Requests": "1",
-}
+from utils.routing_rules import get_routing_rules
+from utils.deadlines import current_deadline, timeout_for
 
 
 # --- Asset Blocker ---
@@ -53,6 +40,9 @@ def scrape_site(url: str, max_retries: int = 2) -> bytes:
     """
     Scrapes a website using Playwright with stealth settings and returns the raw HTML content as bytes.
 
+    Pages are loaded on the shared browser pool, so no Chromium is launched
+    per call; see `utils/browser_pool.py`.
+
     Args:
         url: The URL to scrape.
         max_retries: The maximum number of times to retry on failure.
@@ -62,54 +52,160 @@ def scrape_site(url: str, max_retries: int = 2) -> bytes:
 
     Raises:
         RuntimeError: If scraping fails after all retries.
+        DeadlineExceeded: If the current `Deadline` runs out first.
     """
+    pool = get_browser_pool()
     for attempt in range(max_retries):
+        # Bounded by the current Deadline, which also ends the retries.
+        timeout = timeout_for(stage="browser fetch")
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=["--disable-blink-features=AutomationControlled"],
-                )
-                context = browser.new_context(
-                    user_agent=random.choice(USER_AGENTS),
-                    viewport=random.choice(VIEWPORTS),
-                    extra_http_headers=EXTRA_HEADERS,
-                    locale="en-US",
-                )
-                page = context.new_page()
-                page.set_default_timeout(20000)  # 20 seconds
-
-                # Block assets for speed, but scripts may be needed for some sites
-                # page.route("**/*", block_unnecessary_assets)
-
-                response = page.goto(url, wait_until="domcontentloaded")
-
-                if not response or not response.ok:
-                    raise IOError(
-                        f"Bad status code {response.status if response else 'N/A'}"
-                    )
-
-                # Wait for the body to ensure content is loaded
-                page.wait_for_selector("body")
-
-                # CRITICAL: Return raw bytes to let BeautifulSoup handle encoding
-                html_bytes = response.body()
-
-                browser.close()
-                return html_bytes
+            return pool.fetch(url, timeout=timeout)
+        except Exception as e:
+            logging.warning(
+                f"[Attempt {attempt + 1}/{max_retries}] Failed to scrape {url}: {e}"
+            )
+            _check_deadline(e)
+            if attempt < max_retries - 1:
+                time.sleep(_retry_pause())  # Simple backoff
+            else:
+                raise RuntimeError(
+                    f"Failed to scrape {url} after {max_retries} attempts"
+                ) from e
+
+
+def _check_deadline(error: Exception):
+    """Turns a failed attempt into DeadlineExceeded once the budget is spent."""
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        raise deadline.exceeded("browser fetch") from error
+
+
+def _retry_pause() -> float:
+    """A short random pause between scrape attempts, within the current Deadline."""
+    pause = 1 + random.random()
+    deadline = current_deadline()
+    remaining = deadline.remaining() if deadline else None
+    return pause if remaining is None else min(pause, remaining)
+
+
+async def scrape_site_async(pool, url: str, max_retries: int = 2) -> bytes:
+    """
+    Async counterpart of `scrape_site` that loads pages on an `AsyncBrowserPool`.
 
+    Raises:
+        RuntimeError: If scraping fails after all retries.
+    """
+    for attempt in range(max_retries):
+        # Cancellation enforces the Deadline; this only stops the retries.
+        timeout_for(stage="browser fetch")
+        try:
+            return await pool.fetch(url)
         except Exception as e:
             logging.warning(
                 f"[Attempt {attempt + 1}/{max_retries}] Failed to scrape {url}: {e}"
             )
+            _check_deadline(e)
             if attempt < max_retries - 1:
-                time.sleep(1 + random.random())  # Simple backoff
+                await asyncio.sleep(_retry_pause())  # Simple backoff
             else:
                 raise RuntimeError(
                     f"Failed to scrape {url} after {max_retries} attempts"
                 ) from e
 
 
+# --- Tiered Fetching ---
+
+
+def fetch_html(url: str) -> bytes:
+    """
+    Fetches a page over plain HTTP, escalating to the browser pool only when needed.
+
+    Pages are served from the on-disk HTML cache when possible. A domain
+    whose pages needed a browser is remembered, so its later URLs skip the
+    HTTP attempt; see `utils/http_fetcher.py`. An `http` or `browser`
+    routing rule (`utils/routing_rules.py`) pins the tier instead.
+
+    Raises:
+        CacheMissError: In replay-only mode, if the page was never cached.
+        RuntimeError: If the browser tier fails after all retries.
+    """
+    cache = get_html_cache()
+    if cache is not None:
+        body = cache.get(url)
+        if body is not None:
+            logging.info(f"HTML cache hit: {url}")
+            return body
+        if cache.replay_only:
+            raise CacheMissError(f"Replay-only mode and no cached page for {url}")
+
+    body, headers = _fetch_html_uncached(url)
+    if cache is not None:
+        cache.put(url, body, headers)
+    return body
+
+
+def _pinned_http_response(url: str, status_code: int, body: bytes) -> bytes:
+    """The body of an HTTP-only fetch; there is no browser to fall back on."""
+    if status_code >= 400:
+        raise RuntimeError(f"HTTP {status_code} for {url} (routing rule: http only)")
+    return body
+
+
+def _fetch_html_uncached(url: str) -> tuple[bytes, dict]:
+    pinned = get_routing_rules().fetch_tier(url)
+    if (pinned or domain_tiers.get(url)) != TIER_BROWSER:
+        try:
+            status_code, body, headers = http_get(url)
+        except Exception as e:
+            if pinned == TIER_HTTP:
+                raise
+            logging.info(f"HTTP fetch failed for {url}, trying browser: {e}")
+        else:
+            if pinned == TIER_HTTP:
+                body = _pinned_http_response(url, status_code, body)
+                return body, {**headers, "x-fetch-tier": TIER_HTTP}
+            if accept_http_response(url, status_code, body):
+                return body, {**headers, "x-fetch-tier": TIER_HTTP}
+
+    return scrape_site(url), {"x-fetch-tier": TIER_BROWSER}
+
+
+async def fetch_html_async(pool, client, url: str) -> bytes:
+    """Async counterpart of `fetch_html` using an httpx.AsyncClient and an `AsyncBrowserPool`."""
+    cache = get_html_cache()
+    if cache is not None:
+        body = await asyncio.to_thread(cache.get, url)
+        if body is not None:
+            logging.info(f"HTML cache hit: {url}")
+            return body
+        if cache.replay_only:
+            raise CacheMissError(f"Replay-only mode and no cached page for {url}")
+
+    body, headers = await _fetch_html_uncached_async(pool, client, url)
+    if cache is not None:
+        await asyncio.to_thread(cache.put, url, body, headers)
+    return body
+
+
+async def _fetch_html_uncached_async(pool, client, url: str) -> tuple[bytes, dict]:
+    pinned = get_routing_rules().fetch_tier(url)
+    if (pinned or domain_tiers.get(url)) != TIER_BROWSER:
+        try:
+            status_code, body, headers = await http_get_async(client, url)
+        except Exception as e:
+            if pinned == TIER_HTTP:
+                raise
+            logging.info(f"HTTP fetch failed for {url}, trying browser: {e}")
+        else:
+            if pinned == TIER_HTTP:
+                body = _pinned_http_response(url, status_code, body)
+                return body, {**headers, "x-fetch-tier": TIER_HTTP}
+            if accept_http_response(url, status_code, body):
+                return body, {**headers, "x-fetch-tier": TIER_HTTP}
+
+    return await scrape_site_async(pool, url), {"x-fetch-tier": TIER_BROWSER}
+
+
 # --- Text Cleaning Utilities ---
 
 
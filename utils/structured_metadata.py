@@ -0,0 +1,296 @@
+# utils/structured_metadata.py
+import html
+import logging
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from config import STRUCTURED_MIN_CONFIDENCE, STRUCTURED_OPTIONAL_FIELDS
+from utils.text_scrubber import scrub_text
+
+ARTICLE_FIELDS = (
+    "title",
+    "authors",
+    "source",
+    "published_date",
+    "modified_date",
+    "article_text",
+)
+
+# JSON-LD @types that describe the article itself.
+ARTICLE_TYPES = {
+    "article",
+    "newsarticle",
+    "reportagenewsarticle",
+    "analysisnewsarticle",
+    "opinionnewsarticle",
+    "backgroundnewsarticle",
+    "reviewnewsarticle",
+    "liveblogposting",
+    "blogposting",
+    "report",
+    "scholarlyarticle",
+}
+
+# Candidate sources per field, strongest first: (where, key, confidence).
+# "ld" reads the JSON-LD article node, "meta" a <meta> name/property.
+_FIELD_SOURCES = {
+    "title": [
+        ("ld", "headline", 0.95),
+        ("meta", "og:title", 0.85),
+        ("meta", "twitter:title", 0.8),
+        ("ld", "name", 0.75),
+        ("title", None, 0.5),
+    ],
+    "authors": [
+        ("ld", "author", 0.9),
+        ("meta", "author", 0.75),
+        ("meta", "article:author", 0.75),
+        ("meta", "parsely-author", 0.75),
+        ("meta", "sailthru.author", 0.7),
+        ("meta", "byl", 0.7),
+        ("ld", "creator", 0.6),
+    ],
+    "source": [
+        ("ld", "publisher", 0.9),
+        ("meta", "og:site_name", 0.85),
+        ("meta", "application-name", 0.6),
+    ],
+    "published_date": [
+        ("ld", "datePublished", 0.95),
+        ("meta", "article:published_time", 0.9),
+        ("meta", "parsely-pub-date", 0.85),
+        ("meta", "datepublished", 0.85),
+        ("meta", "pubdate", 0.8),
+        ("meta", "publish-date", 0.8),
+        ("meta", "dc.date", 0.75),
+        ("meta", "date", 0.7),
+        ("ld", "dateCreated", 0.6),
+        ("time", None, 0.5),
+    ],
+    "modified_date": [
+        ("ld", "dateModified", 0.95),
+        ("meta", "article:modified_time", 0.9),
+        ("meta", "og:updated_time", 0.85),
+        ("meta", "datemodified", 0.85),
+        ("meta", "last-modified", 0.7),
+    ],
+}
+
+# Bodies shorter than this are likely teasers or paywall stubs.
+_MIN_BODY_CHARS = 500
+
+
+class StructuredMetadata:
+    """
+    `ArticleInfo` fields recovered from JSON-LD, OpenGraph and meta tags.
+
+    Every field holds its best value, a confidence in [0, 1] and the name of
+    the source it came from. Fields below STRUCTURED_MIN_CONFIDENCE are
+    `missing` and left to the LLM; optional ones (STRUCTURED_OPTIONAL_FIELDS)
+    fall back to "N/A" instead.
+    """
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.confidence: dict[str, float] = {name: 0.0 for name in ARTICLE_FIELDS}
+        self.sources: dict[str, str] = {}
+        # SimHash of the page text, set when near-duplicate detection runs.
+        self.fingerprint: int | None = None
+
+    def offer(self, field: str, value: str | None, confidence: float, source: str):
+        """Keeps `value` if it beats the field's current confidence."""
+        if value and confidence > self.confidence[field]:
+            self.values[field] = value
+            self.confidence[field] = confidence
+            self.sources[field] = source
+
+    def is_confident(self, field: str) -> bool:
+        return self.confidence[field] >= STRUCTURED_MIN_CONFIDENCE
+
+    @property
+    def missing(self) -> list[str]:
+        """Fields the LLM still has to fill."""
+        return [
+            name
+            for name in ARTICLE_FIELDS
+            if not self.is_confident(name) and name not in STRUCTURED_OPTIONAL_FIELDS
+        ]
+
+    def unknown_fields(self) -> list[str]:
+        """Fields the LLM is asked for: all not confidently known, optional ones too."""
+        return [name for name in ARTICLE_FIELDS if not self.is_confident(name)]
+
+    def known_metadata(self) -> dict[str, str]:
+        """Confident values other than the article body, as hints for the LLM."""
+        return {
+            name: self.values[name]
+            for name in ARTICLE_FIELDS
+            if name != "article_text" and self.is_confident(name)
+        }
+
+    def to_article_info(self, llm_values: dict | None = None):
+        """
+        Builds an `ArticleInfo`, preferring confident structured values.
+
+        Args:
+            llm_values: The LLM's extraction, used for every field this
+                extractor was not confident about.
+        """
+        from utils.llm_utils import ArticleInfo
+
+        data = {}
+        for name in ARTICLE_FIELDS:
+            if self.is_confident(name):
+                data[name] = self.values[name]
+            elif llm_values and llm_values.get(name) not in (None, "", "N/A"):
+                data[name] = llm_values[name]
+            else:
+                data[name] = self.values.get(name) or "N/A"
+        return ArticleInfo.model_validate(data)
+
+
+def extract_structured_metadata(url: str, parsed: dict) -> StructuredMetadata:
+    """
+    Scores every `ArticleInfo` field from a page's structured data.
+
+    Args:
+        url: The page URL (only used for logging).
+        parsed: The result of `parse_html_page`.
+
+    Returns:
+        The extraction, with per-field confidence.
+    """
+    structured = StructuredMetadata()
+    json_ld = parsed.get("json_ld") or {}
+    nodes = _flatten_ld(json_ld.get("ld_json_list") or [])
+    by_id = {node["@id"]: node for node in nodes if isinstance(node.get("@id"), str)}
+    article = _find_article_node(nodes)
+    meta = parsed.get("meta") or {}
+
+    for field, sources in _FIELD_SOURCES.items():
+        for where, key, confidence in sources:
+            if where == "ld":
+                raw = _ld_value(article.get(key), by_id) if article else None
+            elif where == "meta":
+                raw = meta.get(key.lower())
+            elif where == "title":
+                raw = parsed.get("title")
+            else:
+                raw = next(
+                    (t["datetime"] for t in parsed.get("times") or [] if t.get("datetime")),
+                    None,
+                )
+            value = _normalize_field(field, raw)
+            structured.offer(field, value, confidence, f"{where}:{key or where}")
+
+    _score_body(structured, article, json_ld, parsed.get("content_text") or "")
+
+    logging.info(
+        f"Structured metadata for {url}: "
+        + ", ".join(f"{name}={structured.confidence[name]:.2f}" for name in ARTICLE_FIELDS)
+    )
+    return structured
+
+
+def _score_body(
+    structured: StructuredMetadata, article: dict | None, json_ld: dict, content_text: str
+):
+    article_body = scrub_text(article.get("articleBody")) if article else ""
+    paragraphs = json_ld.get("article_text") or ""
+    # Only a publisher-supplied articleBody is trusted without LLM cleanup:
+    # text joined from every <p> also picks up nav, footer and promo blurbs,
+    # so it stays below STRUCTURED_MIN_CONFIDENCE and the LLM still cleans it.
+    candidates = [
+        (article_body, 0.9, "ld:articleBody"),
+        (paragraphs, 0.6, "paragraphs"),
+        (content_text, 0.4, "content_text"),
+    ]
+    for text, confidence, source in candidates:
+        if len(text) < _MIN_BODY_CHARS:
+            confidence = min(confidence, 0.3)
+        structured.offer("article_text", text, confidence, source)
+
+
+# --- JSON-LD helpers ---
+
+
+def _flatten_ld(items) -> list[dict]:
+    """Every object in a list of JSON-LD documents, @graph members included."""
+    nodes = []
+    stack = list(items)
+    while stack:
+        item = stack.pop(0)
+        if isinstance(item, list):
+            stack[:0] = item
+        elif isinstance(item, dict):
+            nodes.append(item)
+            if isinstance(item.get("@graph"), list):
+                stack[:0] = item["@graph"]
+    return nodes
+
+
+def _types(node: dict) -> set[str]:
+    types = node.get("@type") or []
+    if isinstance(types, str):
+        types = [types]
+    return {str(t).lower() for t in types}
+
+
+def _find_article_node(nodes: list[dict]) -> dict | None:
+    for node in nodes:
+        if _types(node) & ARTICLE_TYPES:
+            return node
+    return next((node for node in nodes if "headline" in node), None)
+
+
+def _ld_value(value, by_id: dict) -> str | None:
+    """Flattens a JSON-LD value (string, object, list, @id reference) to text."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        names = [_ld_value(v, by_id) for v in value]
+        names = list(dict.fromkeys(n for n in names if n))
+        return ", ".join(names) or None
+    if isinstance(value, dict):
+        if "name" not in value and value.get("@id") in by_id:
+            value = by_id[value["@id"]]
+        name = value.get("name")
+        return _ld_value(name, by_id) if name else None
+    return str(value)
+
+
+# --- Field normalization ---
+
+
+def _normalize_field(field: str, raw: str | None) -> str | None:
+    if not raw:
+        return None
+    text = re.sub(r"\s+", " ", html.unescape(str(raw))).strip()
+    if field.endswith("_date"):
+        return _normalize_date(text)
+    if field == "authors":
+        names = [
+            name.strip()
+            for name in re.split(r",|\band\b|;", re.sub(r"^by\s+", "", text, flags=re.I))
+            if name.strip() and not name.strip().startswith("http")
+        ]
+        return ", ".join(dict.fromkeys(names)) or None
+    return text or None
+
+
+def _normalize_date(text: str) -> str | None:
+    """Returns the calendar date (YYYY-MM-DD) of an ISO 8601 or RFC 2822 string."""
+    match = re.match(r"(\d{4})-(\d{2})-(\d{2})", text)
+    if match:
+        return "-".join(match.groups())
+    try:
+        return parsedate_to_datetime(text).date().isoformat()
+    except (TypeError, ValueError, IndexError):
+        pass
+    for fmt in ("%Y%m%d", "%B %d, %Y", "%b %d, %Y", "%d %B %Y"):
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,139 @@
+# utils/url_dedupe.py
+import logging
+import threading
+from collections import defaultdict
+from urllib.parse import urljoin
+
+from utils.url_utils import canonicalize_url
+
+# Status of the placeholder result for a URL merged into another page.
+STATUS_DUPLICATE = "duplicate"
+
+
+class CanonicalUrlGroups:
+    """
+    Collapses input URLs that address the same page before anything is fetched.
+
+    Every original URL maps to its `canonicalize_url` form. Each canonical
+    page is processed once, and `expand()` turns its result into one row
+    per original URL. Once a page has been parsed, its
+    `<link rel=canonical>` can merge a later canonical URL into it as well
+    (`note_rel_canonical`): that URL is never fetched and reuses the result.
+
+    The canonical form is only a grouping key; it may drop parts of the
+    real address (`/amp/`, trailing slashes, some query parameters). Each
+    page is fetched, and named in every method, by the first URL submitted
+    for it (see `fetch_urls`).
+
+    Args:
+        url_list: Input URLs, duplicates included, in input order.
+        completed_urls: Original URLs to leave out (already in the output).
+    """
+
+    def __init__(self, url_list: list[str], completed_urls: set[str] = frozenset()):
+        # canonical -> original URLs, both in first-seen order.
+        self.originals: dict[str, list[str]] = {}
+        self.canonical_of: dict[str, str] = {}
+        for url in url_list:
+            if url in completed_urls:
+                continue
+            canonical = canonicalize_url(url) if _is_http(url) else url
+            self.canonical_of[url] = canonical
+            self.originals.setdefault(canonical, []).append(url)
+
+        self._started: set[str] = set()
+        self._merged_into: dict[str, str] = {}
+        self._results: dict[str, dict] = {}
+        self._waiting: dict[str, list[str]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+        collapsed = len(self.canonical_of) - len(self.originals)
+        if collapsed:
+            logging.info(
+                f"Collapsed {len(self.canonical_of)} URLs into "
+                f"{len(self.originals)} canonical pages"
+            )
+
+    @property
+    def fetch_urls(self) -> list[str]:
+        """The pages to process: the first submitted URL of each canonical page."""
+        return [originals[0] for originals in self.originals.values()]
+
+    def _key(self, url: str) -> str:
+        return self.canonical_of.get(url, url)
+
+    def claim(self, url: str) -> str | None:
+        """
+        Marks a page (by its fetch URL) as being fetched.
+
+        Returns:
+            The fetch URL of the page `url` was merged into by a
+            rel=canonical link, in which case it must not be fetched, or None.
+        """
+        key = self._key(url)
+        with self._lock:
+            merged_into = self._merged_into.get(key)
+            if merged_into is None:
+                self._started.add(key)
+                return None
+            return self.originals[merged_into][0]
+
+    def note_rel_canonical(self, url: str, rel_canonical: str | None):
+        """Merges the page `rel_canonical` points at into `url`, if not yet started."""
+        if not rel_canonical:
+            return
+        key = self._key(url)
+        target = canonicalize_url(urljoin(url, rel_canonical))
+        with self._lock:
+            if (
+                target != key
+                and target in self.originals
+                and target not in self._started
+                and target not in self._merged_into
+            ):
+                self._merged_into[target] = key
+                logging.info(f"Merging {target} into {url} (rel=canonical)")
+
+    def duplicate_result(self, url: str, merged_into: str) -> dict:
+        """Placeholder result for a URL that reuses another page's result."""
+        return {
+            "url": url,
+            "article_info": None,
+            "status": STATUS_DUPLICATE,
+            "merged_into": merged_into,
+        }
+
+    def expand(self, result: dict) -> list[dict]:
+        """
+        The output rows for one canonical page's result.
+
+        One row per original URL, plus rows for pages merged into it. A
+        duplicate placeholder whose page has no result yet yields nothing;
+        its rows come with that page's result.
+        """
+        key = self._key(result["url"])
+        with self._lock:
+            if result.get("status") == STATUS_DUPLICATE:
+                primary = self._key(result["merged_into"])
+                if primary not in self._results:
+                    self._waiting[primary].append(key)
+                    return []
+                return self._rows(key, self._results[primary])
+
+            rows = self._rows(key, result)
+            for merged in self._waiting.pop(key, []):
+                rows.extend(self._rows(merged, result))
+            if key in self._merged_into.values():
+                # Pages merged later still need this result.
+                self._results[key] = result
+            return rows
+
+    def _rows(self, canonical: str, result: dict) -> list[dict]:
+        return [
+            {**result, "url": original}
+            for original in self.originals.get(canonical, [canonical])
+        ]
+
+
+def _is_http(url: str) -> bool:
+    return bool(url) and url.startswith(("http://", "https://"))
@@ -0,0 +1,185 @@
+# utils/url_ingest.py
+import argparse
+import codecs
+import csv
+import hashlib
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from config import INGEST_CHUNK_BYTES
+from utils.url_utils import canonicalize_url
+
+MIN_URL_LENGTH = 10
+
+
+def is_valid_url(url: str) -> bool:
+    """An absolute http(s) URL of plausible length."""
+    return url.startswith(("http://", "https://")) and len(url) >= MIN_URL_LENGTH
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+class IngestStats:
+    """Counts from one ingestion, plus the input's SHA-256."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.fields = 0
+        self.urls = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.pages = 0
+        self.sha256 = ""
+
+    def __repr__(self) -> str:
+        return (
+            f"IngestStats({self.urls} URLs, {self.pages} pages, "
+            f"{self.duplicates} duplicates, {self.invalid} invalid, {self.bytes} bytes)"
+        )
+
+
+class UrlIngester:
+    """
+    Validates and de-duplicates URLs one at a time, keeping only digests.
+
+    Exact repeats are dropped. URLs that differ but share a canonical form
+    are kept, because every input URL gets its own output row; the
+    engines fetch such a page once per shard. Memory grows by a few dozen
+    bytes per unique URL, never by the URLs themselves.
+    """
+
+    def __init__(self):
+        self.stats = IngestStats()
+        self._seen: set[bytes] = set()
+        self._pages: set[bytes] = set()
+
+    def feed(self, fields: Iterable[str]) -> Iterator[str]:
+        """The new, valid URLs among `fields`."""
+        for field in fields:
+            url = field.strip()
+            if not url:
+                continue
+            self.stats.fields += 1
+            if not is_valid_url(url):
+                self.stats.invalid += 1
+                continue
+            digest = _digest(url)
+            if digest in self._seen:
+                self.stats.duplicates += 1
+                continue
+            self._seen.add(digest)
+            page = _digest(canonicalize_url(url))
+            if page not in self._pages:
+                self._pages.add(page)
+                self.stats.pages += 1
+            self.stats.urls += 1
+            yield url
+
+
+def _decode_line(line: bytes) -> str:
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode("latin-1")
+
+
+def iter_lines(
+    stream: BinaryIO, stats: IngestStats, chunk_size: int = INGEST_CHUNK_BYTES
+) -> Iterator[str]:
+    """
+    Decoded lines of `stream`, read `chunk_size` bytes at a time.
+
+    Each line is decoded as UTF-8, falling back to Latin-1 for that line
+    only, so one stray byte never rejects the whole upload. Fills in
+    `stats.bytes` and `stats.sha256` as it goes.
+    """
+    hasher = hashlib.sha256()
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if not stats.bytes:
+            chunk = chunk.removeprefix(codecs.BOM_UTF8)
+        hasher.update(chunk)
+        stats.bytes += len(chunk)
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield _decode_line(line)
+    if pending:
+        yield _decode_line(pending)
+    stats.sha256 = hasher.hexdigest()
+
+
+def iter_upload_urls(
+    stream: BinaryIO,
+    ingester: UrlIngester,
+    chunk_size: int = INGEST_CHUNK_BYTES,
+) -> Iterator[str]:
+    """
+    Streams the URLs out of an uploaded `.csv` or `.txt` file.
+
+    Every comma-separated field of every line is a candidate, so URLs are
+    found in any CSV column and in comma-separated text alike.
+    """
+    for row in csv.reader(iter_lines(stream, ingester.stats, chunk_size)):
+        yield from ingester.feed(row)
+
+
+# --- URL Spool ---
+
+
+def spool_urls(urls: Iterable[str], path: Path, max_urls: int | None = None) -> int:
+    """
+    Writes `urls` to `path`, one per line, and returns how many were written.
+
+    Raises:
+        ValueError: If there are more than `max_urls`; the file is removed.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    try:
+        with path.open("w", encoding="utf-8") as f:
+            for url in urls:
+                count += 1
+                if max_urls is not None and count > max_urls:
+                    raise ValueError(f"Too many URLs (more than {max_urls})")
+                f.write(url + "\n")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return count
+
+
+def iter_shards(path: Path, shard_size: int) -> Iterator[list[str]]:
+    """Reads a spool back as lists of at most `shard_size` URLs."""
+    shard = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            url = line.rstrip("\n")
+            if url:
+                shard.append(url)
+            if len(shard) >= shard_size:
+                yield shard
+                shard = []
+    if shard:
+        yield shard
+
+
+# --- Command Line ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Extract, validate and spool the URLs in a .csv or .txt file."
+    )
+    parser.add_argument("input", type=Path)
+    parser.add_argument("spool", type=Path, help="Output file, one URL per line.")
+    args = parser.parse_args()
+
+    ingester = UrlIngester()
+    with args.input.open("rb") as f:
+        count = spool_urls(iter_upload_urls(f, ingester), args.spool)
+    print(f"Spooled {count} URLs to {args.spool}: {ingester.stats}")
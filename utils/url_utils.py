@@ -0,0 +1,128 @@
+# utils/url_utils.py
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click, never select the page. Generic
+# names some sites use for real (`ref`, `amp`, `outputType`) are not listed.
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "cmpid",
+    "ocid",
+    "smid",
+    "smtyp",
+    "taid",
+    "ref_src",
+    "sr_share",
+    "ito",
+}
+TRACKING_PARAM_PREFIXES = ("utm_", "at_", "__twitter_impression")
+
+# Google AMP cache URLs wrap the publisher URL:
+# https://www-example-com.cdn.ampproject.org/c/s/www.example.com/path
+_AMP_CACHE_PATH = re.compile(r"^/[cv]/(?:s/)?(.+)$")
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def _strip_amp_path(path: str) -> str:
+    """`/amp/x`, `/x/amp`, `/x.amp` and `/x.amp.html` all become `/x`(`.html`)."""
+    if path.startswith("/amp/"):
+        path = path[4:]
+    path = re.sub(r"/amp/?$", "", path)
+    path = re.sub(r"\.amp(\.html?)?$", r"\1", path)
+    return path or "/"
+
+
+def _host_with_port(parts) -> str:
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80)
+        or (scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+    return host
+
+
+def _page_fragment(parts) -> str:
+    # Hash-routed single-page apps (e.g. `news.afp.com/#/c/...`) keep their
+    # fragment, because there it *is* the page address.
+    return parts.fragment if parts.fragment.startswith(("/", "!/")) else ""
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL into the key used for caching what was fetched from it.
+
+    Lowercases the scheme and host, drops default ports, and strips the
+    fragment (except a hash route). Nothing the server sees is changed, so
+    two URLs with one key always get the same response.
+
+    Args:
+        url: An absolute http(s) URL.
+
+    Returns:
+        The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            _host_with_port(parts),
+            parts.path or "/",
+            parts.query,
+            _page_fragment(parts),
+        )
+    )
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL into the key used for deduplication.
+
+    On top of `normalize_url`, drops tracking query parameters (`utm_*`,
+    `fbclid`, ...), AMP variants (`/amp/` paths, `.amp` suffixes,
+    AMP-cache hosts) and a trailing slash, and sorts the remaining query
+    parameters. The result may not be fetchable as is; it only groups
+    URLs that address the same article.
+
+    Args:
+        url: An absolute http(s) URL.
+
+    Returns:
+        The canonical form of the URL.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.endswith(".cdn.ampproject.org"):
+        match = _AMP_CACHE_PATH.match(parts.path)
+        if match:
+            return canonicalize_url(f"{parts.scheme or 'https'}://{match.group(1)}")
+
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking_param(name)
+        )
+    )
+    path = _strip_amp_path(parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    return urlunsplit(
+        (parts.scheme.lower(), _host_with_port(parts), path, query, _page_fragment(parts))
+    )
+
+
+def url_domain(url: str) -> str:
+    """Returns the lowercased host of a URL (without port)."""
+    return (urlsplit(url).hostname or "").lower()